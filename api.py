@@ -0,0 +1,170 @@
+"""
+Serveur HTTP (ASGI) sans interface: expose l'orchestrateur et une route
+de recherche seule, avec regroupement des requêtes graphe et backpressure.
+
+    uvicorn api:app --host 0.0.0.0 --port 8000 --workers 4
+"""
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+from src import resources
+from src.retrieval.batcher import QueueFullError, RetrievalBatcher
+from src.retrieval.symptom_matcher import SymptomMatcher
+from src.tools.language_detector import LanguageDetector
+from src.utils.concurrency import iterate_in_thread
+from src.utils.env import load_env
+from src.utils.tracing import metrics, trace
+
+load_env()
+
+# Au-delà de cette file d'attente, les nouvelles questions sont refusées (503)
+MAX_QUEUE_DEPTH = int(os.getenv("API_MAX_QUEUE_DEPTH", 100))
+RETRY_AFTER_SECONDS = int(os.getenv("API_RETRY_AFTER", 5))
+
+
+class QuestionRequest(BaseModel):
+    question: str
+    stream: bool = False
+    mode: Optional[str] = None
+    timings: bool = False
+    tenant: Optional[str] = None
+
+
+state = {}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Construction unique (Neo4j, schéma, chaîne, index) hors de la boucle
+    orchestrator = await asyncio.to_thread(resources.get_orchestrator)
+    retriever = orchestrator.tool.retriever
+    
+    # Driver async sur l'instance et la base du graphe du retriever (Neo4j
+    # uniquement: hors ligne, le classement passe par `to_thread`)
+    async_graph = None
+    connector = getattr(getattr(retriever, "graph", None), "connector", None)
+    if isinstance(retriever, SymptomMatcher) and connector is not None:
+        async_graph = connector.get_async_graph()
+        retriever.async_graph = async_graph
+    
+    batcher = RetrievalBatcher(
+        retriever,
+        max_batch=int(os.getenv("API_BATCH_SIZE", 64)),
+        max_wait_ms=float(os.getenv("API_BATCH_WAIT_MS", 5)),
+        max_queue=MAX_QUEUE_DEPTH * 10
+    )
+    batcher.start()
+    state.update(orchestrator=orchestrator, retriever=retriever, batcher=batcher)
+    yield
+    
+    await batcher.stop()
+    if async_graph is not None:
+        retriever.async_graph = None
+        await async_graph.close()
+    state.clear()
+
+
+app = FastAPI(title="Medical RAG API", lifespan=lifespan)
+
+
+def _overloaded(detail: str) -> HTTPException:
+    return HTTPException(status_code=503, detail=detail,
+                         headers={"Retry-After": str(RETRY_AFTER_SECONDS)})
+
+
+def _admit(orchestrator):
+    """Contrôle d'admission: refuse au lieu d'allonger indéfiniment la file."""
+    scheduler = orchestrator.scheduler
+    if scheduler.waiting >= MAX_QUEUE_DEPTH:
+        raise _overloaded(f"Too many queued questions ({scheduler.waiting})")
+
+
+async def _orchestrator(tenant: Optional[str]):
+    """Orchestrateur du tenant (graphe et tool dédiés, construits au premier appel)."""
+    if not tenant:
+        return state["orchestrator"]
+    try:
+        return await asyncio.to_thread(resources.get_orchestrator, tenant)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+async def _retrieve(question: str, tenant: Optional[str] = None) -> dict:
+    if tenant:
+        # Les requêtes regroupées ne concernent que la base par défaut
+        retriever = (await _orchestrator(tenant)).tool.retriever
+        if retriever is None:
+            raise HTTPException(status_code=503, detail="Native retrieval is disabled for this tenant")
+        return {"language": LanguageDetector.detect(question), **await retriever.asearch(question)}
+    if state["retriever"] is None:
+        raise HTTPException(status_code=503, detail="Native retrieval is disabled")
+    # `match` peut recharger le vocabulaire depuis le graphe: hors de la boucle
+    symptoms = await asyncio.to_thread(state["retriever"].match, question)
+    try:
+        diseases = await state["batcher"].rank(symptoms) if symptoms else []
+    except QueueFullError as e:
+        raise _overloaded(str(e))
+    return {
+        "language": LanguageDetector.detect(question),
+        "symptoms": symptoms,
+        "diseases": diseases,
+    }
+
+
+@app.get("/health")
+async def health():
+    scheduler = state["orchestrator"].scheduler
+    return {
+        "status": "ok",
+        "in_flight": scheduler.in_flight,
+        "queued": scheduler.waiting,
+        "retrieval_queue": state["batcher"].depth,
+    }
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Métriques au format texte Prometheus: durées par étape, tokens, retries, lignes."""
+    scheduler = state["orchestrator"].scheduler
+    metrics.set("rag_questions_in_flight", scheduler.in_flight)
+    metrics.set("rag_questions_queued", scheduler.waiting)
+    metrics.set("rag_retrieval_queue_depth", state["batcher"].depth)
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/retrieve")
+async def retrieve(request: QuestionRequest):
+    """Recherche seule (sans LLM): symptômes reconnus et maladies classées."""
+    return await _retrieve(request.question, request.tenant)
+
+
+@app.post("/ask")
+async def ask(request: QuestionRequest):
+    """Question complète; `stream=true` renvoie des événements NDJSON (tokens compris) au fil de l'eau."""
+    orchestrator = await _orchestrator(request.tenant)
+    _admit(orchestrator)
+    if request.mode is not None and request.mode not in orchestrator.MODES:
+        raise HTTPException(status_code=422, detail=f"Unknown mode: {request.mode}")
+    
+    if not request.stream:
+        with trace("api.ask") as timeline:
+            answer = await orchestrator.arun(request.question, request.mode)
+        body = {"answer": answer}
+        if request.timings:
+            body["timings"] = timeline.breakdown()
+        return JSONResponse(body)
+    
+    async def events():
+        # Événements de l'orchestrateur (statut, étapes d'agent, tokens, réponse finale)
+        async with orchestrator.scheduler.slot():
+            async for event in iterate_in_thread(
+                orchestrator.stream(request.question, request.mode)
+            ):
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
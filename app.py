@@ -1,53 +1,77 @@
-import streamlit as st
+import time
+_RUN_START = time.perf_counter()
+
 import os
-from src.agents.crew_orchestrator import MedicalCrewOrchestrator
-from src.database.neo4j_connector import Neo4jConnector
-from src.database.data_seeder import DataSeeder
-from dotenv import load_dotenv
-load_dotenv(override=True)
-
-
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-GROQ_MODEL = os.getenv("GROQ_MODEL_NAME", "llama-3.3-70b-versatile")
-
-# Définir TOUTES les variables pour forcer Groq
-os.environ["GROQ_API_KEY"] = GROQ_API_KEY
-os.environ["GROQ_MODEL_NAME"] = GROQ_MODEL
-
-# ⚠️ DÉSACTIVER complètement OpenAI
-os.environ.pop("OPENAI_API_KEY", None)
-os.environ.pop("OPENAI_API_BASE", None)
-os.environ.pop("OPENAI_BASE_URL", None)
-os.environ.pop("OPENAI_MODEL_NAME", None)
-
-# Importer APRÈS configuration
-from src.agents.crew_orchestrator import MedicalCrewOrchestrator
-from src.database.neo4j_connector import Neo4jConnector
-from src.database.data_seeder import DataSeeder
-
-print(f"\n{'='*60}")
-print(f"🔑 Configuration LLM:")
-print(f"  Provider: Groq")
-print(f"  Model: {GROQ_MODEL}")
-print(f"  API Key: {GROQ_API_KEY[:15]}...{GROQ_API_KEY[-4:]}")
-print(f"{'='*60}\n")
-
-# Auto-seed si nécessaire
-try:
-    connector = Neo4jConnector()
-    graph = connector.get_graph()
-    result = graph.query("MATCH (n) RETURN count(n) as count")
-    node_count = result[0]['count'] if result else 0
+import streamlit as st
+from src import resources
+from src.utils.env import load_env
+from src.utils.tracing import check_startup_budget
+
+# Streamlit ré-exécute ce script à chaque interaction: les imports lourds
+# (crewai, langchain, litellm) sont différés jusqu'à la construction de
+# l'orchestrateur, et les effets de bord ne s'exécutent qu'une fois par processus.
+
+
+@st.cache_resource(show_spinner=False)
+def configure() -> tuple:
+    """Charge .env et force Groq comme fournisseur LLM (une fois par processus)."""
+    load_env(override=True)
+    groq_api_key = os.getenv("GROQ_API_KEY")
+    groq_model = os.getenv("GROQ_MODEL_NAME", "llama-3.3-70b-versatile")
+    
+    # Définir TOUTES les variables pour forcer Groq
+    if groq_api_key:
+        os.environ["GROQ_API_KEY"] = groq_api_key
+    os.environ["GROQ_MODEL_NAME"] = groq_model
     
-    print(f"[DATABASE] {node_count} nodes found")
+    # ⚠️ DÉSACTIVER complètement OpenAI
+    os.environ.pop("OPENAI_API_KEY", None)
+    os.environ.pop("OPENAI_API_BASE", None)
+    os.environ.pop("OPENAI_BASE_URL", None)
+    os.environ.pop("OPENAI_MODEL_NAME", None)
     
-    if node_count == 0:
-        print("[DATABASE] Seeding...")
-        seeder = DataSeeder(graph)
-        seeder.seed_from_json("data/medical_data.json")
-        print("[DATABASE] Seeded successfully")
-except Exception as e:
-    print(f"[DATABASE ERROR] {e}")
+    print(f"\n{'='*60}")
+    print(f"🔑 Configuration LLM:")
+    print(f"  Provider: Groq")
+    print(f"  Model: {groq_model}")
+    if groq_api_key:
+        print(f"  API Key: {groq_api_key[:15]}...{groq_api_key[-4:]}")
+    print(f"{'='*60}\n")
+    return groq_api_key, groq_model
+
+
+@st.cache_resource(show_spinner=False)
+def ensure_seeded() -> int:
+    """Auto-seed si la base est vide (une fois par processus). Retourne le nombre de nœuds."""
+    start = time.perf_counter()
+    node_count = 0
+    try:
+        graph = resources.get_graph()
+        result = graph.query("MATCH (n) RETURN count(n) as count")
+        node_count = result[0]['count'] if result else 0
+        
+        print(f"[DATABASE] {node_count} nodes found")
+        
+        if node_count == 0:
+            from src.database.data_seeder import DataSeeder
+            print("[DATABASE] Seeding...")
+            seeder = DataSeeder(graph)
+            seeder.seed_from_json("data/medical_data.json")
+            print("[DATABASE] Seeded successfully")
+    except Exception as e:
+        print(f"[DATABASE ERROR] {e}")
+    check_startup_budget("app.bootstrap", time.perf_counter() - start)
+    return node_count
+
+
+@st.cache_resource(show_spinner=False)
+def get_orchestrator() -> "MedicalCrewOrchestrator":
+    """Orchestrateur partagé par toutes les sessions (construit une seule fois)."""
+    return resources.get_orchestrator()
+
+
+GROQ_API_KEY, GROQ_MODEL = configure()
+ensure_seeded()
 
 # Interface Streamlit
 st.set_page_config(page_title="Medical RAG", layout="wide")
@@ -75,6 +99,25 @@ with st.sidebar:
     )
     if new_key:
         os.environ["GROQ_API_KEY"] = new_key
+        # La clé est lue à la construction: reconstruire seulement si elle change
+        if st.session_state.get("groq_key_override") != new_key:
+            st.session_state["groq_key_override"] = new_key
+            resources.reset()
+            get_orchestrator.clear()
+    
+    # Mode du pipeline
+    pipeline_mode = st.radio(
+        "Pipeline mode",
+        options=["fast", "crew"],
+        index=0 if os.getenv("PIPELINE_MODE", "crew") == "fast" else 1,
+        format_func=lambda m: "⚡ Fast (1 LLM call)" if m == "fast" else "🤖 Full crew (2 agents)",
+        help="Fast: deterministic graph retrieval + one LLM call. Full crew: for hard cases."
+    )
+    
+    show_timings = st.checkbox(
+        "Show timing breakdown",
+        help="Per-stage durations (retrieval, Cypher, LLM calls, graph queries)"
+    )
 
 # Main input
 question = st.text_area(
@@ -83,37 +126,72 @@ question = st.text_area(
     height=100
 )
 
+# Coût d'une exécution du script hors requête (premier rendu = démarrage à froid)
+check_startup_budget(
+    "app.rerun" if st.session_state.get("started") else "app.first_run",
+    time.perf_counter() - _RUN_START
+)
+st.session_state["started"] = True
+
 if st.button("🔍 Analyze Question", use_container_width=True):
     if not question:
         st.warning("⚠️ Please enter a question")
     elif not GROQ_API_KEY:
         st.error("❌ Groq API Key missing in .env")
     else:
-        with st.spinner("🤖 Analyzing (10-15 seconds)..."):
-            try:
-                # ✅ Vérifier variables avant exécution
-                print(f"\n[EXECUTION] Starting with:")
-                print(f"  GROQ_API_KEY: {os.getenv('GROQ_API_KEY')[:20]}...")
-                print(f"  OPENAI_API_KEY: {os.getenv('OPENAI_API_KEY', 'NOT SET')}")
-                
-                orchestrator = MedicalCrewOrchestrator()
-                result = orchestrator.run(question)
-                
-                st.subheader("📊 Results")
-                st.markdown(result)
-                
-            except Exception as e:
-                st.error(f"❌ Error: {e}")
-                
-                # Diagnostic détaillé
-                with st.expander("🔍 Debug Info"):
-                    st.code(f"""
+        st.subheader("📊 Results")
+        status = st.status("🤖 Analyzing...", expanded=False)
+        placeholder = st.empty()
+        
+        try:
+            # ✅ Vérifier variables avant exécution
+            print(f"\n[EXECUTION] Starting with:")
+            print(f"  GROQ_API_KEY: {os.getenv('GROQ_API_KEY')[:20]}...")
+            print(f"  OPENAI_API_KEY: {os.getenv('OPENAI_API_KEY', 'NOT SET')}")
+            
+            orchestrator = get_orchestrator()
+            streamed = ""
+            timings = []
+            
+            # Rendu incrémental: étapes dans le statut, tokens dans la réponse
+            for event in orchestrator.stream(question, mode=pipeline_mode):
+                if event["type"] == "status":
+                    status.update(label=event["text"])
+                elif event["type"] == "step":
+                    status.write(event["text"])
+                elif event["type"] == "token":
+                    streamed += event["text"]
+                    placeholder.markdown(streamed + "▌")
+                else:
+                    placeholder.markdown(event["text"])
+                    timings = event.get("timings", [])
+            
+            status.update(label="✅ Done", state="complete")
+            
+            if show_timings:
+                with st.expander("🔍 Debug Info: timing breakdown", expanded=True):
+                    st.dataframe([
+                        {
+                            "stage": "  " * row["depth"] + row["stage"],
+                            "start (ms)": row["start_ms"],
+                            "duration (ms)": row["duration_ms"],
+                        }
+                        for row in timings
+                    ], use_container_width=True)
+        
+        except Exception as e:
+            status.update(label="❌ Failed", state="error")
+            st.error(f"❌ Error: {e}")
+            
+            # Diagnostic détaillé
+            with st.expander("🔍 Debug Info"):
+                st.code(f"""
 Error: {str(e)}
 
 Environment Variables:
 - GROQ_API_KEY: {os.getenv('GROQ_API_KEY', 'NOT SET')[:20]}...
 - OPENAI_API_KEY: {os.getenv('OPENAI_API_KEY', 'NOT SET')}
 - GROQ_MODEL_NAME: {os.getenv('GROQ_MODEL_NAME', 'NOT SET')}
-                    """)
+                """)
 
 st.caption("⚠️ Educational purposes only")
\ No newline at end of file
@@ -0,0 +1,133 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.backends import FakeLLM, MemoryGraph, generate_catalog
+from src.database.data_seeder import DataSeeder
+from src.retrieval.symptom_index import SymptomIndex
+from src.retrieval.symptom_matcher import SymptomMatcher
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark hors ligne (graphe en mémoire + LLM déterministe)"
+    )
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="Tailles de catalogue synthétique, ex: 1000,10000,1000000")
+    parser.add_argument("--queries", type=int, default=200,
+                        help="Nombre de questions par scénario")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Nombre de threads envoyant les questions")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0,
+                        help="Latence simulée de chaque appel LLM")
+    parser.add_argument("--scenarios", default="matcher,index,fast,chain")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Écrit les résultats en JSON")
+    return parser.parse_args()
+
+def make_questions(catalog, count, rng):
+    """Questions du type "I have a, b and c" tirées des symptômes d'une maladie."""
+    questions = []
+    for _ in range(count):
+        symptoms = rng.choice(catalog)["symptomes"]
+        picked = rng.sample(symptoms, min(len(symptoms), rng.randint(2, 4)))
+        questions.append(f"I have {', '.join(picked[:-1])} and {picked[-1]}")
+    return questions
+
+def measure(fn, questions, concurrency):
+    """Latences p50/p95/p99 (ms) et débit (questions/s)."""
+    def timed(question):
+        start = time.perf_counter()
+        fn(question)
+        return (time.perf_counter() - start) * 1000
+    
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(timed, questions))
+    else:
+        latencies = [timed(q) for q in questions]
+    elapsed = time.perf_counter() - start
+    
+    latencies.sort()
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+    return {
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(pct(0.95), 3),
+        "p99_ms": round(pct(0.99), 3),
+        "qps": round(len(questions) / elapsed, 1),
+    }
+
+def seed(catalog):
+    """Peuple un MemoryGraph via DataSeeder (même chemin que Neo4j) et mesure le débit."""
+    graph = MemoryGraph()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(catalog, f, ensure_ascii=False)
+        start = time.perf_counter()
+        DataSeeder(graph).seed_from_json(path)
+        elapsed = time.perf_counter() - start
+    return graph, {"rows_per_s": round(len(catalog) / elapsed, 1), "seconds": round(elapsed, 3)}
+
+def build_scenario(name, graph, llm_latency_ms):
+    if name == "matcher":
+        matcher = SymptomMatcher(graph)
+        return matcher.search
+    if name == "index":
+        index = SymptomIndex.from_graph(graph)
+        return index.search
+    
+    # Les scénarios LLM passent par le tool et l'orchestrateur réels
+    from src.agents.crew_orchestrator import MedicalCrewOrchestrator
+    from src.tools.medical_rag_tool import MedicalRAGTool
+    matcher = SymptomMatcher(graph)
+    fake = FakeLLM(extract_symptoms=matcher.match, latency_ms=llm_latency_ms)
+    tool = MedicalRAGTool(graph=graph, llm=fake.get_llm(), retriever=matcher)
+    if name == "chain":
+        tool.qa_chain.verbose = False
+        return lambda q: tool.qa_chain.invoke({"query": q})
+    if name == "fast":
+        orchestrator = MedicalCrewOrchestrator(use_cache=False, groq=fake, tool=tool, mode="fast")
+        return orchestrator.run
+    raise ValueError(f"Unknown scenario: {name}")
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    results = []
+    
+    print("=" * 60)
+    print("⏱️  Offline benchmark (MemoryGraph + FakeLLM)")
+    print("=" * 60)
+    
+    for size in (int(s) for s in args.sizes.split(",")):
+        catalog = generate_catalog(size, seed=args.seed)
+        questions = make_questions(catalog, args.queries, rng)
+        graph, seeding = seed(catalog)
+        results.append({"size": size, "scenario": "seed", **seeding})
+        print(f"\n📦 {size} diseases — seeding {seeding['rows_per_s']} rows/s")
+        
+        for name in scenarios:
+            fn = build_scenario(name, graph, args.llm_latency_ms)
+            fn(questions[0])  # échauffement (index, caches de termes)
+            stats = measure(fn, questions, args.concurrency)
+            results.append({"size": size, "scenario": name, **stats})
+            print(
+                f"  {name:<8} p50 {stats['p50_ms']:>9.3f} ms  p95 {stats['p95_ms']:>9.3f} ms  "
+                f"p99 {stats['p99_ms']:>9.3f} ms  {stats['qps']:>9.1f} q/s"
+            )
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results written to {args.output}")
+    return True
+
+if __name__ == "__main__":
+    main()
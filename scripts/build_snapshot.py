@@ -0,0 +1,55 @@
+import argparse
+import sys
+import time
+from src import resources
+from src.database.catalog_reader import iter_catalog
+from src.database.neo4j_connector import tenant_route
+from src.database.graph_version import read_graph_version
+from src.retrieval.snapshot import Snapshot, build_snapshot
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Compile le catalogue en snapshot binaire (mmap, sans copie)"
+    )
+    parser.add_argument("--json-path", default="data/medical_data.json")
+    parser.add_argument("--output", default=None,
+                        help="Fichier snapshot (défaut: snapshot_path du tenant, sinon data/catalog.snap)")
+    parser.add_argument("--tenant", default=None, help="Tenant dont le graphe reflète ce catalogue")
+    parser.add_argument("--graph-version", type=int, default=None,
+                        help="Version du graphe enregistrée (défaut: version persistée lue dans le graphe)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    
+    print("=" * 60)
+    print("📦 Catalog snapshot build")
+    print("=" * 60)
+    
+    # Version du graphe peuplé avec ce catalogue: un index adossé au snapshot
+    # se reconstruit depuis le graphe dès que celui-ci a été réécrit
+    graph_version = args.graph_version
+    if graph_version is None:
+        try:
+            graph_version = read_graph_version(resources.get_graph(args.tenant))
+        except Exception as e:
+            print(f"❌ Cannot read the graph version ({e}); pass --graph-version")
+            return False
+    
+    output = args.output or (tenant_route(args.tenant) or {}).get("snapshot_path") or "data/catalog.snap"
+    build_snapshot(iter_catalog(args.json_path), output, graph_version)
+    
+    # Vérification: ouverture et lecture d'un profil
+    start = time.perf_counter()
+    snapshot = Snapshot(output)
+    elapsed = (time.perf_counter() - start) * 1000
+    diseases = snapshot.tables["disease"]
+    print(f"⚡ Opened in {elapsed:.2f} ms (sha1 {snapshot.meta['catalog_sha1'][:12]}, "
+          f"graph v{snapshot.graph_version})")
+    if len(diseases):
+        profile = snapshot.profile(diseases[0])
+        print(f"  - {profile['disease']}: {profile['counts']}")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,37 @@
+import argparse
+from src.database.neo4j_connector import tenant_route
+from src.retrieval.vector_index import VectorIndex, describe_catalog, describe_graph
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Construit l'index vectoriel (CPU) des nœuds")
+    parser.add_argument("--json-path", default="data/medical_data.json")
+    parser.add_argument("--from-graph", action="store_true",
+                        help="Lit les nœuds depuis Neo4j au lieu du JSON")
+    parser.add_argument("--tenant", default=None, help="Tenant dont le graphe et l'index sont visés")
+    parser.add_argument("--output", default=None,
+                        help="Répertoire de l'index (défaut: vector_index_dir du tenant, sinon data/vector_index)")
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--lists", type=int, default=None,
+                        help="Nombre de listes IVF (défaut: racine du nombre de nœuds)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    
+    if args.from_graph:
+        from src.database.neo4j_connector import Neo4jConnector
+        nodes = describe_graph(Neo4jConnector(args.tenant).get_graph())
+    else:
+        nodes = describe_catalog(args.json_path)
+    
+    output = args.output or (tenant_route(args.tenant) or {}).get("vector_index_dir") or "data/vector_index"
+    index = VectorIndex.build(nodes, output, dim=args.dim, n_lists=args.lists)
+    
+    # Vérification rapide
+    for hit in index.search("shortness of breath", k=3):
+        print(f"  - {hit['label']}: {hit['name']} ({hit['score']:.2f})")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,76 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Points d'entrée mesurés: import seul (chaque rerun Streamlit) puis construction complète
+IMPORT_TARGETS = [
+    "src.resources",
+    "src.agents",
+    "src.tools",
+    "src.models",
+    "src.database.neo4j_connector",
+    "src.cache",
+    "api",
+]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import importlib
+importlib.import_module(sys.argv[1])
+imported = time.perf_counter() - start
+heavy = sorted(m for m in ("crewai", "litellm", "langchain_groq", "langchain_community") if m in sys.modules)
+built = None
+if len(sys.argv) > 2:
+    from src import resources
+    resources.get_orchestrator()
+    built = time.perf_counter() - start
+print(json.dumps({"import_s": imported, "build_s": built, "heavy": heavy}))
+"""
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Mesure le démarrage à froid (interpréteur neuf par module) contre STARTUP_BUDGET_MS"
+    )
+    parser.add_argument("--modules", default=",".join(IMPORT_TARGETS))
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", 2000)))
+    parser.add_argument("--build", action="store_true",
+                        help="Construit aussi l'orchestrateur (utiliser GRAPH_BACKEND=memory LLM_BACKEND=fake hors ligne)")
+    return parser.parse_args()
+
+def probe(module, build):
+    argv = [sys.executable, "-c", PROBE, module] + (["build"] if build else [])
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [os.getcwd(), os.getenv("PYTHONPATH")]))}
+    result = subprocess.run(argv, capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(f"{module}: {result.stderr.strip().splitlines()[-1:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    args = parse_args()
+    
+    print("=" * 60)
+    print(f"⏱️ Cold start check (budget {args.budget_ms:.0f} ms)")
+    print("=" * 60)
+    
+    ok = True
+    for module in args.modules.split(","):
+        stats = probe(module, build=False)
+        elapsed = stats["import_s"] * 1000
+        within = elapsed <= args.budget_ms
+        ok &= within
+        heavy = ", ".join(stats["heavy"]) or "-"
+        print(f"  {'✅' if within else '❌'} import {module:<32} {elapsed:>8.0f} ms  heavy: {heavy}")
+    
+    if args.build:
+        stats = probe("src.resources", build=True)
+        elapsed = stats["build_s"] * 1000
+        print(f"  ℹ️ orchestrator build (imports + init)   {elapsed:>8.0f} ms")
+    
+    print("\n✅ Within budget" if ok else "\n❌ Startup budget exceeded")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
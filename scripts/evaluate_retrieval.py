@@ -0,0 +1,273 @@
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from src.backends import FakeLLM, MemoryGraph
+from src.database.catalog_reader import iter_catalog
+from src.database.data_seeder import DataSeeder
+from src.retrieval.symptom_index import SCORING_METHODS, SymptomIndex
+from src.retrieval.symptom_matcher import RANKING_QUERIES, SymptomMatcher
+from src.retrieval.term_index import load_synonyms
+
+# Gabarits de questions par langue ({symptoms} = liste jointe)
+TEMPLATES = {
+    "fr": [
+        "J'ai {symptoms}",
+        "Je souffre de {symptoms} depuis quelques jours",
+        "Qu'est-ce qui peut causer {symptoms} ?",
+        "Mon fils a {symptoms}, c'est grave ?",
+    ],
+    "en": [
+        "I have {symptoms}",
+        "I've been suffering from {symptoms} for a few days",
+        "What could cause {symptoms}?",
+        "My son has {symptoms}, is it serious?",
+    ],
+}
+CONJUNCTIONS = {"fr": " et ", "en": " and "}
+
+# Mots outils: une variante qui en contient un n'est pas considérée comme anglaise
+FRENCH_FUNCTION_WORDS = frozenset({"de", "du", "des", "la", "le", "les", "au", "aux", "à", "en", "et", "un", "une"})
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Qualité (recall@k, MRR) et latence de chaque backend de recherche, hors ligne"
+    )
+    parser.add_argument("--json-path", default="data/medical_data.json",
+                        help="Catalogue servant de vérité terrain")
+    parser.add_argument("--per-disease", type=int, default=20,
+                        help="Questions générées par maladie et par langue")
+    parser.add_argument("--languages", default="fr,en")
+    parser.add_argument("--typo-rate", type=float, default=0.15,
+                        help="Probabilité de faute de frappe par symptôme cité")
+    parser.add_argument("--distractor-rate", type=float, default=0.2,
+                        help="Probabilité d'ajouter un symptôme d'une autre maladie")
+    parser.add_argument("--k", default="1,3,5", help="Rangs évalués pour recall@k")
+    parser.add_argument("--backends", default="all",
+                        help="all, ou liste parmi: matcher:<scoring>, index:<scoring>, vector, tool, chain")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Écrit les résultats en JSON")
+    parser.add_argument("--baseline", default=None,
+                        help="Résultats JSON précédents: affiche les écarts, échec si régression")
+    parser.add_argument("--tolerance", type=float, default=0.02,
+                        help="Baisse de recall@k/MRR tolérée par rapport à la référence")
+    return parser.parse_args()
+
+def english_variants(synonyms):
+    """{symptôme canonique: variantes anglaises} (heuristique: ASCII, sans mot outil français)."""
+    variants = {}
+    for name, values in synonyms.items():
+        variants[name] = [
+            v for v in values
+            if v.isascii() and not FRENCH_FUNCTION_WORDS.intersection(v.lower().split())
+        ]
+    return variants
+
+def add_typo(text, rng):
+    """Inverse, supprime ou double un caractère d'un mot assez long."""
+    words = text.split()
+    candidates = [i for i, w in enumerate(words) if len(w) > 4]
+    if not candidates:
+        return text
+    i = rng.choice(candidates)
+    word, pos = words[i], rng.randrange(1, len(words[i]) - 2)
+    kind = rng.choice(("swap", "drop", "double"))
+    if kind == "swap":
+        word = word[:pos] + word[pos + 1] + word[pos] + word[pos + 2:]
+    elif kind == "drop":
+        word = word[:pos] + word[pos + 1:]
+    else:
+        word = word[:pos] + word[pos] + word[pos:]
+    words[i] = word
+    return " ".join(words)
+
+def make_queries(catalog, args, rng):
+    """Questions synthétiques: sous-ensemble des symptômes, langue, fautes, symptôme parasite."""
+    synonyms = load_synonyms()
+    english = english_variants(synonyms)
+    all_symptoms = sorted({s for entry in catalog for s in entry["symptomes"]})
+    queries = []
+    for entry in catalog:
+        own = entry["symptomes"]
+        for lang in args.languages.split(","):
+            for _ in range(args.per_disease):
+                picked = rng.sample(own, rng.randint(1, min(4, len(own))))
+                if rng.random() < args.distractor_rate:
+                    others = [s for s in all_symptoms if s not in own]
+                    if others:
+                        picked.append(rng.choice(others))
+                rendered = []
+                for symptom in picked:
+                    if lang == "en" and english.get(symptom):
+                        symptom = rng.choice(english[symptom])
+                    if rng.random() < args.typo_rate:
+                        symptom = add_typo(symptom, rng)
+                    rendered.append(symptom)
+                listed = ", ".join(rendered[:-1]) + CONJUNCTIONS[lang] + rendered[-1] if len(rendered) > 1 else rendered[0]
+                queries.append({
+                    "question": rng.choice(TEMPLATES[lang]).format(symptoms=listed),
+                    "lang": lang,
+                    "expected": entry["maladie"],
+                })
+    return queries
+
+def seed(json_path):
+    graph = MemoryGraph()
+    DataSeeder(graph).seed_from_json(json_path)
+    return graph
+
+def build_backends(names, graph, limit):
+    """{nom: fonction question -> maladies classées}; les index sont construits ici (hors mesure)."""
+    if names == "all":
+        names = (
+            [f"matcher:{s}" for s in RANKING_QUERIES]
+            + [f"index:{s}" for s in SCORING_METHODS]
+            + ["vector", "tool", "chain"]
+        )
+    else:
+        names = [n.strip() for n in names.split(",") if n.strip()]
+    
+    backends = {}
+    for name in names:
+        kind, _, scoring = name.partition(":")
+        if kind == "matcher":
+            matcher = SymptomMatcher(graph, scoring=scoring or "overlap", limit=limit)
+            backends[name] = lambda q, m=matcher: [r["disease"] for r in m.search(q)["diseases"]]
+        elif kind == "index":
+            index = SymptomIndex.from_graph(graph, scoring=scoring or "bm25", limit=limit)
+            backends[name] = lambda q, i=index: [r["disease"] for r in i.search(q)["diseases"]]
+        elif kind == "vector":
+            backends[name] = _vector_backend(graph, limit)
+        elif kind in ("tool", "chain"):
+            backends[name] = _tool_backend(kind, graph, limit)
+        else:
+            raise ValueError(f"Unknown backend: {name}")
+    return backends
+
+def _vector_backend(graph, limit):
+    """Symptômes proches dans l'index vectoriel (toute la question), puis classement graphe."""
+    from src.retrieval.vector_index import VectorIndex, describe_graph
+    directory = tempfile.TemporaryDirectory(prefix="eval_vectors_")
+    index = VectorIndex.build(describe_graph(graph), directory.name)
+    matcher = SymptomMatcher(graph, limit=limit)
+    
+    def search(question):
+        hits = index.search(question, k=5, labels=("Symptom",), min_score=0.3)
+        return [r["disease"] for r in matcher.rank([hit["name"] for hit in hits])]
+    search.directory = directory  # supprimé avec la fonction
+    return search
+
+def _tool_backend(kind, graph, limit):
+    """Tool réel: recherche native de production (`retrieve`) ou GraphCypherQAChain (LLM local)."""
+    from src.tools.medical_rag_tool import MedicalRAGTool
+    matcher = SymptomMatcher(graph, limit=limit)
+    fake = FakeLLM(extract_symptoms=matcher.match)
+    tool = MedicalRAGTool(graph=graph, llm=fake.get_llm(), retriever=matcher)
+    if kind == "tool":
+        return lambda q: [r["disease"] for r in (tool.retrieve(q) or {"diseases": []})["diseases"]]
+    
+    tool.qa_chain.verbose = False
+    
+    def search(question):
+        response = tool.qa_chain.invoke({"query": question})
+        diseases = []
+        for step in response.get("intermediate_steps", []):
+            for row in step.get("context", []) if isinstance(step, dict) else []:
+                if isinstance(row, dict) and row.get("disease"):
+                    diseases.append(row["disease"])
+        return list(dict.fromkeys(diseases))[:limit]
+    return search
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+def evaluate(search, queries, ks):
+    """recall@k, MRR, part de réponses vides et latences (ms), global et par langue."""
+    rows = []
+    for query in queries:
+        start = time.perf_counter()
+        ranked = search(query["question"])
+        latency = (time.perf_counter() - start) * 1000
+        rank = ranked.index(query["expected"]) + 1 if query["expected"] in ranked else None
+        rows.append((query["lang"], rank, not ranked, latency))
+    
+    def summarize(subset):
+        latencies = [r[3] for r in subset]
+        stats = {f"recall@{k}": round(sum(1 for r in subset if r[1] and r[1] <= k) / len(subset), 4) for k in ks}
+        stats["mrr"] = round(sum(1 / r[1] for r in subset if r[1]) / len(subset), 4)
+        stats["empty"] = round(sum(1 for r in subset if r[2]) / len(subset), 4)
+        stats["p50_ms"] = round(statistics.median(latencies), 3)
+        stats["p95_ms"] = round(percentile(latencies, 0.95), 3)
+        stats["p99_ms"] = round(percentile(latencies, 0.99), 3)
+        return stats
+    
+    result = {"all": summarize(rows)}
+    for lang in sorted({r[0] for r in rows}):
+        result[lang] = summarize([r for r in rows if r[0] == lang])
+    return result
+
+def compare(results, baseline, ks, tolerance):
+    """Écarts de qualité par rapport à la référence; retourne les régressions."""
+    regressions = []
+    for name, stats in results.items():
+        previous = baseline.get(name, {}).get("all")
+        if not previous:
+            continue
+        for metric in [f"recall@{k}" for k in ks] + ["mrr"]:
+            delta = stats["all"][metric] - previous.get(metric, 0.0)
+            if delta < -tolerance:
+                regressions.append(f"{name} {metric} {previous[metric]:.3f} → {stats['all'][metric]:.3f}")
+        speedup = previous["p50_ms"] / stats["all"]["p50_ms"] if stats["all"]["p50_ms"] else float("inf")
+        print(f"  {name:<16} Δmrr {stats['all']['mrr'] - previous['mrr']:+.3f}  p50 ×{speedup:.2f} vs baseline")
+    return regressions
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+    ks = [int(k) for k in args.k.split(",")]
+    
+    print("=" * 60)
+    print("🎯 Retrieval evaluation (MemoryGraph + FakeLLM, offline)")
+    print("=" * 60)
+    
+    catalog = list(iter_catalog(args.json_path))
+    queries = make_queries(catalog, args, rng)
+    graph = seed(args.json_path)
+    backends = build_backends(args.backends, graph, max(ks))
+    print(f"\n📋 {len(queries)} queries over {len(catalog)} diseases, {len(backends)} backends\n")
+    
+    header = "  ".join(f"R@{k:<4}" for k in ks)
+    print(f"  {'backend':<16} {'lang':<4} {header}  MRR    empty   p50 ms    p95 ms    p99 ms")
+    results = {}
+    for name, search in backends.items():
+        search(queries[0]["question"])  # échauffement (vocabulaire, caches)
+        results[name] = evaluate(search, queries, ks)
+        for lang, stats in results[name].items():
+            recalls = "  ".join(f"{stats[f'recall@{k}']:.3f}" for k in ks)
+            print(
+                f"  {name:<16} {lang:<4} {recalls}  {stats['mrr']:.3f}  {stats['empty']:.3f}  "
+                f"{stats['p50_ms']:>8.3f}  {stats['p95_ms']:>8.3f}  {stats['p99_ms']:>8.3f}"
+            )
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results written to {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\n📊 Compared to {args.baseline}")
+        regressions = compare(results, baseline, ks, args.tolerance)
+        for regression in regressions:
+            print(f"  ❌ {regression}")
+        if regressions:
+            return False
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -1,13 +1,37 @@
+import argparse
 from src.database.neo4j_connector import Neo4jConnector
 from src.database.data_seeder import DataSeeder
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Peuple Neo4j avec le catalogue médical")
+    parser.add_argument("--json-path", default="data/medical_data.json")
+    parser.add_argument(
+        "--batch-size", type=int, default=1000,
+        help="Nombre de maladies par transaction UNWIND"
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="Reprend l'ingestion depuis le dernier checkpoint"
+    )
+    parser.add_argument(
+        "--tenant", default=None,
+        help="Tenant (clinique) de la table de routage NEO4J_TENANTS"
+    )
+    parser.add_argument(
+        "--delta", action="store_true",
+        help="Ne réécrit que les maladies modifiées et supprime celles retirées"
+    )
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    
     print("=" * 60)
     print("🏥 Medical Database Population")
     print("=" * 60)
     
     # Connexion
-    connector = Neo4jConnector()
+    connector = Neo4jConnector(args.tenant)
     if not connector.test_connection():
         print("❌ Cannot connect to Neo4j")
         return False
@@ -15,9 +39,13 @@ def main():
     graph = connector.get_graph()
     
     # Seeding
-    seeder = DataSeeder(graph)
-    seeder.clear_database()
-    success = seeder.seed_from_json("data/medical_data.json")
+    seeder = DataSeeder(graph, batch_size=args.batch_size, tenant=args.tenant)
+    if args.delta:
+        success = seeder.seed_delta(args.json_path)
+    else:
+        if not args.resume:
+            seeder.clear_database()
+        success = seeder.seed_from_json(args.json_path, resume=args.resume)
     
     if success:
         # Stats
@@ -30,4 +58,4 @@ def main():
 
 if __name__ == "__main__":
     success = main()
-    exit(0 if success else 1)
\ No newline at end of file
+    exit(0 if success else 1)
@@ -0,0 +1,197 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from src import resources
+from src.cache.cypher_cache import question_key
+from src.tools.language_detector import LanguageDetector
+from src.utils.concurrency import AsyncRateLimiter
+from src.utils.env import load_env
+from src.utils.tracing import metrics
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Rejoue un fichier JSONL de questions (dédoublonnage, recherche groupée, LLM en parallèle)"
+    )
+    parser.add_argument("input", help='JSONL: {"question": ..., "id": ...} ou une chaîne par ligne')
+    parser.add_argument("--output", default=None, help="JSONL des réponses (défaut: <input>.answers.jsonl)")
+    parser.add_argument("--mode", choices=["fast", "crew"], default=None,
+                        help="Pipeline (défaut: PIPELINE_MODE)")
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="Questions par passe de recherche (une requête UNWIND par passe)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("MAX_CONCURRENT_QUESTIONS", 8)),
+                        help="Appels LLM simultanés")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="Requêtes LLM par seconde (défaut: GROQ_RATE_LIMIT)")
+    parser.add_argument("--retries", type=int, default=3, help="Nouvelles tentatives par question")
+    parser.add_argument("--backoff", type=float, default=2.0, help="Attente initiale entre tentatives (s)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Reprend après les lignes déjà présentes dans le fichier de sortie")
+    return parser.parse_args()
+
+def read_questions(path):
+    """(numéro de ligne, id, question) pour chaque ligne non vide."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                yield line_no, None, record
+            else:
+                yield line_no, record.get("id"), record["question"]
+
+def load_progress(path):
+    """
+    Lignes déjà répondues et réponses réussies par clé (sortie d'une exécution
+    précédente). Le fichier est réécrit sans les erreurs, qui seront retentées,
+    ni la dernière ligne si elle a été tronquée par un arrêt brutal.
+    """
+    done, answers, kept = set(), {}, []
+    if not os.path.exists(path):
+        return done, answers
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            record = json.loads(line)
+            if record["status"] != "ok":
+                continue
+            done.add(record["line"])
+            answers.setdefault(record["key"], record)
+            kept.append(line)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.writelines(kept)
+    os.replace(tmp, path)
+    return done, answers
+
+class FailedAnswer(RuntimeError):
+    """Réponse d'erreur ("❌ ...") renvoyée par le pipeline au lieu d'une exception."""
+
+def with_retry(fn, retries, backoff):
+    """
+    Appelle `fn` avec attente exponentielle (+ gigue); retourne (résultat, tentatives).
+    Une réponse commençant par "❌" est un échec: retentée, puis levée.
+    """
+    for attempt in range(retries + 1):
+        try:
+            result = fn()
+            if isinstance(result, str) and result.startswith("❌"):
+                raise FailedAnswer(result)
+            return result, attempt + 1
+        except Exception:
+            if attempt == retries:
+                raise
+            metrics.inc("rag_llm_retries_total", kind="batch")
+            time.sleep(backoff * (2 ** attempt) * (0.5 + random.random()))
+
+def main():
+    load_env()
+    args = parse_args()
+    output = args.output or f"{args.input}.answers.jsonl"
+    
+    print("=" * 60)
+    print("🔁 Batch question replay")
+    print("=" * 60)
+    
+    orchestrator = resources.get_orchestrator()
+    tool = orchestrator.tool
+    mode = args.mode or orchestrator.mode
+    if args.rate is not None:
+        orchestrator.rate_limiter = AsyncRateLimiter(args.rate, max(1, args.workers))
+    if tool.retriever is None:
+        print("❌ Native retrieval is disabled: nothing to batch")
+        return False
+    
+    done, answers = load_progress(output) if args.resume else (set(), {})
+    if done:
+        print(f"📥 Resuming: {len(done)} questions already answered in {output} (failed ones are retried)")
+    
+    stats = {"questions": 0, "unique": 0, "llm": 0, "errors": 0}
+    start = time.perf_counter()
+    pending = (row for row in read_questions(args.input) if row[0] not in done)
+    
+    with open(output, "a" if args.resume else "w", encoding="utf-8") as out, \
+            ThreadPoolExecutor(max_workers=args.workers) as pool:
+        
+        def write(record):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        
+        while True:
+            chunk = list(islice(pending, args.chunk_size))
+            if not chunk:
+                break
+            stats["questions"] += len(chunk)
+            
+            # Dédoublonnage: jeu canonique de symptômes (ou texte normalisé) + langue
+            groups = {}
+            for line_no, qid, question in chunk:
+                symptoms = tool.retriever.match(question)
+                lang = LanguageDetector.detect(question)
+                key = f"{lang}:{question_key(question, symptoms)}"
+                groups.setdefault(key, {"symptoms": symptoms, "lang": lang, "rows": []})
+                groups[key]["rows"].append((line_no, qid, question))
+            
+            # Réponses déjà obtenues (exécution précédente ou passe précédente)
+            for key in [k for k in groups if k in answers]:
+                for line_no, qid, question in groups.pop(key)["rows"]:
+                    write({**answers[key], "line": line_no, "id": qid, "question": question,
+                           "duplicate_of": answers[key]["line"]})
+            stats["unique"] += len(groups)
+            
+            # Recherche groupée: un classement et une lecture des profils pour toute la passe
+            keys = list(groups)
+            natives = tool.retrieve_many(
+                [groups[k]["rows"][0][2] for k in keys], [groups[k]["symptoms"] for k in keys]
+            )
+            
+            futures = {}
+            for key, native in zip(keys, natives):
+                question = groups[key]["rows"][0][2]
+                futures[pool.submit(
+                    with_retry, lambda q=question, n=native: orchestrator.run_prepared(q, n, mode),
+                    args.retries, args.backoff
+                )] = (key, native, time.perf_counter())
+            
+            for future in as_completed(futures):
+                key, native, submitted = futures[future]
+                group = groups[key]
+                first = group["rows"][0][0]
+                base = {
+                    "key": key,
+                    "lang": group["lang"],
+                    "symptoms": group["symptoms"],
+                    "diseases": [row["disease"] for row in native["diseases"]] if native else [],
+                    "latency_ms": round((time.perf_counter() - submitted) * 1000, 1),
+                }
+                try:
+                    answer, attempts = future.result()
+                    base.update(status="ok", answer=answer, attempts=attempts)
+                    stats["llm"] += 1
+                except Exception as e:
+                    base.update(status="error", error=str(e), attempts=args.retries + 1)
+                    stats["errors"] += 1
+                
+                for line_no, qid, question in group["rows"]:
+                    write({**base, "line": line_no, "id": qid, "question": question,
+                           "duplicate_of": None if line_no == first else first})
+                if base["status"] == "ok":
+                    answers[key] = {**base, "line": first}
+            
+            out.flush()
+            elapsed = time.perf_counter() - start
+            print(f"  ✅ {stats['questions']} questions ({stats['unique']} unique, "
+                  f"{stats['errors']} errors) — {stats['questions'] / elapsed:.1f} q/s")
+    
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ Replay finished in {elapsed:.1f}s: {stats} → {output}")
+    return stats["errors"] == 0
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -1,8 +1,12 @@
 """
 Agents package
 """
-from .medical_diagnostician import MedicalDiagnostician
-from .medical_explainer import MedicalExplainer
-from .crew_orchestrator import MedicalCrewOrchestrator
+from ..utils.lazy import lazy_exports
 
-__all__ = ['MedicalDiagnostician', 'MedicalExplainer', 'MedicalCrewOrchestrator']
\ No newline at end of file
+__all__ = ['MedicalDiagnostician', 'MedicalExplainer', 'MedicalCrewOrchestrator']
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'MedicalDiagnostician': '.medical_diagnostician',
+    'MedicalExplainer': '.medical_explainer',
+    'MedicalCrewOrchestrator': '.crew_orchestrator',
+})
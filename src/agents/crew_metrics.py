@@ -0,0 +1,72 @@
+import threading
+from ..models.llm_metrics import record_usage
+from ..utils.tracing import metrics, record_span, STAGE_ERRORS
+
+# Événements CrewAI (emplacement variable selon la version installée)
+try:
+    from crewai.events import crewai_event_bus
+    from crewai.events.types.llm_events import (
+        LLMCallStartedEvent, LLMCallCompletedEvent, LLMCallFailedEvent
+    )
+    from crewai.events.types.tool_usage_events import ToolUsageErrorEvent, ToolUsageFinishedEvent
+except ImportError:
+    crewai_event_bus = None
+
+
+class CrewMetrics:
+    """
+    Abonné global au bus CrewAI: durée et tokens de chaque appel LLM des
+    agents, échecs LLM et erreurs d'outil (chaque erreur provoque une
+    nouvelle itération de l'agent, comptée comme retry).
+    """
+    
+    _started = {}
+    _lock = threading.Lock()
+    _installed = False
+    
+    @classmethod
+    def install(cls):
+        with cls._lock:
+            if cls._installed or crewai_event_bus is None:
+                return
+            crewai_event_bus.register_handler(LLMCallStartedEvent, cls._on_llm_started)
+            crewai_event_bus.register_handler(LLMCallCompletedEvent, cls._on_llm_completed)
+            crewai_event_bus.register_handler(LLMCallFailedEvent, cls._on_llm_failed)
+            crewai_event_bus.register_handler(ToolUsageFinishedEvent, cls._on_tool_finished)
+            crewai_event_bus.register_handler(ToolUsageErrorEvent, cls._on_tool_error)
+            cls._installed = True
+    
+    @staticmethod
+    def _stage(event) -> str:
+        return f"agent.llm[{event.agent_role}]" if event.agent_role else "agent.llm"
+    
+    @classmethod
+    def _on_llm_started(cls, source, event):
+        with cls._lock:
+            cls._started[event.call_id] = event.timestamp
+    
+    @classmethod
+    def _on_llm_completed(cls, source, event):
+        with cls._lock:
+            started = cls._started.pop(event.call_id, None)
+        if started is not None:
+            record_span(cls._stage(event), (event.timestamp - started).total_seconds(),
+                        model=event.model)
+        metrics.inc("rag_llm_calls_total", model=event.model or "unknown")
+        record_usage(event.model or "unknown", event.usage)
+    
+    @classmethod
+    def _on_llm_failed(cls, source, event):
+        with cls._lock:
+            cls._started.pop(event.call_id, None)
+        metrics.inc(STAGE_ERRORS, stage=cls._stage(event))
+        metrics.inc("rag_llm_retries_total", kind="llm")
+    
+    @classmethod
+    def _on_tool_finished(cls, source, event):
+        duration = (event.finished_at - event.started_at).total_seconds()
+        record_span(f"agent.tool[{event.tool_name}]", duration)
+    
+    @classmethod
+    def _on_tool_error(cls, source, event):
+        metrics.inc("rag_llm_retries_total", kind="tool")
@@ -1,13 +1,44 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from typing import Iterator
 from crewai import Task, Crew, Process, LLM
 from .medical_diagnostician import MedicalDiagnostician
 from .medical_explainer import MedicalExplainer
+from .crew_metrics import CrewMetrics
+from .streaming import ChunkRouter, describe_step
+from ..cache.answer_cache import AnswerCache
 from ..models.groq_llm import GroqLLM
+from ..prompts.fast_prompts import get_fast_answer_prompt
+from ..tools.language_detector import LanguageDetector
+from ..utils.concurrency import BoundedScheduler, get_rate_limiter
+from ..utils.tracing import Trace, metrics, record_span, span, traced, STAGE_DURATION
 
 class MedicalCrewOrchestrator:
-    """Orchestre les agents avec Groq via LiteLLM."""
+    """
+    Orchestre les agents avec Groq via LiteLLM.
     
-    def __init__(self):
-        groq = GroqLLM()
+    Modes:
+    - "crew": Diagnostician (tool RAG) puis Explainer, plusieurs appels LLM.
+    - "fast": recherche déterministe puis un seul appel LLM; repli sur le
+      crew si aucun symptôme connu n'est reconnu dans la question.
+    """
+    
+    MODES = ("crew", "fast")
+    
+    # Appels LLM réservés auprès du limiteur Groq pour une exécution du crew
+    CREW_LLM_CALLS = 4
+    
+    def __init__(self, use_cache: bool = True, groq: GroqLLM = None, tool=None,
+                 scheduler: BoundedScheduler = None, mode: str = None):
+        groq = groq or GroqLLM()
+        self.groq = groq
+        self.mode = mode or os.getenv("PIPELINE_MODE", "crew")
+        if self.mode not in self.MODES:
+            raise ValueError(f"❌ Unknown pipeline mode: {self.mode}")
+        self.fast_prompt = get_fast_answer_prompt()
         
         # ✅ Utiliser LLM de CrewAI avec LiteLLM
         self.llm = LLM(
@@ -15,13 +46,239 @@ class MedicalCrewOrchestrator:
             api_key=groq.api_key,
             temperature=0.3
         )
+        # Variante en streaming pour la réponse finale de l'explainer
+        self.streaming_llm = LLM(
+            model=groq.get_model_name(),
+            api_key=groq.api_key,
+            temperature=0.3,
+            stream=True
+        )
         
-        # Passer le LLM aux agents
-        self.diagnostician = MedicalDiagnostician(self.llm).create_agent()
-        self.explainer = MedicalExplainer(self.llm).create_agent()
+        # Passer le LLM aux agents (tool partagé; agents recréés à chaque run
+        # car CrewAI garde un état d'exécution par agent)
+        self._diagnostician = MedicalDiagnostician(self.llm, tool)
+        self._explainer = MedicalExplainer(self.llm)
+        self.tool = self._diagnostician.tool
+        
+        # Concurrence bornée et limitation de débit (chemin asynchrone)
+        self.scheduler = scheduler or BoundedScheduler()
+        self.rate_limiter = get_rate_limiter("groq")
+        
+        # Durées et tokens des appels LLM des agents (bus d'événements CrewAI)
+        CrewMetrics.install()
+        
+        # Cache des réponses (invalidé par la version du graphe)
+        self.answer_cache = None
+        if use_cache:
+            retriever = self.tool.retriever
+            self.answer_cache = AnswerCache.from_env(
+                self.tool.graph, retriever.match if retriever is not None else None,
+                tenant=self.tool.tenant
+            )
     
-    def run(self, symptoms: str) -> str:
-        """Exécute le workflow complet."""
+    @traced("orchestrator.run")
+    def run(self, symptoms: str, mode: str = None) -> str:
+        """
+        Exécute le workflow complet (ou renvoie la réponse en cache). Les
+        appels LLM attendent le limiteur de débit Groq partagé, comme `arun`.
+        """
+        mode = mode or self.mode
+        cache_key = None
+        if self.answer_cache is not None:
+            cache_key, cached = self.answer_cache.lookup(symptoms, mode)
+            if cached is not None:
+                return cached
+        
+        if mode == "fast":
+            result = self._run_fast(symptoms)
+        else:
+            result = self._run_crew(symptoms)
+        
+        if cache_key is not None and not result.startswith("❌"):
+            self.answer_cache.store_answer(cache_key, result)
+        return result
+    
+    @traced("orchestrator.run")
+    async def arun(self, symptoms: str, mode: str = None) -> str:
+        """
+        Variante asynchrone de `run`: la question attend son tour dans le
+        scheduler (coroutine, sans thread) puis le crew s'exécute via `kickoff_async`.
+        """
+        mode = mode or self.mode
+        cache_key = None
+        if self.answer_cache is not None:
+            cache_key, cached = await asyncio.to_thread(self.answer_cache.lookup, symptoms, mode)
+            if cached is not None:
+                return cached
+        
+        async with self.scheduler.slot():
+            native = await self.tool.aretrieve(symptoms) if mode == "fast" else None
+            if native:
+                with span("rate_limit.wait"):
+                    await self.rate_limiter.acquire(1)
+                result = await self.groq.acomplete(self._fast_prompt(symptoms, native))
+            else:
+                with span("rate_limit.wait"):
+                    await self.rate_limiter.acquire(self.CREW_LLM_CALLS)
+                with span("crew"):
+                    result = str(await self._build_crew(symptoms).kickoff_async())
+        
+        if cache_key is not None and not result.startswith("❌"):
+            self.answer_cache.store_answer(cache_key, result)
+        return result
+    
+    def run_prepared(self, symptoms: str, native: dict = None, mode: str = None) -> str:
+        """
+        `run` pour les traitements par lots (thread de travail): la recherche
+        est déjà faite (`tool.retrieve_many`) et les appels LLM attendent le
+        limiteur de débit partagé.
+        """
+        mode = mode or self.mode
+        cache_key = None
+        if self.answer_cache is not None:
+            cache_key, cached = self.answer_cache.lookup(symptoms, mode)
+            if cached is not None:
+                return cached
+        
+        if mode == "fast" and native:
+            result = self._complete_fast(symptoms, native)
+        else:
+            # Repli (recherche vectorielle puis crew) ou crew complet
+            result = self._run_fast(symptoms) if mode == "fast" else self._run_crew(symptoms)
+        
+        if cache_key is not None and not result.startswith("❌"):
+            self.answer_cache.store_answer(cache_key, result)
+        return result
+    
+    def _run_fast(self, symptoms: str) -> str:
+        """Recherche déterministe + un seul appel LLM (repli crew si rien n'est reconnu)."""
+        native = self.tool.retrieve(symptoms)
+        if not native:
+            return self._run_crew(symptoms)
+        return self._complete_fast(symptoms, native)
+    
+    def _complete_fast(self, symptoms: str, native: dict) -> str:
+        """Appel LLM unique du mode fast, après passage par le limiteur partagé."""
+        with span("rate_limit.wait"):
+            self.rate_limiter.acquire_sync(1)
+        return self.groq.complete(self._fast_prompt(symptoms, native))
+    
+    def _fast_prompt(self, question: str, native: dict) -> str:
+        lang = LanguageDetector.detect(question)
+        prompt = self.fast_prompt.format(
+            context=self.tool.format_context(native, lang), question=question
+        )
+        metrics.inc("rag_prompt_tokens_total", self.tool.shaper.counter.count(prompt), mode="fast")
+        return prompt
+    
+    def stream(self, symptoms: str, mode: str = None) -> Iterator[dict]:
+        """
+        Exécute le workflow en émettant des événements au fil de l'eau:
+        {"type": "status"|"step"|"token"|"final", "text": ...}.
+        L'événement "final" contient toujours la réponse complète, ainsi que
+        le détail des durées par étape ("timings"). Les appels LLM passent
+        par le limiteur de débit partagé (générateur consommé dans un thread).
+        """
+        mode = mode or self.mode
+        # Trace activée seulement autour du code synchrone: un générateur peut
+        # reprendre dans un autre contexte (thread) après chaque `yield`
+        timeline = Trace("orchestrator.stream")
+        cache_key = None
+        if self.answer_cache is not None:
+            with timeline.activate(), span("answer_cache.lookup"):
+                cache_key, cached = self.answer_cache.lookup(symptoms, mode)
+            if cached is not None:
+                yield {"type": "final", "text": cached, "cached": True,
+                       "timings": timeline.breakdown()}
+                return
+        
+        result = None
+        if mode == "fast":
+            yield {"type": "status", "text": "🔍 Graph retrieval"}
+            with timeline.activate():
+                native = self.tool.retrieve(symptoms)
+            if native:
+                yield {"type": "step", "text": self.tool.format_context(
+                    native, LanguageDetector.detect(symptoms))}
+                yield {"type": "status", "text": "✍️ Writing explanation"}
+                with timeline.activate(), span("rate_limit.wait"):
+                    self.rate_limiter.acquire_sync(1)
+                parts = []
+                started = time.perf_counter()
+                with timeline.activate():
+                    tokens = self.groq.complete(self._fast_prompt(symptoms, native), stream=True)
+                for token in tokens:
+                    parts.append(token)
+                    yield {"type": "token", "text": token}
+                with timeline.activate():
+                    record_span("llm.stream", time.perf_counter() - started, chunks=len(parts))
+                result = "".join(parts)
+        
+        if result is None:
+            with timeline.activate(), span("rate_limit.wait"):
+                self.rate_limiter.acquire_sync(self.CREW_LLM_CALLS)
+            for event in self._stream_crew(symptoms, timeline):
+                if event["type"] == "final":
+                    result = event["text"]
+                else:
+                    yield event
+        
+        if cache_key is not None and not result.startswith("❌"):
+            self.answer_cache.store_answer(cache_key, result)
+        metrics.observe(STAGE_DURATION, time.perf_counter() - timeline.start, stage=timeline.name)
+        yield {"type": "final", "text": result, "timings": timeline.breakdown()}
+    
+    def _stream_crew(self, symptoms: str, timeline: Trace = None) -> Iterator[dict]:
+        """Crew exécuté dans un thread; étapes, tâches et tokens remontés via une file."""
+        events = queue.Queue()
+        done = object()
+        
+        explainer = self._explainer.create_agent(self.streaming_llm)
+        crew = self._build_crew(
+            symptoms,
+            explainer=explainer,
+            step_callback=lambda step: events.put({"type": "step", "text": describe_step(step)}),
+            task_callback=lambda output: events.put({
+                "type": "status", "text": f"✅ Task done: {getattr(output, 'agent', '')}"
+            })
+        )
+        ChunkRouter.subscribe(explainer.id, lambda chunk: events.put({"type": "token", "text": chunk}))
+        
+        timeline = timeline or Trace("crew")
+        
+        def work():
+            try:
+                with timeline.activate(), span("crew"):
+                    output = str(crew.kickoff())
+                events.put({"type": "final", "text": output})
+            except Exception as e:
+                events.put({"type": "final", "text": f"❌ Error: {e}"})
+            finally:
+                events.put(done)
+        
+        yield {"type": "status", "text": "🤖 Diagnostician is searching the graph"}
+        threading.Thread(target=work, daemon=True).start()
+        try:
+            while True:
+                event = events.get()
+                if event is done:
+                    return
+                yield event
+        finally:
+            ChunkRouter.unsubscribe(explainer.id)
+    
+    def _run_crew(self, symptoms: str) -> str:
+        """Exécute les deux agents en séquence (appels réservés auprès du limiteur partagé)."""
+        with span("rate_limit.wait"):
+            self.rate_limiter.acquire_sync(self.CREW_LLM_CALLS)
+        with span("crew"):
+            result = self._build_crew(symptoms).kickoff()
+        return str(result)
+    
+    def _build_crew(self, symptoms: str, explainer=None, **crew_kwargs) -> Crew:
+        """Construit le crew (agents neufs, tâches de diagnostic puis d'explication)."""
+        diagnostician = self._diagnostician.create_agent()
+        explainer = explainer or self._explainer.create_agent()
         
         diagnosis_task = Task(
             description=(
@@ -29,7 +286,7 @@ class MedicalCrewOrchestrator:
                 "Extract diseases, symptoms, treatments, and causes."
             ),
             expected_output="Complete diagnostic: diseases, symptoms, treatments, causes",
-            agent=self.diagnostician
+            agent=diagnostician
         )
         
         explanation_task = Task(
@@ -38,17 +295,15 @@ class MedicalCrewOrchestrator:
                 "1) Diseases 2) Symptom correlation 3) Treatments 4) Causes 5) Confidence"
             ),
             expected_output="Clear medical explanation with all diagnostic elements",
-            agent=self.explainer,
+            agent=explainer,
             context=[diagnosis_task]
         )
         
-        crew = Crew(
-            agents=[self.diagnostician, self.explainer],
+        return Crew(
+            agents=[diagnostician, explainer],
             tasks=[diagnosis_task, explanation_task],
             process=Process.sequential,
             verbose=True,
-            memory=False
+            memory=False,
+            **crew_kwargs
         )
-        
-        result = crew.kickoff()
-        return str(result)
\ No newline at end of file
@@ -1,13 +1,10 @@
-from ..tools.medical_rag_tool import MedicalRAGTool
-from langchain_groq import ChatGroq 
-
 from crewai import Agent, LLM
 from ..tools.medical_rag_tool import MedicalRAGTool
 
 class MedicalDiagnostician:
-    def __init__(self, llm: LLM):  # ✅ Type CrewAI LLM
+    def __init__(self, llm: LLM, tool: MedicalRAGTool = None):  # ✅ Type CrewAI LLM
         self.llm = llm
-        self.tool = MedicalRAGTool()
+        self.tool = tool or MedicalRAGTool()
     
     def create_agent(self) -> Agent:
         return Agent(
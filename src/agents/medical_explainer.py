@@ -1,18 +1,16 @@
-from crewai import Agent
-from langchain_groq import ChatGroq 
 from crewai import Agent, LLM
 
 class MedicalExplainer:
     def __init__(self, llm: LLM):  # ✅ Type CrewAI LLM
         self.llm = llm
     
-    def create_agent(self) -> Agent:
+    def create_agent(self, llm: LLM = None) -> Agent:
         return Agent(
             role='Medical Explainer',
             goal='Explain diagnostic results in patient-friendly language',
             backstory="Medical communicator translating findings for patients",
             verbose=True,
-            llm=self.llm,
+            llm=llm or self.llm,
             allow_delegation=False,
             max_iter=5
         )
\ No newline at end of file
@@ -0,0 +1,63 @@
+import threading
+from typing import Callable, Dict
+
+# Bus d'événements CrewAI (emplacement variable selon la version installée)
+try:
+    from crewai.events import crewai_event_bus, LLMStreamChunkEvent
+except ImportError:
+    try:
+        from crewai.utilities.events import crewai_event_bus, LLMStreamChunkEvent
+    except ImportError:
+        crewai_event_bus = LLMStreamChunkEvent = None
+
+
+class ChunkRouter:
+    """
+    Route les fragments de tokens émis par CrewAI vers le flux de la bonne
+    requête: le bus est global, on filtre sur l'identifiant de l'agent.
+    """
+    
+    _subscribers: Dict[str, Callable[[str], None]] = {}
+    _lock = threading.Lock()
+    _installed = False
+    
+    @classmethod
+    def available(cls) -> bool:
+        return crewai_event_bus is not None
+    
+    @classmethod
+    def subscribe(cls, agent_id: str, callback: Callable[[str], None]):
+        cls._install()
+        with cls._lock:
+            cls._subscribers[str(agent_id)] = callback
+    
+    @classmethod
+    def unsubscribe(cls, agent_id: str):
+        with cls._lock:
+            cls._subscribers.pop(str(agent_id), None)
+    
+    @classmethod
+    def _install(cls):
+        with cls._lock:
+            if cls._installed or not cls.available():
+                return
+            crewai_event_bus.register_handler(LLMStreamChunkEvent, cls._dispatch)
+            cls._installed = True
+    
+    @classmethod
+    def _dispatch(cls, source, event):
+        callback = cls._subscribers.get(str(getattr(event, "agent_id", None)))
+        if callback is not None and event.chunk:
+            callback(event.chunk)
+
+
+def describe_step(step) -> str:
+    """Résumé lisible d'une étape d'agent (AgentAction, ToolResult, AgentFinish...)."""
+    tool = getattr(step, "tool", None)
+    if tool:
+        return f"🔧 {tool}: {str(getattr(step, 'tool_input', ''))[:120]}"
+    if hasattr(step, "result"):
+        return f"📥 Tool result: {str(step.result)[:160]}"
+    if hasattr(step, "output"):
+        return "✅ Agent step finished"
+    return str(step)[:160]
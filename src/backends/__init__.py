@@ -0,0 +1,12 @@
+"""
+Backends package
+"""
+from ..utils.lazy import lazy_exports
+
+__all__ = ['FakeLLM', 'MemoryGraph', 'generate_catalog']
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'FakeLLM': '.fake_llm',
+    'MemoryGraph': '.memory_graph',
+    'generate_catalog': '.synthetic',
+})
@@ -0,0 +1,118 @@
+import asyncio
+import hashlib
+import re
+import time
+from typing import Any, Callable, Iterator, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from ..models.llm_metrics import LLMMetricsHandler
+
+CYPHER_MARKER = "Cypher query generator"
+QUESTION_PATTERN = re.compile(r"Question:\s*(?P<question>.*?)\s*Generate ONLY the Cypher query", re.DOTALL)
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def cypher_for(symptoms: List[str]) -> str:
+    """Cypher déterministe pour une liste de symptômes (forme reconnue par MemoryGraph)."""
+    names = ", ".join(_quote(s) for s in symptoms)
+    return (
+        "MATCH (d:Disease)-[:HAS_SYMPTOM]->(s:Symptom) "
+        f"WHERE s.name IN [{names}] "
+        "RETURN DISTINCT d.name AS disease, s.name AS symptom"
+    )
+
+
+class FakeResponder:
+    """Logique de réponse partagée par FakeLLM et FakeChatModel."""
+    
+    def __init__(self, extract_symptoms: Optional[Callable[[str], List[str]]] = None,
+                 latency_ms: float = 0.0):
+        self.extract_symptoms = extract_symptoms
+        self.latency_ms = latency_ms
+        self.calls = 0
+    
+    def respond(self, prompt: str) -> str:
+        self.calls += 1
+        if CYPHER_MARKER in prompt:
+            match = QUESTION_PATTERN.search(prompt)
+            question = match["question"] if match else prompt
+            symptoms = self.extract_symptoms(question) if self.extract_symptoms else []
+            return cypher_for(symptoms)
+        digest = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8]
+        return (
+            "## 🩺 Possible conditions\n"
+            "Based on the provided medical context, see the conditions listed above.\n\n"
+            "## ⚠️ Disclaimer\n"
+            f"Deterministic answer generated offline (ref {digest})."
+        )
+    
+    def wait(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+    
+    async def await_latency(self):
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+
+class FakeChatModel(BaseChatModel):
+    """Modèle de chat LangChain déterministe (utilisable par GraphCypherQAChain)."""
+    
+    responder: Any
+    
+    @property
+    def _llm_type(self) -> str:
+        return "fake-deterministic"
+    
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.responder.wait()
+        prompt = "\n".join(str(m.content) for m in messages)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.responder.respond(prompt)))])
+
+
+class FakeLLM:
+    """
+    Remplaçant local de GroqLLM: même surface (model, api_key, get_llm,
+    get_model_name, complete, acomplete), réponses déterministes et
+    latence configurable. Aucun appel réseau.
+    """
+    
+    def __init__(self, extract_symptoms: Optional[Callable[[str], List[str]]] = None,
+                 latency_ms: float = 0.0):
+        self.model = "deterministic"
+        self.api_key = "fake-key"
+        self.responder = FakeResponder(extract_symptoms, latency_ms)
+    
+    @property
+    def calls(self) -> int:
+        return self.responder.calls
+    
+    def get_llm(self) -> FakeChatModel:
+        """Retourne un modèle de chat compatible LangChain."""
+        return FakeChatModel(
+            responder=self.responder, callbacks=[LLMMetricsHandler(self.get_model_name())]
+        )
+    
+    def get_model_name(self) -> str:
+        return f"fake/{self.model}"
+    
+    def complete(self, prompt: str, stream: bool = False, **kwargs):
+        """Réponse déterministe (générateur de fragments si `stream`)."""
+        self.responder.wait()
+        text = self.responder.respond(prompt)
+        if stream:
+            return iter(self._chunks(text))
+        return text
+    
+    async def acomplete(self, prompt: str, **kwargs) -> str:
+        await self.responder.await_latency()
+        return self.responder.respond(prompt)
+    
+    @staticmethod
+    def _chunks(text: str) -> Iterator[str]:
+        for token in re.findall(r"\S+\s*|\s+", text):
+            yield token
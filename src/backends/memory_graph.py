@@ -0,0 +1,329 @@
+import math
+import re
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List
+from langchain_community.graphs.graph_store import GraphStore
+from ..database import data_seeder, disease_profile, graph_version
+from ..retrieval import symptom_matcher, symptom_index, vector_index
+
+RELATIONS = (
+    ("symptoms", "HAS_SYMPTOM", "Symptom"),
+    ("treatments", "TREATED_WITH", "Treatment"),
+    ("causes", "CAUSED_BY", "Cause"),
+)
+
+# Forme de Cypher produite par FakeLLM (et par les LLM dans le cas simple)
+SYMPTOM_LOOKUP_PATTERN = re.compile(
+    r"MATCH \(d:Disease\)-\[:HAS_SYMPTOM\]->\(s:Symptom\) "
+    r"WHERE s\.name IN \[(?P<names>.*?)\] "
+    r"RETURN DISTINCT d\.name AS disease, s\.name AS symptom",
+    re.IGNORECASE
+)
+
+
+def _normalize(query: str) -> str:
+    return " ".join(query.split())
+
+
+class MemoryGraph(GraphStore):
+    """
+    Graphe en mémoire qui implémente la surface `query()` utilisée par
+    DataSeeder, les retrievers et GraphCypherQAChain, sans serveur Neo4j.
+    Seules les requêtes connues du projet sont prises en charge (dispatch
+    sur le texte de la requête); toute autre requête lève une ValueError.
+    """
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.diseases: Dict[str, dict] = {}
+        self.postings: Dict[str, Dict[str, set]] = {key: defaultdict(set) for key, _, _ in RELATIONS}
+        self.version = 0
+        self.queries = 0
+        self._handlers = {
+            _normalize(q): handler for q, handler in [
+                *[(statement, self._noop) for statement in data_seeder.SCHEMA_CONSTRAINTS],
+                (data_seeder.BULK_UPSERT_QUERY, self._upsert),
+                (data_seeder.REPLACE_QUERY, self._upsert),
+                (data_seeder.EXISTING_HASHES_QUERY, self._existing_hashes),
+                (data_seeder.DELETE_DISEASES_QUERY, self._delete_diseases),
+                (data_seeder.LINKED_NODES_QUERY, self._linked_nodes),
+                (data_seeder.DELETE_ORPHANS_QUERY, self._delete_orphans),
+                (data_seeder.CLEAR_CHUNK_QUERY, self._clear_chunk),
+                (graph_version.BUMP_GRAPH_VERSION_QUERY, self._bump_version),
+                (graph_version.GRAPH_VERSION_QUERY, self._read_version),
+                (symptom_matcher.SYMPTOM_NAMES_QUERY, self._symptom_names),
+                (symptom_matcher.OVERLAP_RANKING_QUERY, self._rank_overlap),
+                (symptom_matcher.WEIGHTED_RANKING_QUERY, self._rank_weighted),
+                (symptom_matcher.BATCH_RANKING_QUERY, self._rank_batch),
+                (symptom_matcher.WEIGHTED_BATCH_RANKING_QUERY, self._rank_batch_weighted),
+                (symptom_matcher.DISEASE_DETAILS_QUERY, self._details),
+                (symptom_matcher.SYMPTOM_LOOKUP_QUERY, self._symptom_lookup_params),
+                (disease_profile.DISEASE_PROFILES_QUERY, self._profiles),
+                (symptom_index.DISEASE_SYMPTOMS_QUERY, self._disease_symptoms),
+                (vector_index.NODES_QUERY, self._nodes),
+                ("MATCH (n) RETURN count(n) as count", self._count),
+                ("MATCH (n) RETURN count(n) as count LIMIT 1", self._count),
+                ("MATCH (n) RETURN labels(n)[0] as type, COUNT(*) as count", self._label_counts),
+            ]
+        }
+    
+    # --- Surface GraphStore -------------------------------------------------
+    
+    @property
+    def get_schema(self) -> str:
+        return (
+            "Node properties:\n"
+            "Disease {name: STRING, content_hash: STRING}\n"
+            "Symptom {name: STRING}\nTreatment {name: STRING}\nCause {name: STRING}\n"
+            "The relationships:\n"
+            "(:Disease)-[:HAS_SYMPTOM]->(:Symptom)\n"
+            "(:Disease)-[:TREATED_WITH]->(:Treatment)\n"
+            "(:Disease)-[:CAUSED_BY]->(:Cause)"
+        )
+    
+    @property
+    def get_structured_schema(self) -> Dict[str, Any]:
+        return self.structured_schema
+    
+    @property
+    def structured_schema(self) -> Dict[str, Any]:
+        return {
+            "node_props": {
+                label: [{"property": "name", "type": "STRING"}]
+                for label in ("Disease", "Symptom", "Treatment", "Cause")
+            },
+            "rel_props": {},
+            "relationships": [
+                {"start": "Disease", "type": rel, "end": label} for _, rel, label in RELATIONS
+            ],
+            "metadata": {"constraint": [], "index": []},
+        }
+    
+    def refresh_schema(self) -> None:
+        pass
+    
+    def add_graph_documents(self, graph_documents: List[Any], include_source: bool = False) -> None:
+        """
+        Fusionne des GraphDocument (nœuds Disease/Symptom/Treatment/Cause et
+        relations du schéma) dans le graphe, comme une écriture du seeder:
+        profil et hash recalculés, version incrémentée. Les documents
+        sources ne sont pas conservés (`include_source` sans effet).
+        """
+        keys = {relation: key for key, relation, _ in RELATIONS}
+        labels = {label: key for key, _, label in RELATIONS}
+        with self._lock:
+            updates = {}
+            
+            def entry(name: str) -> dict:
+                if name not in updates:
+                    current = self.diseases.get(name, {})
+                    updates[name] = {key: list(current.get(key, [])) for key, _, _ in RELATIONS}
+                return updates[name]
+            
+            for document in graph_documents:
+                for node in document.nodes:
+                    if node.type == "Disease":
+                        entry(str(node.id))
+                    elif node.type in labels:
+                        # Nœud isolé (sans maladie): créé sans relation, comme un MERGE
+                        self.postings[labels[node.type]][str(node.id)]
+                    else:
+                        raise ValueError(f"Unsupported node label in MemoryGraph: {node.type}")
+                for rel in document.relationships:
+                    key = keys.get(rel.type)
+                    if key is None or rel.source.type != "Disease" or labels.get(rel.target.type) != key:
+                        raise ValueError(
+                            f"Unsupported relationship in MemoryGraph: "
+                            f"({rel.source.type})-[:{rel.type}]->({rel.target.type})"
+                        )
+                    values = entry(str(rel.source.id))[key]
+                    if str(rel.target.id) not in values:
+                        values.append(str(rel.target.id))
+            
+            rows = [
+                data_seeder.DataSeeder._to_row({
+                    "maladie": name, "symptomes": lists["symptoms"],
+                    "traitements": lists["treatments"], "causes": lists["causes"],
+                })
+                for name, lists in updates.items()
+            ]
+            if rows:
+                self._upsert({"rows": rows})
+            self._bump_version({})
+        graph_version.bump_version()
+    
+    def query(self, query: str, params: dict = {}) -> List[Dict[str, Any]]:
+        params = params or {}
+        normalized = _normalize(query)
+        with self._lock:
+            self.queries += 1
+            handler = self._handlers.get(normalized)
+            if handler is not None:
+                return handler(params)
+            match = SYMPTOM_LOOKUP_PATTERN.fullmatch(normalized.rstrip(";"))
+            if match:
+                names = re.findall(r"'((?:[^'\\]|\\.)*)'|\"((?:[^\"\\]|\\.)*)\"", match["names"])
+                return self._symptom_lookup([a or b for a, b in names])
+        raise ValueError(f"Unsupported query in MemoryGraph: {normalized[:120]}")
+    
+    # --- Écritures (DataSeeder) ---------------------------------------------
+    
+    def _noop(self, params: dict) -> list:
+        return []
+    
+    def _upsert(self, params: dict) -> list:
+        for row in params["rows"]:
+            self._remove_links(row["name"])
+            entry = {key: list(row[key]) for key, _, _ in RELATIONS}
+            entry["content_hash"] = row.get("hash")
+            entry["profile"] = row.get("profile")
+            self.diseases[row["name"]] = entry
+            for key, _, _ in RELATIONS:
+                for name in entry[key]:
+                    self.postings[key][name].add(row["name"])
+        return []
+    
+    def _remove_links(self, disease: str):
+        entry = self.diseases.get(disease)
+        if entry is None:
+            return
+        for key, _, _ in RELATIONS:
+            for name in entry[key]:
+                self.postings[key][name].discard(disease)
+    
+    def _existing_hashes(self, params: dict) -> list:
+        return [{"name": name, "hash": entry["content_hash"] if entry["profile"] else None}
+                for name, entry in self.diseases.items()]
+    
+    def _delete_diseases(self, params: dict) -> list:
+        for name in params["names"]:
+            self._remove_links(name)
+            self.diseases.pop(name, None)
+        return []
+    
+    def _linked_nodes(self, params: dict) -> list:
+        rows = []
+        for key, relation, _ in RELATIONS:
+            names = list(dict.fromkeys(
+                name for disease in params["names"] if disease in self.diseases
+                for name in self.diseases[disease][key]
+            ))
+            if names:
+                rows.append({"relation": relation, "names": names})
+        return rows
+    
+    def _delete_orphans(self, params: dict) -> list:
+        deleted = 0
+        for key, _, _ in RELATIONS:
+            for name in params[key]:
+                if name in self.postings[key] and not self.postings[key][name]:
+                    del self.postings[key][name]
+                    deleted += 1
+        return [{"deleted": deleted}]
+    
+    def _clear_chunk(self, params: dict) -> list:
+        # Les nœuds sont supprimés d'un bloc; le nombre retourné respecte la limite
+        total = self._node_count()
+        self.diseases.clear()
+        self.postings = {key: defaultdict(set) for key, _, _ in RELATIONS}
+        return [{"deleted": total}]
+    
+    def _bump_version(self, params: dict) -> list:
+        self.version += 1
+        return [{"version": self.version}]
+    
+    def _read_version(self, params: dict) -> list:
+        return [{"version": self.version}] if self.version else []
+    
+    # --- Lectures (retrievers, tool, scripts) -------------------------------
+    
+    def _symptom_names(self, params: dict) -> list:
+        return [{"name": name} for name in self.postings["symptoms"]]
+    
+    def _ranking_rows(self, symptoms: List[str]) -> Dict[str, list]:
+        matched = defaultdict(list)
+        for symptom in dict.fromkeys(symptoms):
+            for disease in self.postings["symptoms"].get(symptom, ()):
+                matched[disease].append(symptom)
+        return matched
+    
+    def _sorted_rows(self, rows: list, limit: int) -> list:
+        rows.sort(key=lambda r: (-r["score"], -r["overlap"], r["disease"]))
+        return rows[:limit]
+    
+    def _rank_overlap(self, params: dict) -> list:
+        rows = []
+        for disease, matched in self._ranking_rows(params["symptoms"]).items():
+            total = len(self.diseases[disease]["symptoms"])
+            rows.append({"disease": disease, "matched": matched, "overlap": len(matched),
+                         "total": total, "score": len(matched) / total})
+        return self._sorted_rows(rows, params["limit"])
+    
+    def _rank_weighted(self, params: dict) -> list:
+        weights = {
+            s: 1.0 / math.log(2.0 + len(self.postings["symptoms"].get(s, ())))
+            for s in params["symptoms"]
+        }
+        rows = []
+        for disease, matched in self._ranking_rows(params["symptoms"]).items():
+            rows.append({"disease": disease, "matched": matched, "overlap": len(matched),
+                         "total": len(self.diseases[disease]["symptoms"]),
+                         "score": sum(weights[s] for s in matched)})
+        return self._sorted_rows(rows, params["limit"])
+    
+    def _rank_batch(self, params: dict, rank=None) -> list:
+        rank = rank or self._rank_overlap
+        results = []
+        for q in params["queries"]:
+            diseases = rank({"symptoms": q["symptoms"], "limit": params["limit"]})
+            if diseases:
+                results.append({"id": q["id"], "diseases": diseases})
+        return results
+    
+    def _rank_batch_weighted(self, params: dict) -> list:
+        return self._rank_batch(params, self._rank_weighted)
+    
+    def _details(self, params: dict) -> list:
+        return [
+            {"disease": name, "treatments": list(self.diseases[name]["treatments"]),
+             "causes": list(self.diseases[name]["causes"])}
+            for name in params["names"] if name in self.diseases
+        ]
+    
+    def _profiles(self, params: dict) -> list:
+        return [{"disease": name, "profile": self.diseases[name]["profile"]}
+                for name in params["names"] if name in self.diseases]
+    
+    def _disease_symptoms(self, params: dict) -> list:
+        return [{"disease": name, "symptoms": list(entry["symptoms"])}
+                for name, entry in self.diseases.items()]
+    
+    def _nodes(self, params: dict) -> list:
+        rows = [{"label": "Disease", "name": name, "symptoms": list(entry["symptoms"])}
+                for name, entry in self.diseases.items()]
+        for key, _, label in RELATIONS:
+            rows.extend({"label": label, "name": name, "symptoms": []}
+                        for name, linked in self.postings[key].items() if linked)
+        return rows
+    
+    def _symptom_lookup(self, symptoms: List[str]) -> list:
+        return [
+            {"disease": disease, "symptom": symptom}
+            for disease, matched in self._ranking_rows(symptoms).items()
+            for symptom in matched
+        ]
+    
+    def _symptom_lookup_params(self, params: dict) -> list:
+        return self._symptom_lookup(params["symptoms"])[:params["limit"]]
+    
+    def _node_count(self) -> int:
+        return len(self.diseases) + sum(len(p) for p in self.postings.values())
+    
+    def _count(self, params: dict) -> list:
+        return [{"count": self._node_count()}]
+    
+    def _label_counts(self, params: dict) -> list:
+        rows = [{"type": "Disease", "count": len(self.diseases)}]
+        rows.extend({"type": label, "count": len(self.postings[key])} for key, _, label in RELATIONS)
+        return rows
@@ -0,0 +1,47 @@
+import itertools
+import random
+from typing import Dict, List
+
+SYLLABLES = ("ka", "lo", "mi", "ne", "ra", "su", "ti", "vo", "ze", "pa", "do", "fi", "gu", "he", "ju")
+
+
+def _word(rng: random.Random, syllables: int) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(syllables))
+
+
+def _vocabulary(rng: random.Random, size: int, prefix: str) -> List[str]:
+    # Assez de syllabes pour que l'espace des mots dépasse largement `size`
+    syllables = 3
+    while len(SYLLABLES) ** syllables < 4 * size:
+        syllables += 1
+    names = set()
+    while len(names) < size:
+        names.add(f"{prefix} {_word(rng, syllables)}")
+    return sorted(names)
+
+
+def generate_catalog(n_diseases: int, seed: int = 42, symptoms_per_disease: int = 6) -> List[Dict]:
+    """
+    Catalogue synthétique au format de data/medical_data.json.
+    La fréquence des symptômes suit une loi de type Zipf (quelques symptômes
+    très fréquents, une longue traîne de symptômes rares), comme les données réelles.
+    """
+    rng = random.Random(seed)
+    n_symptoms = max(50, int(n_diseases ** 0.75))
+    symptoms = _vocabulary(rng, n_symptoms, "symptome")
+    treatments = _vocabulary(rng, max(20, n_symptoms // 2), "traitement")
+    causes = _vocabulary(rng, max(20, n_symptoms // 2), "cause")
+    # Poids cumulés calculés une fois (sinon `choices` les recalcule à chaque appel)
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(n_symptoms)))
+    
+    catalog = []
+    for i in range(n_diseases):
+        count = rng.randint(max(2, symptoms_per_disease - 3), symptoms_per_disease + 3)
+        picked = list(dict.fromkeys(rng.choices(symptoms, cum_weights=cum_weights, k=count * 2)))
+        catalog.append({
+            "maladie": f"maladie {i:07d}",
+            "symptomes": picked[:count],
+            "traitements": rng.sample(treatments, 2),
+            "causes": rng.sample(causes, 2),
+        })
+    return catalog
@@ -0,0 +1,8 @@
+"""
+Cache package
+"""
+from .stores import LRUCache, SQLiteCache, TieredCache
+from .cypher_cache import CypherCache
+from .answer_cache import AnswerCache
+
+__all__ = ['LRUCache', 'SQLiteCache', 'TieredCache', 'CypherCache', 'AnswerCache']
@@ -0,0 +1,56 @@
+import os
+from typing import Any, Callable, List, Optional, Tuple
+from ..database.graph_version import read_graph_version
+from ..tools.language_detector import LanguageDetector
+from .cypher_cache import question_key
+from .stores import LRUCache, SQLiteCache, TieredCache
+
+
+class AnswerCache:
+    """
+    Cache des réponses complètes de l'orchestrateur. La clé contient la
+    version persistée du graphe: après une écriture du seeder, les anciennes
+    entrées ne sont plus jamais lues (puis sont évincées par la LRU). Elle
+    contient aussi le tenant: les bases partagent ANSWER_CACHE_PATH sans
+    jamais lire les réponses d'une autre.
+    """
+    
+    def __init__(self, graph: Any, store: Any = None,
+                 extract_symptoms: Optional[Callable[[str], List[str]]] = None,
+                 tenant: Optional[str] = None):
+        self.graph = graph
+        self.store = store or LRUCache(max_size=512)
+        self.extract_symptoms = extract_symptoms
+        self.tenant = tenant or "default"
+    
+    @classmethod
+    def from_env(cls, graph: Any,
+                 extract_symptoms: Optional[Callable[[str], List[str]]] = None,
+                 tenant: Optional[str] = None) -> "AnswerCache":
+        """LRU mémoire, plus un niveau SQLite si ANSWER_CACHE_PATH est défini."""
+        memory = LRUCache(max_size=int(os.getenv("ANSWER_CACHE_SIZE", 512)))
+        path = os.getenv("ANSWER_CACHE_PATH")
+        disk = SQLiteCache(
+            path, max_size=int(os.getenv("ANSWER_CACHE_DISK_SIZE", 10000)),
+            table="answer_cache"
+        ) if path else None
+        return cls(graph, TieredCache(memory, disk), extract_symptoms, tenant)
+    
+    def key(self, question: str, mode: str = "") -> str:
+        """Clé: tenant + version du graphe + langue + forme normalisée de la question (`question_key`)."""
+        version = read_graph_version(self.graph)
+        lang = LanguageDetector.detect(question)
+        symptoms = self.extract_symptoms(question) if self.extract_symptoms else None
+        return f"{self.tenant}:v{version}:{lang}:{mode}:{question_key(question, symptoms)}"
+    
+    def lookup(self, question: str, mode: str = "") -> Tuple[str, Optional[str]]:
+        """Retourne (clé, réponse en cache ou None)."""
+        key = self.key(question, mode)
+        return key, self.store.get(key)
+    
+    def store_answer(self, key: str, answer: str):
+        self.store.set(key, answer)
+    
+    @property
+    def stats(self) -> dict:
+        return self.store.stats.as_dict()
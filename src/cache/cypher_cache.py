@@ -0,0 +1,137 @@
+import hashlib
+import os
+from typing import Any, Callable, List, Optional
+from ..utils.text_utils import sanitize
+from ..utils.tracing import metrics, span
+from .stores import LRUCache, SQLiteCache, TieredCache
+
+# Mots qui changent la requête attendue pour un même jeu de symptômes, par intention
+INTENTS = {
+    "cause": frozenset({"cause", "causes", "caused", "pourquoi", "why"}),
+    "treatment": frozenset({
+        "traitement", "traitements", "traiter", "traite", "soigner", "treat", "treats",
+        "treatment", "treatments", "cure",
+    }),
+    "prevention": frozenset({"prevenir", "prevention", "prevent"}),
+    "symptom": frozenset({"symptome", "symptomes", "symptom", "symptoms"}),
+    "compare": frozenset({"comparer", "compare", "difference"}),
+}
+INTENT_WORDS = frozenset().union(*INTENTS.values())
+
+# "What could cause X ?", "Qu'est-ce qui peut causer X ?": la maladie est demandée, pas ses causes
+MODALS = frozenset({"can", "could", "may", "might", "peut", "peuvent", "pourrait", "pourraient"})
+
+
+# Mots sans incidence sur la réponse (les négations "pas", "not", "sans"... n'en font pas partie)
+FILLER_WORDS = frozenset({
+    "a", "ai", "as", "au", "aux", "avec", "avez", "avoir", "c", "ca", "ce", "ces", "cette",
+    "comment", "d", "de", "depuis", "des", "du", "elle", "en", "est", "et", "il", "j", "je",
+    "l", "la", "le", "les", "m", "ma", "me", "mes", "mon", "ou", "peut", "peuvent", "pour",
+    "qu", "que", "quel", "quelle", "quelles", "quels", "qui", "quoi", "s", "sont", "un", "une", "y",
+    "am", "an", "and", "are", "be", "can", "could", "do", "does", "for", "from", "got", "had",
+    "has", "have", "how", "i", "im", "in", "is", "it", "ive", "my", "of", "on", "or", "should",
+    "since", "that", "the", "this", "to", "what", "which", "with",
+})
+
+
+def question_intents(question: str) -> set:
+    """Intentions ("cause", "treatment"...) exprimées dans la question."""
+    tokens = [t for t in sanitize(question).split("_") if t]
+    words = {
+        token for i, token in enumerate(tokens)
+        if not (token in INTENTS["cause"] and i and tokens[i - 1] in MODALS)
+    }
+    return {intent for intent, vocabulary in INTENTS.items() if words & vocabulary}
+
+
+def question_key(question: str, symptoms: Optional[List[str]] = None) -> str:
+    """
+    Forme normalisée d'une question. Si des symptômes ont été reconnus:
+    jeu de symptômes trié + mots d'intention + mots restants (nom de maladie,
+    négation, autre entité) hors mots outils; sinon le texte normalisé complet.
+    """
+    text = sanitize(question)
+    if symptoms:
+        tokens = [t for t in text.split("_") if t]
+        covered = {t for symptom in symptoms for t in sanitize(symptom).split("_")}
+        intents = sorted({t for t in tokens if t in INTENT_WORDS})
+        residual = sorted({
+            t for t in tokens
+            if t not in INTENT_WORDS and t not in FILLER_WORDS and t not in covered
+        })
+        return ("symptoms:" + "|".join(sorted(set(symptoms)))
+                + "#" + "|".join(intents) + "#" + "|".join(residual))
+    return "text:" + text
+
+
+class CachedCypherGeneration:
+    """
+    Remplace `cypher_generation_chain` d'un GraphCypherQAChain: un hit
+    renvoie la Cypher déjà générée sans appel LLM.
+    """
+    
+    def __init__(self, generator: Any, cache: "CypherCache"):
+        self.generator = generator
+        self.cache = cache
+    
+    def run(self, args: dict, callbacks: Any = None, **kwargs) -> str:
+        return self.cache.get_or_generate(
+            args, lambda: self.generator.run(args, callbacks=callbacks, **kwargs)
+        )
+    
+    def invoke(self, args: dict, config: Any = None, **kwargs) -> Any:
+        return self.cache.get_or_generate(
+            args, lambda: self.generator.invoke(args, config, **kwargs)
+        )
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.generator, name)
+
+
+class CypherCache:
+    """Cache des requêtes Cypher générées, indexé sur la question normalisée."""
+    
+    def __init__(self, store: Any = None,
+                 extract_symptoms: Optional[Callable[[str], List[str]]] = None):
+        self.store = store or LRUCache(max_size=2048, ttl=24 * 3600)
+        self.extract_symptoms = extract_symptoms
+    
+    @classmethod
+    def from_env(cls, extract_symptoms: Optional[Callable[[str], List[str]]] = None) -> "CypherCache":
+        """LRU mémoire, plus un niveau SQLite si CYPHER_CACHE_PATH est défini."""
+        ttl = float(os.getenv("CYPHER_CACHE_TTL", 24 * 3600))
+        memory = LRUCache(max_size=int(os.getenv("CYPHER_CACHE_SIZE", 2048)), ttl=ttl)
+        path = os.getenv("CYPHER_CACHE_PATH")
+        disk = SQLiteCache(path, ttl=ttl, table="cypher_cache") if path else None
+        return cls(TieredCache(memory, disk), extract_symptoms)
+    
+    def key(self, args: dict) -> str:
+        question = args.get("question") or args.get("query") or ""
+        symptoms = self.extract_symptoms(question) if self.extract_symptoms else None
+        # Le schéma fait partie de la clé: une migration invalide les entrées
+        schema = hashlib.sha1(str(args.get("schema", "")).encode("utf-8")).hexdigest()[:12]
+        return f"{schema}:{question_key(question, symptoms)}"
+    
+    def get_or_generate(self, args: dict, generate: Callable[[], Any]) -> Any:
+        with span("cypher.generate") as s:
+            key = self.key(args)
+            cached = self.store.get(key)
+            s.attrs["cached"] = cached is not None
+            metrics.inc("rag_cache_lookups_total", cache="cypher", hit=cached is not None)
+            if cached is not None:
+                return cached
+            cypher = generate()
+            if cypher:
+                self.store.set(key, cypher)
+            return cypher
+    
+    def attach(self, qa_chain: Any) -> Any:
+        """Intercale le cache devant la génération Cypher de la chaîne."""
+        wrapped = CachedCypherGeneration(qa_chain.cypher_generation_chain, self)
+        # Contourne la validation pydantic du champ (LLMChain attendu)
+        object.__setattr__(qa_chain, "cypher_generation_chain", wrapped)
+        return qa_chain
+    
+    @property
+    def stats(self) -> dict:
+        return self.store.stats.as_dict()
@@ -0,0 +1,126 @@
+import gzip
+import json
+import os
+from typing import Iterator
+
+CHUNK_SIZE = 1 << 16
+JSON_LINES_SUFFIXES = (".jsonl", ".ndjson")
+
+
+def open_catalog(path: str):
+    """Ouvre un catalogue texte, compressé gzip ou non."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def iter_catalog(path: str, start: int = 0) -> Iterator[dict]:
+    """
+    Lit les maladies une par une sans charger le fichier en mémoire.
+    Formats: tableau JSON, JSON Lines, et leurs variantes `.gz`.
+    `start` saute les `start` premières entrées (reprise après checkpoint).
+    """
+    with open_catalog(path) as f:
+        if path.removesuffix(".gz").endswith(JSON_LINES_SUFFIXES):
+            entries = _iter_json_lines(f)
+        else:
+            first = _peek_first_char(f)
+            entries = _iter_json_array(f) if first == "[" else _iter_json_lines(f)
+        
+        for index, entry in enumerate(entries):
+            if index >= start:
+                yield entry
+
+
+def _peek_first_char(f) -> str:
+    """Lit le premier caractère non blanc puis revient au début du flux."""
+    while True:
+        char = f.read(1)
+        if not char or not char.isspace():
+            f.seek(0)
+            return char
+
+
+def _iter_json_lines(f) -> Iterator[dict]:
+    """Une entrée JSON par ligne."""
+    for line in f:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def _iter_json_array(f) -> Iterator[dict]:
+    """Parse incrémental d'un tableau JSON `[{...}, {...}]` par blocs."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    opened = False
+    eof = False
+    
+    while True:
+        # Sauter blancs, virgules et le crochet ouvrant
+        while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] == ","
+                                     or (not opened and buffer[pos] == "[")):
+            if buffer[pos] == "[":
+                opened = True
+            pos += 1
+        
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        
+        if pos < len(buffer):
+            try:
+                entry, end = decoder.raw_decode(buffer, pos)
+                yield entry
+                pos = end
+                continue
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+        elif eof:
+            if opened:
+                raise ValueError("Unterminated JSON array")
+            return
+        
+        # Entrée incomplète: compacter le tampon et lire le bloc suivant
+        buffer = buffer[pos:]
+        pos = 0
+        chunk = f.read(CHUNK_SIZE)
+        if chunk:
+            buffer += chunk
+        else:
+            eof = True
+
+
+class IngestionCheckpoint:
+    """Persiste l'offset (nombre d'entrées déjà écrites) d'une ingestion."""
+    
+    def __init__(self, path: str):
+        self.path = path
+    
+    @classmethod
+    def for_catalog(cls, json_path: str, tenant: str = None) -> "IngestionCheckpoint":
+        # Un checkpoint par tenant: plusieurs bases peuvent ingérer le même fichier
+        return cls(f"{json_path}.{tenant}.checkpoint" if tenant else f"{json_path}.checkpoint")
+    
+    def load(self) -> int:
+        """Retourne l'offset sauvegardé (0 si aucun)."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return int(json.load(f).get("offset", 0))
+        except (FileNotFoundError, ValueError):
+            return 0
+    
+    def save(self, offset: int):
+        """Écriture atomique de l'offset."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"offset": offset}, f)
+        os.replace(tmp_path, self.path)
+    
+    def clear(self):
+        """Supprime le checkpoint une fois l'ingestion terminée."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
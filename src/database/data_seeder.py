@@ -1,58 +1,155 @@
+import hashlib
 import json
 import os
-from langchain_community.graphs import Neo4jGraph
-from ..utils.text_utils import sanitize
+import time
+from itertools import islice
+from typing import TYPE_CHECKING
+from ..utils.tracing import span
+from .catalog_reader import iter_catalog, IngestionCheckpoint
+from .disease_profile import encode_profile
+from .graph_version import bump_version, BUMP_GRAPH_VERSION_QUERY
+
+if TYPE_CHECKING:
+    from langchain_community.graphs import Neo4jGraph
+
+# Contraintes d'unicité (créent aussi l'index sur `name` utilisé par MERGE)
+SCHEMA_CONSTRAINTS = [
+    "CREATE CONSTRAINT disease_name IF NOT EXISTS FOR (d:Disease) REQUIRE d.name IS UNIQUE",
+    "CREATE CONSTRAINT symptom_name IF NOT EXISTS FOR (s:Symptom) REQUIRE s.name IS UNIQUE",
+    "CREATE CONSTRAINT treatment_name IF NOT EXISTS FOR (t:Treatment) REQUIRE t.name IS UNIQUE",
+    "CREATE CONSTRAINT cause_name IF NOT EXISTS FOR (c:Cause) REQUIRE c.name IS UNIQUE",
+    "CREATE CONSTRAINT graph_meta_key IF NOT EXISTS FOR (m:GraphMeta) REQUIRE m.key IS UNIQUE",
+]
+
+# Corps commun des écritures de maladies (une ligne `row` par maladie)
+_UPSERT_BODY = """
+MERGE (d:Disease {name: row.name})
+SET d.content_hash = row.hash,
+    d.profile = row.profile,
+    d.symptom_count = size(row.symptoms),
+    d.treatment_count = size(row.treatments),
+    d.cause_count = size(row.causes)
+FOREACH (symptom IN row.symptoms |
+    MERGE (s:Symptom {name: symptom})
+    MERGE (d)-[:HAS_SYMPTOM]->(s))
+FOREACH (treatment IN row.treatments |
+    MERGE (t:Treatment {name: treatment})
+    MERGE (d)-[:TREATED_WITH]->(t))
+FOREACH (cause IN row.causes |
+    MERGE (c:Cause {name: cause})
+    MERGE (d)-[:CAUSED_BY]->(c))
+"""
+
+# Une seule requête paramétrée par lot de maladies
+BULK_UPSERT_QUERY = "UNWIND $rows AS row" + _UPSERT_BODY
+
+# Maladies modifiées: on retire les anciennes relations puis on réécrit
+REPLACE_QUERY = """
+UNWIND $rows AS row
+OPTIONAL MATCH (:Disease {name: row.name})-[r:HAS_SYMPTOM|TREATED_WITH|CAUSED_BY]->()
+DELETE r
+WITH DISTINCT row
+""" + _UPSERT_BODY
+
+# Sans profil matérialisé, la maladie est considérée comme modifiée (réécrite)
+EXISTING_HASHES_QUERY = """
+MATCH (d:Disease)
+RETURN d.name AS name, CASE WHEN d.profile IS NULL THEN null ELSE d.content_hash END AS hash
+"""
+
+DELETE_DISEASES_QUERY = """
+UNWIND $names AS name
+MATCH (d:Disease {name: name})
+DETACH DELETE d
+"""
+
+# Nœuds liés aux maladies qui vont être réécrites ou supprimées (candidats orphelins)
+LINKED_NODES_QUERY = """
+UNWIND $names AS name
+MATCH (:Disease {name: name})-[r:HAS_SYMPTOM|TREATED_WITH|CAUSED_BY]->(n)
+RETURN type(r) AS relation, collect(DISTINCT n.name) AS names
+"""
+
+# Seuls les candidats sont examinés (recherche par index), jamais tout le graphe
+DELETE_ORPHANS_QUERY = """
+CALL {
+    UNWIND $symptoms AS name MATCH (n:Symptom {name: name}) RETURN n
+    UNION
+    UNWIND $treatments AS name MATCH (n:Treatment {name: name}) RETURN n
+    UNION
+    UNWIND $causes AS name MATCH (n:Cause {name: name}) RETURN n
+}
+WITH n WHERE NOT (n)--()
+DETACH DELETE n
+RETURN count(*) AS deleted
+"""
+
+# Relation -> paramètre de DELETE_ORPHANS_QUERY
+ORPHAN_PARAMS = {"HAS_SYMPTOM": "symptoms", "TREATED_WITH": "treatments", "CAUSED_BY": "causes"}
+
+# GraphMeta est conservé: la version du graphe ne doit jamais revenir en arrière
+CLEAR_CHUNK_QUERY = """
+MATCH (n)
+WHERE NOT n:GraphMeta
+WITH n LIMIT $limit
+DETACH DELETE n
+RETURN count(*) AS deleted
+"""
+
 
 class DataSeeder:
-    """Peuple Neo4j avec les données médicales."""
+    """Peuple Neo4j avec les données médicales (graphe donné, ou celui du tenant)."""
     
-    def __init__(self, graph: Neo4jGraph):
+    def __init__(self, graph: "Neo4jGraph" = None, batch_size: int = 1000, tenant: str = None):
+        if graph is None:
+            from .neo4j_connector import Neo4jConnector
+            graph = Neo4jConnector(tenant).get_graph()
         self.graph = graph
+        self.batch_size = batch_size
+        self.tenant = tenant
     
-    def seed_from_json(self, json_path: str = "data/medical_data.json") -> bool:
-        """Peuple le graphe à partir du fichier JSON."""
+    def seed_from_json(self, json_path: str = "data/medical_data.json",
+                       batch_size: int = None, resume: bool = False) -> bool:
+        """
+        Peuple le graphe à partir du catalogue (JSON, JSON Lines, .gz).
+        Les entrées sont lues en streaming et écrites par lots UNWIND;
+        l'offset est checkpointé après chaque lot pour permettre `resume`.
+        """
+        batch_size = batch_size or self.batch_size
+        checkpoint = IngestionCheckpoint.for_catalog(json_path, self.tenant)
+        offset = checkpoint.load() if resume else 0
         try:
-            with open(json_path, "r", encoding="utf-8") as f:
-                medical_data = json.load(f)
+            if not os.path.exists(json_path):
+                raise FileNotFoundError(json_path)
+            
+            if offset:
+                print(f"⏩ Resuming {json_path} from entry {offset}")
+            else:
+                print(f"📥 Streaming diseases from {json_path}")
+            
+            self.create_constraints()
             
-            print(f"📥 Loaded {len(medical_data)} diseases from JSON")
+            start = time.perf_counter()
+            rows_written = 0
+            rels_written = 0
             
-            for disease_entry in medical_data:
-                disease_name = disease_entry.get("maladie", "Unknown")
-                
-                # Créer nœud Disease
-                self.graph.query(f"""
-                    MERGE (d:Disease {{name: "{disease_name}"}})
-                """)
-                
-                # Créer Symptoms
-                for symptom in disease_entry.get("symptomes", []):
-                    self.graph.query(f"""
-                        MERGE (s:Symptom {{name: "{symptom}"}})
-                        WITH s
-                        MATCH (d:Disease {{name: "{disease_name}"}})
-                        MERGE (d)-[:HAS_SYMPTOM]->(s)
-                    """)
-                
-                # Créer Treatments
-                for treatment in disease_entry.get("traitements", []):
-                    self.graph.query(f"""
-                        MERGE (t:Treatment {{name: "{treatment}"}})
-                        WITH t
-                        MATCH (d:Disease {{name: "{disease_name}"}})
-                        MERGE (d)-[:TREATED_WITH]->(t)
-                    """)
-                
-                # Créer Causes
-                for cause in disease_entry.get("causes", []):
-                    self.graph.query(f"""
-                        MERGE (c:Cause {{name: "{cause}"}})
-                        WITH c
-                        MATCH (d:Disease {{name: "{disease_name}"}})
-                        MERGE (d)-[:CAUSED_BY]->(c)
-                    """)
+            rows = (self._to_row(entry) for entry in iter_catalog(json_path, start=offset))
+            for batch in self._batched(rows, batch_size):
+                self._write(BULK_UPSERT_QUERY, {"rows": batch})
+                rows_written += len(batch)
+                rels_written += sum(
+                    len(r["symptoms"]) + len(r["treatments"]) + len(r["causes"])
+                    for r in batch
+                )
+                checkpoint.save(offset + rows_written)
             
-            print("✅ Database seeded successfully")
+            checkpoint.clear()
+            elapsed = max(time.perf_counter() - start, 1e-9)
+            print(
+                f"✅ Database seeded successfully: {rows_written} diseases, "
+                f"{rels_written} relations in {elapsed:.2f}s "
+                f"({rows_written / elapsed:.0f} rows/s)"
+            )
             return True
         
         except FileNotFoundError:
@@ -62,10 +159,166 @@ class DataSeeder:
             print(f"❌ Seeding error: {e}")
             return False
     
+    def seed_delta(self, json_path: str = "data/medical_data.json",
+                   batch_size: int = None) -> bool:
+        """
+        Synchronise le graphe avec le catalogue sans tout recharger:
+        seules les maladies dont le hash a changé sont réécrites et
+        celles absentes du catalogue sont supprimées par lots. Le nettoyage
+        des orphelins ne porte que sur les nœuds liés à ces maladies.
+        """
+        batch_size = batch_size or self.batch_size
+        try:
+            if not os.path.exists(json_path):
+                raise FileNotFoundError(json_path)
+            
+            self.create_constraints()
+            start = time.perf_counter()
+            
+            existing = {
+                row["name"]: row.get("hash")
+                for row in self.graph.query(EXISTING_HASHES_QUERY)
+            }
+            print(f"🔎 {len(existing)} diseases already in graph")
+            
+            seen = set()
+            candidates = {param: set() for param in ORPHAN_PARAMS.values()}
+            stats = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+            
+            def changed_rows():
+                for entry in iter_catalog(json_path):
+                    row = self._to_row(entry)
+                    seen.add(row["name"])
+                    if row["name"] not in existing:
+                        stats["added"] += 1
+                    elif existing[row["name"]] != row["hash"]:
+                        stats["updated"] += 1
+                    else:
+                        stats["unchanged"] += 1
+                        continue
+                    yield row
+            
+            for batch in self._batched(changed_rows(), batch_size):
+                self._collect_linked([row["name"] for row in batch if row["name"] in existing], candidates)
+                self._write(REPLACE_QUERY, {"rows": batch})
+            
+            removed = [name for name in existing if name not in seen]
+            for names in self._batched(removed, batch_size):
+                self._collect_linked(names, candidates)
+                self._write(DELETE_DISEASES_QUERY, {"names": names})
+            stats["removed"] = len(removed)
+            
+            self._delete_orphans(candidates, batch_size)
+            
+            elapsed = time.perf_counter() - start
+            print(
+                f"✅ Delta applied in {elapsed:.2f}s: "
+                f"+{stats['added']} ~{stats['updated']} -{stats['removed']} "
+                f"({stats['unchanged']} unchanged)"
+            )
+            return True
+        
+        except FileNotFoundError:
+            print(f"❌ JSON file not found: {json_path}")
+            return False
+        except Exception as e:
+            print(f"❌ Delta seeding error: {e}")
+            return False
+    
+    def create_constraints(self):
+        """Crée les contraintes d'unicité / index sur `name` (idempotent)."""
+        for statement in SCHEMA_CONSTRAINTS:
+            self.graph.query(statement)
+    
     def clear_database(self):
-        """Vide la base de données."""
+        """Vide la base de données par lots (jamais une transaction géante)."""
         try:
-            self.graph.query("MATCH (n) DETACH DELETE n")
-            print("🗑️ Database cleared")
+            deleted = self._delete_in_chunks(CLEAR_CHUNK_QUERY, self.batch_size)
+            print(f"🗑️ Database cleared ({deleted} nodes)")
         except Exception as e:
-            print(f"❌ Clear error: {e}")
\ No newline at end of file
+            print(f"❌ Clear error: {e}")
+    
+    def _collect_linked(self, names: list, candidates: dict):
+        """Ajoute aux candidats orphelins les nœuds liés aux maladies `names`."""
+        if not names:
+            return
+        for row in self.graph.query(LINKED_NODES_QUERY, {"names": names}):
+            candidates[ORPHAN_PARAMS[row["relation"]]].update(row["names"])
+    
+    def _delete_orphans(self, candidates: dict, limit: int) -> int:
+        """Supprime, par lots de `limit` noms, les candidats qui n'ont plus aucune relation."""
+        total = 0
+        pending = {param: sorted(names) for param, names in candidates.items()}
+        while any(pending.values()):
+            params = {param: names[:limit] for param, names in pending.items()}
+            pending = {param: names[limit:] for param, names in pending.items()}
+            result = self._write(DELETE_ORPHANS_QUERY, params)
+            total += result[0]["deleted"] if result else 0
+        return total
+    
+    def _delete_in_chunks(self, cypher: str, limit: int) -> int:
+        """Répète une suppression `LIMIT $limit` jusqu'à ce qu'elle ne supprime plus rien."""
+        total = 0
+        while True:
+            result = self._write(cypher, {"limit": limit})
+            deleted = result[0]["deleted"] if result else 0
+            total += deleted
+            if deleted == 0:
+                return total
+    
+    def _write(self, cypher: str, params: dict) -> list:
+        """
+        Exécute une écriture dans une transaction explicite et incrémente
+        la version du graphe dans la même transaction.
+        """
+        driver = getattr(self.graph, "_driver", None)
+        if driver is None:
+            result = self.graph.query(cypher, params)
+            self.graph.query(BUMP_GRAPH_VERSION_QUERY)
+        else:
+            def work(tx):
+                data = tx.run(cypher, params).data()
+                tx.run(BUMP_GRAPH_VERSION_QUERY).consume()
+                return data
+            
+            database = getattr(self.graph, "_database", None)
+            with span("graph.write", rows=len(params.get("rows", ()))):
+                with driver.session(database=database) as session:
+                    result = session.execute_write(work)
+        
+        # Invalide les index/caches construits sur l'ancienne version
+        bump_version()
+        return result
+    
+    @staticmethod
+    def _to_row(entry: dict) -> dict:
+        """Convertit une entrée JSON en paramètres de la requête UNWIND."""
+        row = {
+            "name": entry.get("maladie", "Unknown"),
+            "symptoms": list(dict.fromkeys(entry.get("symptomes", []))),
+            "treatments": list(dict.fromkeys(entry.get("traitements", []))),
+            "causes": list(dict.fromkeys(entry.get("causes", []))),
+        }
+        row["hash"] = DataSeeder._content_hash(row)
+        row["profile"] = encode_profile(row)
+        return row
+    
+    @staticmethod
+    def _content_hash(row: dict) -> str:
+        """Hash stable d'une maladie (indépendant de l'ordre des listes)."""
+        canonical = json.dumps(
+            {key: sorted(value) if isinstance(value, list) else value
+             for key, value in row.items()},
+            ensure_ascii=False, sort_keys=True
+        )
+        return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def _batched(iterable, size: int):
+        """Découpe un itérable en lots de `size` éléments."""
+        iterator = iter(iterable)
+        while True:
+            batch = list(islice(iterator, size))
+            if not batch:
+                return
+            yield batch
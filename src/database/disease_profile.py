@@ -0,0 +1,41 @@
+import json
+from typing import Any, Dict, List
+
+# Profil matérialisé par maladie (propriété `d.profile`, JSON compact),
+# réécrit par DataSeeder avec les relations: une seule lecture indexée
+# par maladie suffit pour assembler la réponse.
+DISEASE_PROFILES_QUERY = """
+UNWIND $names AS name
+MATCH (d:Disease {name: name})
+RETURN d.name AS disease, d.profile AS profile
+"""
+
+PROFILE_FIELDS = ("symptoms", "treatments", "causes")
+
+
+def encode_profile(row: dict) -> str:
+    """Profil compact d'une ligne du seeder: listes et compteurs."""
+    profile = {field: row[field] for field in PROFILE_FIELDS}
+    profile["counts"] = {field: len(row[field]) for field in PROFILE_FIELDS}
+    return json.dumps(profile, ensure_ascii=False, separators=(",", ":"))
+
+
+def decode_profile(disease: str, text: str) -> dict:
+    """{disease, symptoms, treatments, causes, counts} à partir de `d.profile`."""
+    profile = json.loads(text)
+    profile["disease"] = disease
+    return profile
+
+
+def fetch_profiles(graph: Any, names: List[str]) -> Dict[str, dict]:
+    """
+    Profils des maladies demandées en un aller-retour. Les maladies sans
+    profil (graphe peuplé avant la matérialisation) sont absentes du résultat.
+    """
+    if not names:
+        return {}
+    rows = graph.query(DISEASE_PROFILES_QUERY, {"names": list(dict.fromkeys(names))})
+    return {
+        row["disease"]: decode_profile(row["disease"], row["profile"])
+        for row in rows if row.get("profile")
+    }
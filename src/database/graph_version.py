@@ -0,0 +1,37 @@
+import threading
+
+# Compteur de version du graphe, incrémenté par DataSeeder à chaque écriture.
+# La version locale sert aux index en mémoire de ce processus; la version
+# persistée (nœud GraphMeta) est partagée par tous les processus (caches).
+_lock = threading.Lock()
+_version = 0
+
+BUMP_GRAPH_VERSION_QUERY = """
+MERGE (m:GraphMeta {key: 'catalog'})
+SET m.version = coalesce(m.version, 0) + 1
+RETURN m.version AS version
+"""
+
+GRAPH_VERSION_QUERY = """
+MATCH (m:GraphMeta {key: 'catalog'})
+RETURN m.version AS version
+"""
+
+
+def current_version() -> int:
+    """Version courante du graphe dans ce processus."""
+    return _version
+
+
+def bump_version() -> int:
+    """Signale une écriture dans le graphe; retourne la nouvelle version."""
+    global _version
+    with _lock:
+        _version += 1
+        return _version
+
+
+def read_graph_version(graph) -> int:
+    """Version persistée dans le graphe (0 si jamais écrite)."""
+    result = graph.query(GRAPH_VERSION_QUERY)
+    return result[0]["version"] if result else 0
@@ -1,29 +1,124 @@
+import json
 import os
-from langchain_community.graphs import Neo4jGraph
-from dotenv import load_dotenv
+import re
+import threading
+from typing import Dict
+from ..utils.env import load_env
+from ..utils.tracing import instrument_graph, span
+
+DEFAULT_TENANT = "default"
+
+# Clauses d'écriture (littéraux masqués): ces requêtes vont au primaire, les autres aux réplicas
+WRITE_CLAUSES = re.compile(
+    r"\b(CREATE|MERGE|DELETE|DETACH|SET|REMOVE|DROP|FOREACH|LOAD\s+CSV|ALTER|GRANT|DENY|REVOKE)\b",
+    re.IGNORECASE
+)
+STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+
+
+def is_write_query(query: str) -> bool:
+    return bool(WRITE_CLAUSES.search(STRING_LITERAL.sub("''", query)))
+
+
+def load_routing_table(path: str = None) -> Dict[str, dict]:
+    """
+    Table de routage {tenant: {uri, read_uri, database, username, password_env,
+    pool_size, retrieval_backend, snapshot_path, vector_index_dir}} lue depuis
+    NEO4J_TENANTS (fichier JSON). Le tenant "default" reprend les variables
+    NEO4J_*, RETRIEVAL_BACKEND, SNAPSHOT_PATH et VECTOR_INDEX_DIR sauf s'il est
+    redéfini dans le fichier. Snapshot et index vectoriel décrivent le
+    catalogue d'une base: les autres tenants ne les héritent pas.
+    """
+    table = {
+        DEFAULT_TENANT: {
+            "uri": os.getenv("NEO4J_URI"),
+            "read_uri": os.getenv("NEO4J_READ_URI"),
+            "database": os.getenv("NEO4J_DATABASE", "neo4j"),
+            "username": os.getenv("NEO4J_USERNAME", "neo4j"),
+            "password": os.getenv("NEO4J_PASSWORD"),
+            "pool_size": int(os.getenv("NEO4J_MAX_POOL_SIZE", 50)),
+            "retrieval_backend": os.getenv("RETRIEVAL_BACKEND", "graph"),
+            "snapshot_path": os.getenv("SNAPSHOT_PATH"),
+            "vector_index_dir": os.getenv("VECTOR_INDEX_DIR"),
+        }
+    }
+    path = path or os.getenv("NEO4J_TENANTS")
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            for tenant, route in json.load(f).items():
+                base = dict(table[DEFAULT_TENANT])
+                # Les secrets restent dans l'environnement: le fichier nomme la variable
+                if "password_env" in route:
+                    base["password"] = os.getenv(route["password_env"])
+                base.update(read_uri=None, snapshot_path=None, vector_index_dir=None)
+                base.update({k: v for k, v in route.items() if k != "password_env"})
+                table[tenant] = base
+    return table
+
+
+def tenant_route(tenant: str = None) -> dict:
+    """Entrée de la table de routage du tenant (NEO4J_TENANT par défaut), None si inconnu."""
+    load_env()
+    return load_routing_table().get(tenant or os.getenv("NEO4J_TENANT", DEFAULT_TENANT))
 
-load_dotenv()
 
 class Neo4jConnector:
-    """Gère la connexion à Neo4j."""
+    """
+    Gère la connexion à Neo4j pour un tenant (clinique): base nommée et
+    instance(s) données par la table de routage, lectures vers les réplicas,
+    écritures vers le primaire.
+    """
     
-    def __init__(self):
-        self.uri = os.getenv("NEO4J_URI")
-        self.username = os.getenv("NEO4J_USERNAME", "neo4j")
-        self.password = os.getenv("NEO4J_PASSWORD")
+    # Un driver (donc un pool de connexions) par instance Neo4j, partagé par
+    # tous les tenants qu'elle héberge; un graphe par (instance, base)
+    _shared_drivers = {}
+    _shared_graphs = {}
+    _lock = threading.Lock()
+    
+    def __init__(self, tenant: str = None):
+        load_env()
+        self.tenant = tenant or os.getenv("NEO4J_TENANT", DEFAULT_TENANT)
+        route = tenant_route(self.tenant)
+        if route is None:
+            raise ValueError(f"❌ Unknown tenant: {self.tenant}")
+        self.uri = route["uri"]
+        self.read_uri = route.get("read_uri") or self.uri
+        self.database = route.get("database") or "neo4j"
+        self.username = route.get("username", "neo4j")
+        self.password = route.get("password")
+        self.pool_size = int(route.get("pool_size", 50))
         self._graph = None
     
-    def get_graph(self) -> Neo4jGraph:
-        """Retourne la connexion Neo4j."""
+    def get_graph(self) -> "RoutedNeo4jGraph":
+        """Retourne la connexion Neo4j du tenant (partagée, schéma chargé une seule fois)."""
         if self._graph is None:
-            self._graph = Neo4jGraph(
-                url=self.uri,
-                username=self.username,
-                password=self.password
-            )
-            self._graph.refresh_schema()
+            key = (self.uri, self.read_uri, self.username, self.database)
+            with self._lock:
+                graph = self._shared_graphs.get(key)
+                if graph is None:
+                    from .routed_graph import RoutedNeo4jGraph
+                    writer = self._driver(self.uri)
+                    reader = writer if self.read_uri == self.uri else self._driver(self.read_uri)
+                    graph = RoutedNeo4jGraph(writer, reader, self.database, connector=self)
+                    graph.refresh_schema()
+                    instrument_graph(graph)
+                    self._shared_graphs[key] = graph
+            self._graph = graph
         return self._graph
     
+    def _driver(self, uri: str):
+        """Driver partagé de l'instance `uri` (appelé sous `_lock`)."""
+        key = (uri, self.username)
+        driver = self._shared_drivers.get(key)
+        if driver is None:
+            from neo4j import GraphDatabase
+            driver = GraphDatabase.driver(
+                uri, auth=(self.username, self.password), max_connection_pool_size=self.pool_size
+            )
+            driver.verify_connectivity()
+            self._shared_drivers[key] = driver
+        return driver
+    
     def test_connection(self) -> bool:
         """Teste la connexion Neo4j."""
         try:
@@ -33,3 +128,40 @@ class Neo4jConnector:
         except Exception as e:
             print(f"❌ Connection failed: {e}")
             return False
+    
+    def get_async_graph(self) -> "AsyncNeo4jGraph":
+        """Connexion asynchrone (driver neo4j async, à utiliser dans une seule boucle)."""
+        return AsyncNeo4jGraph(self.read_uri, self.username, self.password, self.pool_size, self.database)
+    
+    @classmethod
+    def close_all(cls):
+        """Ferme tous les drivers partagés (arrêt du processus)."""
+        with cls._lock:
+            for driver in cls._shared_drivers.values():
+                driver.close()
+            cls._shared_drivers.clear()
+            cls._shared_graphs.clear()
+
+
+class AsyncNeo4jGraph:
+    """Surface `query()` minimale au-dessus du driver neo4j asynchrone."""
+    
+    def __init__(self, uri: str, username: str, password: str,
+                 pool_size: int = 50, database: str = None):
+        from neo4j import AsyncGraphDatabase
+        self._driver = AsyncGraphDatabase.driver(
+            uri, auth=(username, password), max_connection_pool_size=pool_size
+        )
+        self._database = database or os.getenv("NEO4J_DATABASE", "neo4j")
+    
+    async def query(self, query: str, params: dict = None) -> list:
+        with span("graph.query") as s:
+            records, _, _ = await self._driver.execute_query(
+                query, parameters_=params or {}, database_=self._database,
+                routing_="w" if is_write_query(query) else "r"
+            )
+            s.attrs["rows"] = len(records)
+        return [record.data() for record in records]
+    
+    async def close(self):
+        await self._driver.close()
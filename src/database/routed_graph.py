@@ -0,0 +1,36 @@
+from typing import Any, Dict, List
+from langchain_community.graphs import Neo4jGraph
+from neo4j import Query, RoutingControl
+from .neo4j_connector import is_write_query
+
+
+class RoutedNeo4jGraph(Neo4jGraph):
+    """
+    Neo4jGraph sur des drivers partagés: écritures vers le primaire, lectures
+    routées vers les réplicas (`routing_=READ`, ou driver `read_uri` distinct).
+    `connector` est le Neo4jConnector qui l'a créé (instance et base du graphe).
+    """
+    
+    def __init__(self, writer: Any, reader: Any, database: str, timeout: float = None,
+                 connector: Any = None):
+        # Pas de Neo4jGraph.__init__: il créerait un driver (et un pool) par graphe
+        self._driver = writer
+        self._reader = reader
+        self._database = database
+        self.connector = connector
+        self.timeout = timeout
+        self.sanitize = False
+        self._enhanced_schema = False
+        self.schema = ""
+        self.structured_schema = {}
+    
+    def query(self, query: str, params: dict = {}) -> List[Dict[str, Any]]:
+        if is_write_query(query):
+            return super().query(query, params)
+        records, _, _ = self._reader.execute_query(
+            Query(text=query, timeout=self.timeout),
+            database_=self._database,
+            parameters_=params,
+            routing_=RoutingControl.READ
+        )
+        return [record.data() for record in records]
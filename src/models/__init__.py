@@ -1,6 +1,10 @@
 """
 Models package
 """
-from .groq_llm import GroqLLM
+from ..utils.lazy import lazy_exports
 
-__all__ = ['GroqLLM']
\ No newline at end of file
+__all__ = ['GroqLLM']
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'GroqLLM': '.groq_llm',
+})
@@ -1,14 +1,13 @@
 import os
-from langchain_groq import ChatGroq
-from litellm import completion
-from dotenv import load_dotenv
-
-load_dotenv()
+from ..utils.env import load_env
+from ..utils.tracing import metrics, span
+from .llm_metrics import LLMMetricsHandler, record_usage
 
 class GroqLLM:
     """Configure et retourne le LLM Groq avec support CrewAI."""
     
     def __init__(self):
+        load_env()
         self.model = os.getenv("GROQ_MODEL_NAME", "llama-3.3-70b-versatile")
         self.api_key = os.getenv("GROQ_API_KEY")
         
@@ -25,15 +24,53 @@ class GroqLLM:
     
     def get_llm(self):
         """Retourne une instance ChatGroq compatible CrewAI."""
+        from langchain_groq import ChatGroq
         return ChatGroq(
             model=self.model,
             api_key=self.api_key,
             temperature=0.3,
             max_tokens=4000,
             timeout=90,
-            max_retries=3
+            max_retries=3,
+            callbacks=[LLMMetricsHandler(self.get_model_name())]
         )
     
     def get_model_name(self) -> str:
         """Retourne le nom du modèle pour LiteLLM."""
-        return f"groq/{self.model}"
\ No newline at end of file
+        return f"groq/{self.model}"
+    
+    def complete(self, prompt: str, stream: bool = False, **kwargs):
+        """Appel LLM unique via LiteLLM (générateur de fragments si `stream`)."""
+        # LiteLLM coûte plusieurs secondes à l'import: chargé au premier appel
+        from litellm import completion
+        metrics.inc("rag_llm_calls_total", model=self.get_model_name())
+        with span("llm.complete", model=self.get_model_name(), stream=stream):
+            response = completion(
+                model=self.get_model_name(),
+                api_key=self.api_key,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=kwargs.pop("temperature", 0.3),
+                max_tokens=kwargs.pop("max_tokens", 2000),
+                stream=stream,
+                **kwargs
+            )
+        if stream:
+            return (chunk.choices[0].delta.content or "" for chunk in response)
+        record_usage(self.get_model_name(), getattr(response, "usage", None))
+        return response.choices[0].message.content
+    
+    async def acomplete(self, prompt: str, **kwargs) -> str:
+        """Variante asynchrone de `complete`."""
+        from litellm import acompletion
+        metrics.inc("rag_llm_calls_total", model=self.get_model_name())
+        with span("llm.complete", model=self.get_model_name()):
+            response = await acompletion(
+                model=self.get_model_name(),
+                api_key=self.api_key,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=kwargs.pop("temperature", 0.3),
+                max_tokens=kwargs.pop("max_tokens", 2000),
+                **kwargs
+            )
+        record_usage(self.get_model_name(), getattr(response, "usage", None))
+        return response.choices[0].message.content
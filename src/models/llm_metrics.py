@@ -0,0 +1,42 @@
+import time
+from typing import Any, Dict
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from ..utils.tracing import metrics, record_span, STAGE_ERRORS
+
+
+def record_usage(model: str, usage: Any):
+    """Compteurs de tokens à partir d'un objet/dict `usage` (LiteLLM, LangChain)."""
+    if not usage:
+        return
+    get = usage.get if isinstance(usage, dict) else lambda k, d=None: getattr(usage, k, d)
+    for kind in ("prompt_tokens", "completion_tokens"):
+        value = get(kind, 0) or 0
+        if value:
+            metrics.inc("rag_llm_tokens_total", value, model=model, kind=kind.split("_")[0])
+
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """Callback LangChain: durée de chaque appel du modèle de chat et tokens consommés."""
+    
+    def __init__(self, model: str, stage: str = "llm.chat"):
+        self.model = model
+        self.stage = stage
+        self._started: Dict[UUID, float] = {}
+    
+    def on_chat_model_start(self, serialized: dict, messages: list, *, run_id: UUID, **kwargs):
+        self._started[run_id] = time.perf_counter()
+    
+    def on_llm_start(self, serialized: dict, prompts: list, *, run_id: UUID, **kwargs):
+        self._started[run_id] = time.perf_counter()
+    
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs):
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            record_span(self.stage, time.perf_counter() - started, model=self.model)
+        metrics.inc("rag_llm_calls_total", model=self.model)
+        record_usage(self.model, (response.llm_output or {}).get("token_usage"))
+    
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        self._started.pop(run_id, None)
+        metrics.inc(STAGE_ERRORS, stage=self.stage)
@@ -0,0 +1,94 @@
+"""
+Registre des ressources partagées par le processus (graphe, LLM, tool,
+orchestrateur). Chaque ressource est construite une seule fois, de façon
+thread-safe, puis réutilisée par toutes les requêtes et sessions.
+"""
+import os
+import threading
+from typing import Any, Callable
+from .utils.env import load_env
+
+_lock = threading.RLock()
+_instances = {}
+
+
+def get_or_create(name: str, factory: Callable[[], Any]) -> Any:
+    """Retourne la ressource `name`, construite au premier appel."""
+    instance = _instances.get(name)
+    if instance is None:
+        with _lock:
+            instance = _instances.get(name)
+            if instance is None:
+                instance = factory()
+                _instances[name] = instance
+    return instance
+
+
+def reset():
+    """Oublie toutes les ressources (tests, changement de configuration)."""
+    with _lock:
+        _instances.clear()
+
+
+def _scoped(name: str, tenant: str = None) -> str:
+    return f"{name}:{tenant}" if tenant else name
+
+
+def get_graph(tenant: str = None):
+    """Graphe Neo4j du tenant, ou graphe en mémoire si GRAPH_BACKEND=memory (hors ligne)."""
+    load_env()
+    if os.getenv("GRAPH_BACKEND", "neo4j") == "memory":
+        return get_or_create("graph", _memory_graph)
+    from .database.neo4j_connector import Neo4jConnector
+    return get_or_create(_scoped("graph", tenant), lambda: Neo4jConnector(tenant).get_graph())
+
+
+def _memory_graph():
+    from .backends import MemoryGraph
+    from .database.data_seeder import DataSeeder
+    from .utils.tracing import instrument_graph
+    graph = instrument_graph(MemoryGraph())
+    DataSeeder(graph).seed_from_json(os.getenv("MEMORY_GRAPH_CATALOG", "data/medical_data.json"))
+    return graph
+
+
+def get_groq():
+    """Client Groq, ou LLM déterministe local si LLM_BACKEND=fake."""
+    load_env()
+    if os.getenv("LLM_BACKEND", "groq") == "fake":
+        return get_or_create("groq", _fake_llm)
+    from .models.groq_llm import GroqLLM
+    return get_or_create("groq", GroqLLM)
+
+
+def _fake_llm():
+    from .backends import FakeLLM
+    from .retrieval import SymptomMatcher
+    matcher = SymptomMatcher(get_graph())
+    return FakeLLM(
+        extract_symptoms=matcher.match,
+        latency_ms=float(os.getenv("FAKE_LLM_LATENCY_MS", "0"))
+    )
+
+
+def get_tool(tenant: str = None):
+    """MedicalRAGTool partagé (par tenant): GraphCypherQAChain et index construits une fois."""
+    from .tools.medical_rag_tool import MedicalRAGTool
+    return get_or_create(
+        _scoped("tool", tenant),
+        lambda: MedicalRAGTool(graph=get_graph(tenant), tenant=tenant, llm=get_groq().get_llm())
+    )
+
+
+def get_scheduler():
+    """Ordonnanceur borné unique: la limite de concurrence vaut pour tout le processus, tous tenants confondus."""
+    from .utils.concurrency import BoundedScheduler
+    return get_or_create("scheduler", BoundedScheduler)
+
+
+def get_orchestrator(tenant: str = None):
+    from .agents.crew_orchestrator import MedicalCrewOrchestrator
+    return get_or_create(
+        _scoped("orchestrator", tenant),
+        lambda: MedicalCrewOrchestrator(groq=get_groq(), tool=get_tool(tenant), scheduler=get_scheduler())
+    )
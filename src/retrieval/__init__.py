@@ -0,0 +1,7 @@
+"""
+Retrieval package
+"""
+from .symptom_matcher import SymptomMatcher
+from .term_index import TermIndex
+
+__all__ = ['SymptomMatcher', 'TermIndex']
@@ -0,0 +1,76 @@
+import asyncio
+from typing import Any, List
+
+
+class QueueFullError(Exception):
+    """Levée quand la file d'attente dépasse sa profondeur maximale (backpressure)."""
+
+
+class RetrievalBatcher:
+    """
+    Regroupe les classements demandés par des requêtes concurrentes:
+    les jeux de symptômes arrivés pendant `max_wait_ms` (au plus `max_batch`)
+    partent ensemble dans une seule requête UNWIND (`rank_many`).
+    """
+    
+    def __init__(self, retriever: Any, max_batch: int = 64,
+                 max_wait_ms: float = 5.0, max_queue: int = 1000):
+        self.retriever = retriever
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self._queue = None
+        self._worker = None
+        self.batches = 0
+    
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+    
+    def start(self):
+        """Démarre la tâche de regroupement dans la boucle courante."""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._drain())
+    
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+    
+    async def rank(self, symptoms: List[str]) -> List[dict]:
+        """Classe un jeu de symptômes via le prochain lot."""
+        self.start()
+        if self._queue.qsize() >= self.max_queue:
+            raise QueueFullError(f"Retrieval queue full ({self.max_queue})")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((symptoms, future))
+        return await future
+    
+    async def _drain(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = asyncio.get_running_loop().time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            self.batches += 1
+            try:
+                results = await self.retriever.arank_many([symptoms for symptoms, _ in batch])
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
@@ -0,0 +1,266 @@
+"""
+Snapshot binaire colonnaire du catalogue médical.
+
+Un seul fichier, lu par `mmap` sans copie: tables de chaînes internées
+(triées, donc recherche par dichotomie sans dictionnaire Python) et
+adjacences CSR par type de relation. Plusieurs processus partagent les
+mêmes pages du cache système au lieu de reconstruire chacun le graphe.
+
+Format (little-endian):
+    en-tête   magic(8) | version du format (u32) | nombre de sections (u32)
+    sections  nom (32 octets) | type (1 octet) | offset (u64) | nombre d'éléments (u64)
+    données   alignées sur 8 octets
+
+La section "meta" (JSON) porte l'empreinte du catalogue et la version
+persistée du graphe (GraphMeta) au moment de la construction: un index
+adossé au snapshot sait ainsi s'il est plus ancien que le graphe.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+from typing import Dict, Iterable, Iterator, List
+import numpy as np
+from scipy import sparse
+
+MAGIC = b"MEDSNAP\x00"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sII")
+SECTION = struct.Struct("<32scQQ")
+
+# Type d'élément -> (format memoryview, dtype numpy)
+DTYPES = {b"B": ("B", np.uint8), b"i": ("i", np.int32), b"q": ("q", np.int64)}
+
+KINDS = ("disease", "symptom", "treatment", "cause")
+
+# Relation -> (champ du catalogue, type des nœuds cibles)
+RELATIONS = {
+    "HAS_SYMPTOM": ("symptomes", "symptom"),
+    "TREATED_WITH": ("traitements", "treatment"),
+    "CAUSED_BY": ("causes", "cause"),
+}
+
+
+class StringTable:
+    """Table de chaînes triées (octets UTF-8 + offsets), décodées à la demande."""
+    
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self._offsets = offsets
+        self._blob = blob
+    
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+    
+    def __getitem__(self, i) -> str:
+        i = int(i)
+        if i < 0:
+            i += len(self)
+        return bytes(self._blob[self._offsets[i]:self._offsets[i + 1]]).decode("utf-8")
+    
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self[i]
+    
+    def _key(self, i: int) -> bytes:
+        return bytes(self._blob[self._offsets[i]:self._offsets[i + 1]])
+    
+    def index(self, name: str) -> int:
+        """Identifiant d'une chaîne (dichotomie sur les octets), KeyError si absente."""
+        target = name.encode("utf-8")
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self) and self._key(lo) == target:
+            return lo
+        raise KeyError(name)
+    
+    def __contains__(self, name: str) -> bool:
+        try:
+            self.index(name)
+            return True
+        except KeyError:
+            return False
+
+
+class Snapshot:
+    """
+    Snapshot ouvert en lecture seule (mmap partagé, tableaux sans copie).
+    Pas de fermeture explicite: les tableaux et vues remis aux index
+    référencent le mmap, qui est libéré quand le dernier d'entre eux l'est.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        
+        magic, version, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"❌ Not a catalog snapshot: {path}")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"❌ Unsupported snapshot format v{version} (expected v{FORMAT_VERSION})")
+        
+        self._sections = {}
+        for i in range(count):
+            raw_name, code, offset, length = SECTION.unpack_from(self._mmap, HEADER.size + i * SECTION.size)
+            self._sections[raw_name.rstrip(b"\x00").decode("ascii")] = (code, offset, length)
+        
+        self.meta = json.loads(bytes(self.section("meta")).decode("utf-8"))
+        self.graph_version = int(self.meta.get("graph_version", 0))
+        self.tables = {
+            kind: StringTable(self.section(f"{kind}.offsets"), self.section(f"{kind}.blob"))
+            for kind in KINDS
+        }
+    
+    def section(self, name: str) -> memoryview:
+        """Vue typée (memoryview.cast) sur une section, sans copie."""
+        code, offset, length = self._sections[name]
+        fmt, dtype = DTYPES[code]
+        size = length * np.dtype(dtype).itemsize
+        return self._view[offset:offset + size].cast(fmt)
+    
+    def array(self, name: str) -> np.ndarray:
+        """Même section exposée comme tableau numpy (lecture seule, sans copie)."""
+        code, offset, length = self._sections[name]
+        return np.frombuffer(self._mmap, dtype=DTYPES[code][1], count=length, offset=offset)
+    
+    def adjacency(self, relation: str) -> sparse.csr_matrix:
+        """Matrice maladies × cibles de la relation (CSR sur les tableaux mappés)."""
+        target = RELATIONS[relation][1]
+        indices = self.array(f"{relation}.indices")
+        return sparse.csr_matrix(
+            (np.ones(indices.size, dtype=np.float32), indices, self.array(f"{relation}.indptr")),
+            shape=(len(self.tables["disease"]), len(self.tables[target]))
+        )
+    
+    def reverse_adjacency(self, relation: str = "HAS_SYMPTOM") -> sparse.csr_matrix:
+        """Matrice cibles × maladies (postings précalculés à la construction)."""
+        target = RELATIONS[relation][1]
+        indices = self.array(f"{relation}.rev_indices")
+        return sparse.csr_matrix(
+            (np.ones(indices.size, dtype=np.float32), indices, self.array(f"{relation}.rev_indptr")),
+            shape=(len(self.tables[target]), len(self.tables["disease"]))
+        )
+    
+    def neighbours(self, relation: str, disease: int) -> List[str]:
+        indptr = self.section(f"{relation}.indptr")
+        indices = self.section(f"{relation}.indices")
+        table = self.tables[RELATIONS[relation][1]]
+        return [table[j] for j in indices[indptr[disease]:indptr[disease + 1]]]
+    
+    def profile(self, name: str) -> dict:
+        """Symptômes, traitements et causes d'une maladie (même forme que le profil du graphe)."""
+        disease = self.tables["disease"].index(name)
+        profile = {
+            "disease": name,
+            "symptoms": self.neighbours("HAS_SYMPTOM", disease),
+            "treatments": self.neighbours("TREATED_WITH", disease),
+            "causes": self.neighbours("CAUSED_BY", disease),
+        }
+        profile["counts"] = {key: len(profile[key]) for key in ("symptoms", "treatments", "causes")}
+        return profile
+
+
+def _encode_table(names: List[str]) -> tuple:
+    encoded = [name.encode("utf-8") for name in names]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+def build_snapshot(entries: Iterable[dict], path: str, graph_version: int = 0) -> dict:
+    """
+    Compile des entrées du catalogue ({maladie, symptomes, traitements, causes})
+    en snapshot binaire. Écriture atomique (fichier temporaire puis rename).
+    `graph_version` est la version persistée du graphe que ce catalogue reflète.
+    Retourne les métadonnées écrites.
+    """
+    start = time.perf_counter()
+    interned: Dict[str, Dict[str, int]] = {kind: {} for kind in KINDS}
+    links = {relation: ([0], []) for relation in RELATIONS}
+    digest = hashlib.sha1()
+    
+    for entry in entries:
+        name = entry.get("maladie", "Unknown")
+        if name in interned["disease"]:
+            raise ValueError(f"❌ Duplicate disease in catalog: {name}")
+        interned["disease"][name] = len(interned["disease"])
+        digest.update(json.dumps(entry, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+        for relation, (field, kind) in RELATIONS.items():
+            ids = interned[kind]
+            indptr, indices = links[relation]
+            indices.extend(sorted({ids.setdefault(v, len(ids)) for v in entry.get(field, [])}))
+            indptr.append(len(indices))
+    
+    # Tables triées: l'identifiant final d'une chaîne est son rang
+    order, rank = {}, {}
+    for kind, ids in interned.items():
+        names = list(ids)
+        order[kind] = np.argsort(np.array([n.encode("utf-8") for n in names], dtype=object), kind="stable")
+        rank[kind] = np.empty(len(names), dtype=np.int64)
+        rank[kind][order[kind]] = np.arange(len(names))
+        interned[kind] = [names[i] for i in order[kind]]
+    
+    sections = {}
+    for kind in KINDS:
+        sections[f"{kind}.offsets"], sections[f"{kind}.blob"] = _encode_table(interned[kind])
+    
+    n_diseases = len(interned["disease"])
+    for relation, (field, kind) in RELATIONS.items():
+        indptr, indices = links[relation]
+        matrix = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float32),
+             rank[kind][np.asarray(indices, dtype=np.int64)],
+             np.asarray(indptr, dtype=np.int64)),
+            shape=(n_diseases, len(interned[kind]))
+        )[order["disease"]]
+        matrix.sort_indices()
+        reverse = matrix.T.tocsr()
+        reverse.sort_indices()
+        sections[f"{relation}.indptr"] = matrix.indptr.astype(np.int32)
+        sections[f"{relation}.indices"] = matrix.indices.astype(np.int32)
+        sections[f"{relation}.rev_indptr"] = reverse.indptr.astype(np.int32)
+        sections[f"{relation}.rev_indices"] = reverse.indices.astype(np.int32)
+    
+    meta = {
+        "format": FORMAT_VERSION,
+        "catalog_sha1": digest.hexdigest(),
+        "graph_version": int(graph_version),
+        "created_at": int(time.time()),
+        "counts": {kind: len(interned[kind]) for kind in KINDS},
+        "links": {relation: int(sections[f"{relation}.indices"].size) for relation in RELATIONS},
+    }
+    sections["meta"] = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+    
+    _write_sections(sections, path)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Snapshot written to {path}: {meta['counts']} in {elapsed:.2f}s")
+    return meta
+
+
+def _write_sections(sections: Dict[str, np.ndarray], path: str):
+    codes = {np.dtype(np.uint8): b"B", np.dtype(np.int32): b"i", np.dtype(np.int64): b"q"}
+    offset = HEADER.size + SECTION.size * len(sections)
+    table, layout = [], []
+    for name, array in sections.items():
+        offset = (offset + 7) & ~7
+        table.append(SECTION.pack(name.encode("ascii"), codes[array.dtype], offset, array.size))
+        layout.append((offset, array))
+        offset += array.nbytes
+    
+    tmp = f"{path}.tmp"
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(sections)))
+        f.write(b"".join(table))
+        for position, array in layout:
+            f.write(b"\x00" * (position - f.tell()))
+            f.write(np.ascontiguousarray(array).tobytes())
+    os.replace(tmp, path)
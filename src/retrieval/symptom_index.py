@@ -0,0 +1,306 @@
+import os
+import time
+from typing import Any, Callable, Iterable, List
+import numpy as np
+from scipy import sparse
+from ..database.catalog_reader import iter_catalog
+from ..database.graph_version import current_version, read_graph_version
+from .term_index import TermIndex, load_synonyms
+
+DISEASE_SYMPTOMS_QUERY = """
+MATCH (d:Disease)
+OPTIONAL MATCH (d)-[:HAS_SYMPTOM]->(s:Symptom)
+RETURN d.name AS disease, collect(s.name) AS symptoms
+"""
+
+SCORING_METHODS = ("overlap", "jaccard", "tfidf", "bm25")
+
+
+class SymptomIndex:
+    """
+    Index inversé symptôme → maladies en mémoire (matrices CSR).
+    Un jeu de symptômes est scoré contre toutes les maladies en une
+    opération vectorisée, sans aller-retour réseau vers Neo4j.
+    Adossé à un graphe, il suit aussi la version persistée (GraphMeta),
+    relue au plus toutes les `poll_interval` secondes: les écritures d'un
+    autre processus (populate_database.py, autre worker) sont reprises.
+    """
+    
+    def __init__(self, loader: Callable[[], Iterable[tuple]],
+                 scoring: str = "bm25", limit: int = 5,
+                 k1: float = 1.2, b: float = 0.75, synonyms: dict = None,
+                 snapshot: "Snapshot" = None, graph: Any = None, poll_interval: float = None):
+        if scoring not in SCORING_METHODS:
+            raise ValueError(f"❌ Unknown scoring: {scoring}")
+        self.loader = loader
+        self.scoring = scoring
+        self.limit = limit
+        self.k1 = k1
+        self.b = b
+        self.synonyms = load_synonyms() if synonyms is None else synonyms
+        self.snapshot = snapshot
+        self.graph = graph
+        self.poll_interval = (float(os.getenv("SYMPTOM_INDEX_POLL_S", 5.0))
+                              if poll_interval is None else poll_interval)
+        self.version = None
+        self._checked_at = 0.0
+        self.refresh()
+    
+    @classmethod
+    def from_catalog(cls, json_path: str = "data/medical_data.json", **kwargs) -> "SymptomIndex":
+        """Construit l'index directement depuis le catalogue JSON."""
+        def loader():
+            for entry in iter_catalog(json_path):
+                yield entry.get("maladie", "Unknown"), entry.get("symptomes", [])
+        return cls(loader, **kwargs)
+    
+    @classmethod
+    def from_graph(cls, graph, **kwargs) -> "SymptomIndex":
+        """Construit l'index depuis Neo4j (une seule requête)."""
+        return cls(cls._graph_loader(graph), graph=graph, **kwargs)
+    
+    @classmethod
+    def from_snapshot(cls, path: str, graph: Any = None, **kwargs) -> "SymptomIndex":
+        """
+        Index adossé à un snapshot binaire (scripts/build_snapshot.py): matrices
+        et noms de maladies lus par mmap, sans requête ni analyse du JSON.
+        Avec `graph`, un snapshot plus ancien que la version persistée du
+        graphe est remplacé par une construction depuis le graphe.
+        """
+        from .snapshot import Snapshot
+        loader = cls._graph_loader(graph) if graph is not None else None
+        return cls(loader, snapshot=Snapshot(path), graph=graph, **kwargs)
+    
+    @staticmethod
+    def _graph_loader(graph) -> Callable[[], Iterable[tuple]]:
+        def loader():
+            for row in graph.query(DISEASE_SYMPTOMS_QUERY):
+                yield row["disease"], row["symptoms"]
+        return loader
+    
+    def refresh(self):
+        """(Re)construit les matrices à partir de la source."""
+        start = time.perf_counter()
+        version = self._graph_version()
+        
+        if self._fresh_snapshot(version[1]):
+            self._load_snapshot()
+        else:
+            self._load()
+        
+        self.degree = np.diff(self._incidence.indptr).astype(np.float32)
+        self._postings = self._build_postings(self._incidence, self._postings_matrix)
+        self.terms = TermIndex(self.symptom_ids, self.synonyms)
+        self.version = version
+        self._checked_at = time.monotonic()
+        
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"🧮 SymptomIndex built: {len(self.diseases)} diseases × {len(self.symptoms)} symptoms "
+              f"({self._incidence.nnz} links) in {elapsed:.0f} ms")
+    
+    def _fresh_snapshot(self, persisted: int = None) -> bool:
+        """
+        True si le snapshot reflète la version persistée du graphe (fichier
+        rouvert s'il a été reconstruit entre-temps). Sinon l'index est
+        reconstruit depuis le graphe, ou une erreur est levée sans graphe.
+        """
+        if self.snapshot is None:
+            return False
+        if persisted is None or self.snapshot.graph_version >= persisted:
+            return True
+        from .snapshot import Snapshot
+        reopened = Snapshot(self.snapshot.path)
+        if reopened.graph_version >= persisted:
+            self.snapshot = reopened
+            return True
+        message = (f"Snapshot {self.snapshot.path} is older than the graph "
+                   f"(v{reopened.graph_version} < v{persisted})")
+        if self.loader is None:
+            raise ValueError(f"❌ {message}: rerun scripts/build_snapshot.py")
+        print(f"⚠️ {message}, rebuilding the index from the graph")
+        return False
+    
+    def _load_snapshot(self):
+        """Tableaux mappés du snapshot; seuls les noms de symptômes sont matérialisés."""
+        self.diseases = self.snapshot.tables["disease"]
+        self.symptoms = np.asarray(list(self.snapshot.tables["symptom"]), dtype=object)
+        self.symptom_ids = {name: i for i, name in enumerate(self.symptoms)}
+        # Table des maladies déjà triée par nom (octets UTF-8 = points de code)
+        self._name_rank = np.arange(len(self.diseases), dtype=np.int64)
+        self._incidence = self.snapshot.adjacency("HAS_SYMPTOM")
+        self._postings_matrix = self.snapshot.reverse_adjacency("HAS_SYMPTOM")
+    
+    def _load(self):
+        """Construit la matrice d'incidence à partir du loader."""
+        diseases, symptom_ids = [], {}
+        indptr, indices = [0], []
+        for disease, symptoms in self.loader():
+            diseases.append(disease)
+            row = {symptom_ids.setdefault(s, len(symptom_ids)) for s in symptoms}
+            indices.extend(sorted(row))
+            indptr.append(len(indices))
+        
+        n_diseases, n_symptoms = len(diseases), len(symptom_ids)
+        incidence = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float32),
+             np.asarray(indices, dtype=np.int32),
+             np.asarray(indptr, dtype=np.int64)),
+            shape=(n_diseases, n_symptoms)
+        )
+        
+        self.diseases = np.asarray(diseases, dtype=object)
+        self._name_rank = np.empty(n_diseases, dtype=np.int64)
+        self._name_rank[np.argsort(self.diseases, kind="stable")] = np.arange(n_diseases)
+        self.symptoms = np.empty(n_symptoms, dtype=object)
+        for name, idx in symptom_ids.items():
+            self.symptoms[idx] = name
+        self.symptom_ids = symptom_ids
+        self._incidence = incidence
+        self._postings_matrix = None
+    
+    def _build_postings(self, incidence: sparse.csr_matrix,
+                        postings: sparse.csr_matrix = None) -> dict:
+        """
+        Transposée CSR (une ligne par symptôme = sa liste de maladies) et
+        poids précalculés par méthode, alignés sur ses non-zéros.
+        """
+        if postings is None:
+            postings = incidence.T.tocsr()
+        n_diseases = max(incidence.shape[0], 1)
+        df = np.diff(postings.indptr).astype(np.float64)
+        rows = np.repeat(np.arange(postings.shape[0]), np.diff(postings.indptr))
+        cols = postings.indices
+        
+        # TF-IDF (tf binaire) normalisé par maladie → score cosinus
+        idf = np.log((1.0 + n_diseases) / (1.0 + df)) + 1.0
+        norms = np.sqrt(np.bincount(cols, weights=idf[rows] ** 2, minlength=n_diseases))
+        norms[norms == 0] = 1.0
+        
+        # BM25 (tf = 1): le poids ne dépend que de l'idf et de la longueur de la maladie
+        bm25_idf = np.log(1.0 + (n_diseases - df + 0.5) / (df + 0.5))
+        avg_len = self.degree.mean() if self.degree.size else 1.0
+        length_norm = (self.k1 + 1.0) / (
+            1.0 + self.k1 * (1.0 - self.b + self.b * self.degree / max(avg_len, 1e-9))
+        )
+        
+        return {
+            "overlap": postings,
+            "tfidf": idf[rows] / norms[cols],
+            "bm25": bm25_idf[rows] * length_norm[cols],
+            "idf": idf,
+        }
+    
+    def _graph_version(self) -> tuple:
+        """(version de ce processus, version persistée du graphe ou None sans graphe)."""
+        persisted = read_graph_version(self.graph) if self.graph is not None else None
+        return current_version(), persisted
+    
+    def _ensure_fresh(self):
+        """
+        Reconstruit l'index après une écriture: immédiatement pour celles de
+        ce processus, dans les `poll_interval` secondes pour les autres.
+        """
+        local_unchanged = self.version is not None and self.version[0] == current_version()
+        if local_unchanged and time.monotonic() - self._checked_at < self.poll_interval:
+            return
+        self._checked_at = time.monotonic()
+        if self._graph_version() != self.version:
+            self.refresh()
+    
+    def match(self, question: str) -> List[str]:
+        """Retourne les symptômes connus mentionnés dans la question."""
+        self._ensure_fresh()
+        return self.terms.extract(question)
+    
+    def score(self, symptoms: List[str], scoring: str = None) -> tuple:
+        """
+        Score vectorisé: retourne (indices maladies candidates, scores, recouvrement).
+        Seules les listes de postings des symptômes demandés sont parcourues.
+        """
+        scoring = scoring or self.scoring
+        ids = np.fromiter(
+            (self.symptom_ids[s] for s in dict.fromkeys(symptoms) if s in self.symptom_ids),
+            dtype=np.int64
+        )
+        if ids.size == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, np.empty(0), empty
+        
+        postings = self._postings["overlap"]
+        hits, lengths = self._gather(postings, ids, postings.indices)
+        candidates, inverse = np.unique(hits, return_inverse=True)
+        overlap = np.bincount(inverse, minlength=candidates.size)
+        
+        if scoring == "overlap":
+            scores = overlap / self.degree[candidates]
+        elif scoring == "jaccard":
+            scores = overlap / (ids.size + self.degree[candidates] - overlap)
+        else:
+            # Poids alignés sur les mêmes positions que `hits`
+            weights, _ = self._gather(postings, ids, self._postings[scoring])
+            if scoring == "tfidf":
+                query = self._postings["idf"][ids]
+                weights = weights * np.repeat(query / np.linalg.norm(query), lengths)
+            scores = np.bincount(inverse, weights=weights, minlength=candidates.size)
+        return candidates, scores, overlap
+    
+    @staticmethod
+    def _gather(postings: sparse.csr_matrix, ids: np.ndarray, values: np.ndarray) -> tuple:
+        """Concatène les tranches `values[indptr[i]:indptr[i+1]]` des lignes `ids`."""
+        starts, ends = postings.indptr[ids], postings.indptr[ids + 1]
+        lengths = ends - starts
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        positions = np.arange(lengths.sum()) + offsets
+        return values[positions], lengths
+    
+    def rank(self, symptoms: List[str], limit: int = None, scoring: str = None) -> List[dict]:
+        """Classe les maladies (même format de lignes que SymptomMatcher.rank)."""
+        self._ensure_fresh()
+        candidates, scores, overlap = self.score(symptoms, scoring)
+        if candidates.size == 0:
+            return []
+        
+        # Même ordre que la requête Cypher: score, recouvrement, puis nom
+        limit = min(limit or self.limit, candidates.size)
+        if limit < candidates.size:
+            # Tous les ex aequo du `limit`-ième score restent en lice avant la coupe
+            cutoff = np.partition(scores, candidates.size - limit)[candidates.size - limit]
+            pool = np.flatnonzero(scores >= cutoff)
+        else:
+            pool = np.arange(candidates.size)
+        order = np.lexsort((self._name_rank[candidates[pool]], -overlap[pool], -scores[pool]))
+        top = pool[order[:limit]]
+        
+        wanted = set(symptoms)
+        rows = []
+        for i in top:
+            disease = candidates[i]
+            rows.append({
+                "disease": self.diseases[disease],
+                "matched": [s for s in self._disease_symptoms(disease) if s in wanted],
+                "overlap": int(overlap[i]),
+                "total": int(self.degree[disease]),
+                "score": float(scores[i]),
+            })
+        return rows
+    
+    def rank_many(self, symptom_sets: List[List[str]], limit: int = None) -> List[List[dict]]:
+        """Même interface que SymptomMatcher.rank_many (calcul local)."""
+        return [self.rank(symptoms, limit) for symptoms in symptom_sets]
+    
+    async def arank_many(self, symptom_sets: List[List[str]], limit: int = None) -> List[List[dict]]:
+        return self.rank_many(symptom_sets, limit)
+    
+    def search(self, question: str, limit: int = None) -> dict:
+        """Extraction + classement en un appel."""
+        symptoms = self.match(question)
+        return {"symptoms": symptoms, "diseases": self.rank(symptoms, limit)}
+    
+    async def asearch(self, question: str, limit: int = None) -> dict:
+        """Même interface que SymptomMatcher.asearch (calcul local, non bloquant)."""
+        return self.search(question, limit)
+    
+    def _disease_symptoms(self, disease: int) -> list:
+        """Symptômes d'une maladie (ligne de la matrice d'incidence)."""
+        start, end = self._incidence.indptr[disease], self._incidence.indptr[disease + 1]
+        return list(self.symptoms[self._incidence.indices[start:end]])
@@ -0,0 +1,190 @@
+import asyncio
+from typing import Any, List
+from .term_index import TermIndex, load_synonyms
+
+SYMPTOM_NAMES_QUERY = "MATCH (s:Symptom) RETURN s.name AS name"
+
+# Classement par recouvrement: part des symptômes de la maladie retrouvés
+OVERLAP_RANKING_QUERY = """
+MATCH (d:Disease)-[:HAS_SYMPTOM]->(s:Symptom)
+WHERE s.name IN $symptoms
+WITH d, collect(s.name) AS matched
+MATCH (d)-[:HAS_SYMPTOM]->(all:Symptom)
+WITH d, matched, count(all) AS total
+RETURN d.name AS disease, matched, size(matched) AS overlap, total,
+       toFloat(size(matched)) / total AS score
+ORDER BY score DESC, overlap DESC, disease
+LIMIT $limit
+"""
+
+# Classement pondéré: un symptôme rare (peu de maladies) pèse plus lourd
+WEIGHTED_RANKING_QUERY = """
+MATCH (s:Symptom)
+WHERE s.name IN $symptoms
+WITH s, 1.0 / log(2.0 + COUNT { (s)<-[:HAS_SYMPTOM]-(:Disease) }) AS weight
+MATCH (d:Disease)-[:HAS_SYMPTOM]->(s)
+WITH d, collect(s.name) AS matched, sum(weight) AS score
+RETURN d.name AS disease, matched, size(matched) AS overlap,
+       COUNT { (d)-[:HAS_SYMPTOM]->(:Symptom) } AS total, score
+ORDER BY score DESC, overlap DESC, disease
+LIMIT $limit
+"""
+
+# Plusieurs jeux de symptômes classés en un seul aller-retour
+BATCH_RANKING_QUERY = """
+UNWIND $queries AS q
+CALL {
+    WITH q
+    MATCH (d:Disease)-[:HAS_SYMPTOM]->(s:Symptom)
+    WHERE s.name IN q.symptoms
+    WITH d, collect(s.name) AS matched
+    MATCH (d)-[:HAS_SYMPTOM]->(all:Symptom)
+    WITH d, matched, count(all) AS total
+    RETURN d.name AS disease, matched, size(matched) AS overlap, total,
+           toFloat(size(matched)) / total AS score
+    ORDER BY score DESC, overlap DESC, disease
+    LIMIT $limit
+}
+RETURN q.id AS id,
+       collect({disease: disease, matched: matched, overlap: overlap,
+                total: total, score: score}) AS diseases
+"""
+
+# Variante pondérée (même score que WEIGHTED_RANKING_QUERY)
+WEIGHTED_BATCH_RANKING_QUERY = """
+UNWIND $queries AS q
+CALL {
+    WITH q
+    MATCH (s:Symptom)
+    WHERE s.name IN q.symptoms
+    WITH s, 1.0 / log(2.0 + COUNT { (s)<-[:HAS_SYMPTOM]-(:Disease) }) AS weight
+    MATCH (d:Disease)-[:HAS_SYMPTOM]->(s)
+    WITH d, collect(s.name) AS matched, sum(weight) AS score
+    RETURN d.name AS disease, matched, size(matched) AS overlap,
+           COUNT { (d)-[:HAS_SYMPTOM]->(:Symptom) } AS total, score
+    ORDER BY score DESC, overlap DESC, disease
+    LIMIT $limit
+}
+RETURN q.id AS id,
+       collect({disease: disease, matched: matched, overlap: overlap,
+                total: total, score: score}) AS diseases
+"""
+
+# Traitements et causes des maladies candidates, en un seul aller-retour
+DISEASE_DETAILS_QUERY = """
+MATCH (d:Disease)
+WHERE d.name IN $names
+OPTIONAL MATCH (d)-[:TREATED_WITH]->(t:Treatment)
+WITH d, collect(DISTINCT t.name) AS treatments
+OPTIONAL MATCH (d)-[:CAUSED_BY]->(c:Cause)
+RETURN d.name AS disease, treatments, collect(DISTINCT c.name) AS causes
+"""
+
+# Recherche maladie/symptôme paramétrée, ancrée sur l'index unique Symptom.name
+SYMPTOM_LOOKUP_QUERY = """
+MATCH (s:Symptom)
+WHERE s.name IN $symptoms
+MATCH (d:Disease)-[:HAS_SYMPTOM]->(s)
+RETURN DISTINCT d.name AS disease, s.name AS symptom
+LIMIT $limit
+"""
+
+RANKING_QUERIES = {
+    "overlap": OVERLAP_RANKING_QUERY,
+    "weighted": WEIGHTED_RANKING_QUERY,
+}
+
+BATCH_RANKING_QUERIES = {
+    "overlap": BATCH_RANKING_QUERY,
+    "weighted": WEIGHTED_BATCH_RANKING_QUERY,
+}
+
+
+class SymptomMatcher:
+    """
+    Recherche déterministe: repère les symptômes connus dans la question
+    (index de termes normalisés, synonymes FR/EN, fautes de frappe) puis
+    classe les maladies avec une requête Cypher précompilée.
+    """
+    
+    def __init__(self, graph: Any, scoring: str = "overlap", limit: int = 5,
+                 synonyms: dict = None, async_graph: Any = None):
+        if scoring not in RANKING_QUERIES:
+            raise ValueError(f"❌ Unknown scoring: {scoring}")
+        self.graph = graph
+        self.scoring = scoring
+        self.limit = limit
+        self.synonyms = load_synonyms() if synonyms is None else synonyms
+        self.async_graph = async_graph
+        self.terms = None
+    
+    def refresh(self):
+        """Recharge le vocabulaire des symptômes depuis le graphe."""
+        names = [row["name"] for row in self.graph.query(SYMPTOM_NAMES_QUERY)]
+        self.terms = TermIndex(names, self.synonyms)
+    
+    def match(self, question: str) -> List[str]:
+        """Retourne les noms canoniques des symptômes mentionnés."""
+        if self.terms is None:
+            self.refresh()
+        return self.terms.extract(question)
+    
+    def rank(self, symptoms: List[str], limit: int = None) -> List[dict]:
+        """Classe les maladies par recouvrement avec `symptoms`."""
+        if not symptoms:
+            return []
+        return self.graph.query(
+            RANKING_QUERIES[self.scoring],
+            {"symptoms": list(symptoms), "limit": limit or self.limit}
+        )
+    
+    def rank_many(self, symptom_sets: List[List[str]], limit: int = None) -> List[List[dict]]:
+        """Classe plusieurs jeux de symptômes avec une seule requête UNWIND."""
+        queries, params = self._batch_params(symptom_sets, limit)
+        if not queries:
+            return [[] for _ in symptom_sets]
+        rows = self.graph.query(BATCH_RANKING_QUERIES[self.scoring], params)
+        return self._unbatch(rows, len(symptom_sets))
+    
+    async def arank_many(self, symptom_sets: List[List[str]], limit: int = None) -> List[List[dict]]:
+        if self.async_graph is None:
+            return await asyncio.to_thread(self.rank_many, symptom_sets, limit)
+        queries, params = self._batch_params(symptom_sets, limit)
+        if not queries:
+            return [[] for _ in symptom_sets]
+        rows = await self.async_graph.query(BATCH_RANKING_QUERIES[self.scoring], params)
+        return self._unbatch(rows, len(symptom_sets))
+    
+    def _batch_params(self, symptom_sets: List[List[str]], limit: int = None) -> tuple:
+        queries = [
+            {"id": i, "symptoms": list(symptoms)}
+            for i, symptoms in enumerate(symptom_sets) if symptoms
+        ]
+        return queries, {"queries": queries, "limit": limit or self.limit}
+    
+    @staticmethod
+    def _unbatch(rows: list, size: int) -> List[List[dict]]:
+        # Un jeu sans maladie correspondante n'a pas de ligne en sortie
+        results = [[] for _ in range(size)]
+        for row in rows:
+            results[row["id"]] = row["diseases"]
+        return results
+    
+    def search(self, question: str, limit: int = None) -> dict:
+        """Extraction + classement en un appel."""
+        symptoms = self.match(question)
+        return {"symptoms": symptoms, "diseases": self.rank(symptoms, limit)}
+    
+    async def asearch(self, question: str, limit: int = None) -> dict:
+        """Variante asynchrone: le classement passe par le driver neo4j async si disponible."""
+        if self.terms is None:
+            await asyncio.to_thread(self.refresh)
+        symptoms = self.match(question)
+        if not symptoms:
+            return {"symptoms": [], "diseases": []}
+        params = {"symptoms": symptoms, "limit": limit or self.limit}
+        if self.async_graph is not None:
+            diseases = await self.async_graph.query(RANKING_QUERIES[self.scoring], params)
+        else:
+            diseases = await asyncio.to_thread(self.rank, symptoms, limit)
+        return {"symptoms": symptoms, "diseases": diseases}
@@ -0,0 +1,180 @@
+import json
+import os
+from collections import defaultdict
+from typing import Dict, Iterable, List
+from ..cache.stores import LRUCache
+from ..utils.text_utils import sanitize
+
+DEFAULT_SYNONYMS_PATH = "data/symptom_synonyms.json"
+
+# Mots outils ignorés en bord de fenêtre lors de la recherche approchée
+STOPWORDS = frozenset({
+    "a", "ai", "and", "au", "aux", "avec", "de", "des", "du", "en", "et", "i",
+    "il", "j", "je", "l", "la", "le", "les", "m", "ma", "me", "mes", "my",
+    "of", "ou", "or", "the", "un", "une", "with", "have", "has", "am", "is",
+})
+
+
+def load_synonyms(path: str = DEFAULT_SYNONYMS_PATH) -> Dict[str, List[str]]:
+    """Charge la table {nom canonique: [variantes FR/EN]} (vide si absente)."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def trigrams(key: str) -> set:
+    """Trigrammes de caractères d'une clé normalisée (avec bornes)."""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def bounded_levenshtein(a: str, b: str, limit: int) -> int:
+    """Distance d'édition, interrompue dès qu'elle dépasse `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class TermIndex:
+    """
+    Index de termes normalisés (via `sanitize`) pour résoudre des mentions
+    libres vers les noms canoniques des nœuds: correspondance exacte,
+    synonymes FR/EN, puis recherche approchée par trigrammes + distance d'édition.
+    Un terme générique s'étend à ses variantes qualifiées ("fever" -> fièvre,
+    fièvre élevée, fièvre légère), sauf si la mention est déjà qualifiée.
+    """
+    
+    def __init__(self, names: Iterable[str], synonyms: Dict[str, List[str]] = None,
+                 max_distance: int = 2, fuzzy_cache_size: int = 50000,
+                 expand_variants: bool = True):
+        self.max_distance = max_distance
+        self._terms: Dict[str, set] = defaultdict(set)
+        
+        names = set(names)
+        for name in names:
+            self._add(name, name)
+        self._variants = self._qualified_variants(names) if expand_variants else {}
+        for canonical, variants in (synonyms or {}).items():
+            if canonical in names:
+                for variant in variants:
+                    self._add(variant, canonical)
+        
+        self._keys = list(self._terms)
+        self._grams: Dict[str, List[int]] = defaultdict(list)
+        for key_id, key in enumerate(self._keys):
+            for gram in trigrams(key):
+                self._grams[gram].append(key_id)
+        
+        self.max_tokens = max((key.count("_") + 1 for key in self._keys), default=1)
+        # Borné: l'API voit un flux illimité de jetons distincts
+        self._fuzzy_cache = LRUCache(max_size=fuzzy_cache_size)
+    
+    @staticmethod
+    def _qualified_variants(names: set) -> Dict[str, List[str]]:
+        """{terme générique: noms qui le prolongent} ("toux" -> "toux sèche", "toux nocturne"...)."""
+        by_key = {sanitize(name): name for name in names}
+        variants = defaultdict(list)
+        for key, name in sorted(by_key.items()):
+            tokens = key.split("_")
+            for size in range(1, len(tokens)):
+                generic = by_key.get("_".join(tokens[:size]))
+                if generic is not None:
+                    variants[generic].append(name)
+        return dict(variants)
+    
+    def _add(self, term: str, canonical: str):
+        key = sanitize(term)
+        if key != "unknown":
+            self._terms[key].add(canonical)
+    
+    @staticmethod
+    def _allowed_distance(key: str, max_distance: int) -> int:
+        """Tolérance proportionnelle à la longueur (aucune sur les mots courts)."""
+        if len(key) < 5:
+            return 0
+        return min(max_distance, 1 if len(key) < 9 else 2)
+    
+    def lookup(self, key: str) -> tuple:
+        """Noms canoniques d'une clé déjà normalisée (exact puis approché)."""
+        exact = self._terms.get(key)
+        if exact:
+            return tuple(sorted(exact))
+        return self._fuzzy(key)
+    
+    def _fuzzy(self, key: str) -> tuple:
+        cached = self._fuzzy_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        result = ()
+        limit = self._allowed_distance(key, self.max_distance)
+        if limit:
+            grams = trigrams(key)
+            # Chaque édition détruit au plus 3 trigrammes
+            required = max(1, len(grams) - 3 * limit)
+            shared = defaultdict(int)
+            for gram in grams:
+                for key_id in self._grams.get(gram, ()):
+                    shared[key_id] += 1
+            
+            best, best_distance = set(), limit + 1
+            for key_id, count in shared.items():
+                if count < required:
+                    continue
+                distance = bounded_levenshtein(key, self._keys[key_id], limit)
+                if distance < best_distance:
+                    best, best_distance = set(self._terms[self._keys[key_id]]), distance
+                elif distance == best_distance and distance <= limit:
+                    best |= self._terms[self._keys[key_id]]
+            if best_distance <= limit:
+                result = tuple(sorted(best))
+        
+        self._fuzzy_cache.set(key, result)
+        return result
+    
+    def resolve(self, mention: str) -> List[str]:
+        """Résout une mention isolée ("souffle court") en noms canoniques."""
+        return list(self.lookup(sanitize(mention)))
+    
+    def extract(self, text: str) -> List[str]:
+        """
+        Repère toutes les mentions dans un texte libre, fenêtres les plus
+        longues d'abord; les jetons déjà couverts ne sont plus réutilisés.
+        """
+        tokens = [t for t in sanitize(text).split("_") if t]
+        covered = [False] * len(tokens)
+        found = {}
+        
+        for fuzzy in (False, True):
+            for size in range(min(self.max_tokens, len(tokens)), 0, -1):
+                for start in range(len(tokens) - size + 1):
+                    if any(covered[start:start + size]):
+                        continue
+                    window = tokens[start:start + size]
+                    key = "_".join(window)
+                    if fuzzy:
+                        if window[0] in STOPWORDS or window[-1] in STOPWORDS:
+                            continue
+                        names = self._fuzzy(key)
+                    else:
+                        names = self._terms.get(key)
+                    if names:
+                        covered[start:start + size] = [True] * size
+                        for name in sorted(names):
+                            found.setdefault(name, None)
+                            for variant in self._variants.get(name, ()):
+                                found.setdefault(variant, None)
+        return list(found)
@@ -0,0 +1,166 @@
+import json
+import os
+import zlib
+from typing import Iterable, List
+import numpy as np
+from ..database.catalog_reader import iter_catalog
+from ..utils.text_utils import sanitize
+from .term_index import load_synonyms
+
+NODES_QUERY = """
+MATCH (n)
+WHERE n:Disease OR n:Symptom OR n:Treatment OR n:Cause
+OPTIONAL MATCH (n)-[:HAS_SYMPTOM]->(s:Symptom)
+RETURN labels(n)[0] AS label, n.name AS name, collect(s.name) AS symptoms
+"""
+
+VECTORS_FILE = "vectors.f32"
+META_FILE = "meta.json"
+IVF_FILE = "ivf.npz"
+
+
+class HashedNgramVectorizer:
+    """Vecteurs creux de n-grammes de caractères hachés (CPU, sans modèle)."""
+    
+    def __init__(self, dim: int = 512, ngram_range: tuple = (3, 4)):
+        self.dim = dim
+        self.ngram_range = tuple(ngram_range)
+    
+    def transform(self, texts: Iterable[str]) -> np.ndarray:
+        texts = list(texts)
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            # Espace comme séparateur: les n-grammes ne traversent pas les mots
+            padded = f" {sanitize(text).replace('_', ' ')} "
+            for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+                for i in range(len(padded) - n + 1):
+                    h = zlib.crc32(padded[i:i + n].encode("utf-8"))
+                    vectors[row, h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+def describe_catalog(json_path: str = "data/medical_data.json",
+                     synonyms: dict = None) -> List[dict]:
+    """Nœuds du catalogue avec leur texte à indexer (nom + description)."""
+    synonyms = load_synonyms() if synonyms is None else synonyms
+    nodes = {}
+    for entry in iter_catalog(json_path):
+        disease = entry.get("maladie", "Unknown")
+        nodes[("Disease", disease)] = entry.get("symptomes", [])
+        for label, key in (("Symptom", "symptomes"), ("Treatment", "traitements"),
+                           ("Cause", "causes")):
+            for name in entry.get(key, []):
+                nodes.setdefault((label, name), [])
+    return [_node(label, name, related, synonyms) for (label, name), related in nodes.items()]
+
+
+def describe_graph(graph, synonyms: dict = None) -> List[dict]:
+    """Nœuds du graphe Neo4j avec leur texte à indexer."""
+    synonyms = load_synonyms() if synonyms is None else synonyms
+    return [_node(row["label"], row["name"], row["symptoms"], synonyms)
+            for row in graph.query(NODES_QUERY)]
+
+
+def _node(label: str, name: str, symptoms: list, synonyms: dict) -> dict:
+    # Une maladie est décrite par ses symptômes; un symptôme par ses variantes FR/EN
+    description = " ".join(symptoms) if label == "Disease" else " ".join(synonyms.get(name, []))
+    return {"label": label, "name": name, "text": f"{name} {description}".strip()}
+
+
+class VectorIndex:
+    """
+    Index ANN (IVF) sur les nœuds du graphe: vecteurs dans un fichier
+    mappé en mémoire, listes inversées par centroïde k-means.
+    """
+    
+    def __init__(self, path: str, nprobe: int = 4):
+        self.path = path
+        self.nprobe = nprobe
+        with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.nodes = meta["nodes"]
+        self.vectorizer = HashedNgramVectorizer(meta["dim"], meta["ngram_range"])
+        self.vectors = np.memmap(os.path.join(path, VECTORS_FILE), dtype=np.float32,
+                                 mode="r", shape=(len(self.nodes), meta["dim"]))
+        ivf = np.load(os.path.join(path, IVF_FILE))
+        self.centroids = ivf["centroids"]
+        self.list_offsets = ivf["list_offsets"]
+        self.list_ids = ivf["list_ids"]
+    
+    @classmethod
+    def build(cls, nodes: List[dict], path: str, dim: int = 512,
+              n_lists: int = None, iterations: int = 10, seed: int = 0) -> "VectorIndex":
+        """Vectorise les nœuds, entraîne l'IVF et écrit l'index sur disque."""
+        os.makedirs(path, exist_ok=True)
+        vectorizer = HashedNgramVectorizer(dim)
+        
+        vectors = np.memmap(os.path.join(path, VECTORS_FILE), dtype=np.float32,
+                            mode="w+", shape=(max(len(nodes), 1), dim))
+        for start in range(0, len(nodes), 4096):
+            chunk = nodes[start:start + 4096]
+            vectors[start:start + len(chunk)] = vectorizer.transform(n["text"] for n in chunk)
+        vectors.flush()
+        
+        n_lists = n_lists or max(1, int(np.sqrt(len(nodes))))
+        centroids, assignments = _kmeans(np.asarray(vectors[:len(nodes)]), n_lists,
+                                         iterations, seed)
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=len(centroids))
+        np.savez(os.path.join(path, IVF_FILE), centroids=centroids,
+                 list_offsets=np.concatenate([[0], np.cumsum(counts)]),
+                 list_ids=order.astype(np.int64))
+        
+        with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+            json.dump({
+                "dim": dim,
+                "ngram_range": list(vectorizer.ngram_range),
+                "nodes": [{"label": n["label"], "name": n["name"]} for n in nodes],
+            }, f, ensure_ascii=False)
+        
+        print(f"🧭 Vector index built: {len(nodes)} nodes, {len(centroids)} lists → {path}")
+        return cls(path)
+    
+    def search(self, text: str, k: int = 5, labels: tuple = None,
+               min_score: float = 0.0) -> List[dict]:
+        """Top-k approché: ne compare que les listes des `nprobe` centroïdes les plus proches."""
+        if not self.nodes:
+            return []
+        query = self.vectorizer.transform([text])[0]
+        probes = np.argsort(-(self.centroids @ query))[:self.nprobe]
+        ids = np.concatenate([
+            self.list_ids[self.list_offsets[p]:self.list_offsets[p + 1]] for p in probes
+        ])
+        if labels:
+            ids = ids[[self.nodes[i]["label"] in labels for i in ids]]
+        if ids.size == 0:
+            return []
+        
+        ids = np.sort(ids)  # lecture séquentielle du memmap
+        scores = self.vectors[ids] @ query
+        top = np.argsort(-scores)[:k]
+        return [
+            {**self.nodes[ids[i]], "score": float(scores[i])}
+            for i in top if scores[i] >= min_score
+        ]
+
+
+def _kmeans(vectors: np.ndarray, n_lists: int, iterations: int, seed: int) -> tuple:
+    """k-means sphérique (similarité cosinus) pour l'IVF."""
+    if len(vectors) == 0:
+        return np.zeros((1, vectors.shape[1]), dtype=np.float32), np.zeros(0, dtype=np.int64)
+    rng = np.random.default_rng(seed)
+    n_lists = min(n_lists, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+    
+    for _ in range(iterations):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        for c in range(n_lists):
+            members = vectors[assignments == c]
+            if len(members):
+                centroid = members.sum(axis=0)
+                centroids[c] = centroid / max(np.linalg.norm(centroid), 1e-9)
+    
+    assignments = np.argmax(vectors @ centroids.T, axis=1)
+    return centroids.astype(np.float32), assignments
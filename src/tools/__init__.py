@@ -1,6 +1,10 @@
 """
 Tools package
 """
-from .medical_rag_tool import MedicalRAGTool
+from ..utils.lazy import lazy_exports
 
-__all__ = ['MedicalRAGTool']
\ No newline at end of file
+__all__ = ['MedicalRAGTool']
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'MedicalRAGTool': '.medical_rag_tool',
+})
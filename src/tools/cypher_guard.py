@@ -0,0 +1,264 @@
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional
+from langchain_community.graphs.graph_store import GraphStore
+from ..retrieval.symptom_matcher import SYMPTOM_LOOKUP_QUERY
+from ..utils.tracing import metrics, span
+
+# Clauses d'écriture et commandes d'administration
+FORBIDDEN_CLAUSES = re.compile(
+    r"\b(CREATE|MERGE|DELETE|DETACH|SET|REMOVE|DROP|FOREACH|LOAD\s+CSV|"
+    r"USING\s+PERIODIC\s+COMMIT|ALTER|GRANT|DENY|REVOKE)\b",
+    re.IGNORECASE
+)
+# Appel de procédure (`CALL { ... }` et `CALL (x) { ... }` sont des sous-requêtes)
+PROCEDURE_CALL = re.compile(r"\bCALL\s+(?P<name>[A-Za-z_][\w.]*)\s*\(", re.IGNORECASE)
+# Procédures en lecture seule autorisées (noms en minuscules)
+READ_ONLY_PROCEDURES = frozenset({
+    "db.labels", "db.relationshiptypes", "db.propertykeys",
+    "db.schema.visualization", "db.schema.nodetypeproperties", "db.schema.reltypeproperties",
+    "db.index.fulltext.querynodes", "db.index.fulltext.queryrelationships",
+    "db.index.vector.querynodes",
+})
+STRING_LITERAL = re.compile(r"'((?:[^'\\]|\\.)*)'|\"((?:[^\"\\]|\\.)*)\"")
+COMMENT = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+CODE_FENCE = re.compile(r"```(?:cypher)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+# Relation de longueur variable: `*`, `*2`, `*1..3`, `*..3`, `*2..` (bornée si longueur fixe ou maximum)
+VARIABLE_LENGTH = re.compile(
+    r"-\s*\[[^\]]*?\*\s*(?P<min>\d+)?\s*(?P<range>\.\.)?\s*(?P<max>\d+)?[^\]]*\]"
+)
+TRAILING_LIMIT = re.compile(r"\bLIMIT\s+(\d+)\s*$", re.IGNORECASE)
+_LITERAL = r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\""
+# Seule forme réécrite: un motif, une variable Symptom filtrée par `=` ou `IN`,
+# et les colonnes de SYMPTOM_LOOKUP_QUERY (résultat identique, requête indexée)
+REWRITABLE_LOOKUP = re.compile(
+    r"MATCH\s*\((?P<d>\w+)\s*:\s*Disease\s*\)\s*-\s*\[\s*(?:\w+\s*)?:\s*HAS_SYMPTOM\s*\]\s*->\s*"
+    r"\((?P<s>\w+)\s*:\s*Symptom\s*(?:\{\s*name\s*:\s*(?P<inline>" + _LITERAL + r")\s*\}\s*)?\)"
+    r"(?:\s+WHERE\s+(?P=s)\.name\s*(?:=\s*(?P<eq>" + _LITERAL + r")"
+    r"|IN\s*\[(?P<list>\s*(?:" + _LITERAL + r")(?:\s*,\s*(?:" + _LITERAL + r"))*\s*)\]))?"
+    r"\s+RETURN\s+(?:DISTINCT\s+)?(?P=d)\.name\s+AS\s+disease\s*,\s*(?P=s)\.name\s+AS\s+symptom"
+    r"(?:\s+LIMIT\s+(?P<limit>\d+))?",
+    re.IGNORECASE
+)
+
+
+class CypherRejected(ValueError):
+    """Requête générée refusée par le garde (écriture, coût, syntaxe)."""
+
+
+class CypherGuard:
+    """
+    Étape de contrôle entre la génération Cypher (LLM) et Neo4j:
+    - refuse les écritures, les procédures hors liste en lecture seule et les requêtes multiples;
+    - réécrit les recherches maladie/symptôme en requête paramétrée indexée;
+    - estime le coût avec EXPLAIN (lignes estimées, produit cartésien);
+    - borne le résultat (LIMIT) et la durée (timeout de transaction);
+    - en cas d'échec, exécute un modèle sûr construit à partir des symptômes cités.
+    """
+    
+    def __init__(self, graph: Any, extract_symptoms: Optional[Callable[[str], List[str]]] = None,
+                 max_rows: int = 50, max_estimated_rows: float = 100000, timeout: float = 5.0):
+        self.graph = graph
+        self.extract_symptoms = extract_symptoms
+        self.max_rows = max_rows
+        self.max_estimated_rows = max_estimated_rows
+        self.timeout = timeout
+    
+    @classmethod
+    def from_env(cls, graph: Any,
+                 extract_symptoms: Optional[Callable[[str], List[str]]] = None) -> "CypherGuard":
+        return cls(
+            graph,
+            extract_symptoms,
+            max_rows=int(os.getenv("CYPHER_MAX_ROWS", 50)),
+            max_estimated_rows=float(os.getenv("CYPHER_MAX_ESTIMATED_ROWS", 100000)),
+            timeout=float(os.getenv("CYPHER_TIMEOUT_S", 5.0))
+        )
+    
+    def run(self, cypher: str, params: dict = None) -> List[Dict[str, Any]]:
+        """Valide, borne et exécute la requête; repli sur le modèle sûr en cas d'échec."""
+        with span("cypher.guard") as s:
+            try:
+                prepared, params, outcome = self.prepare(cypher, params or {})
+                self.check_cost(prepared, params)
+                rows = self._execute(prepared, params)
+            except Exception as e:
+                outcome = "fallback"
+                s.attrs["reason"] = str(e)[:120]
+                print(f"⚠️ Cypher guard fallback: {e}")
+                rows = self.fallback(cypher)
+            s.attrs["outcome"] = outcome
+        metrics.inc("rag_cypher_guard_total", outcome=outcome)
+        return rows
+    
+    def prepare(self, cypher: str, params: dict) -> tuple:
+        """Retourne (cypher, params, issue) après validation, réécriture et LIMIT."""
+        cypher = self.validate(cypher)
+        rewritten = self.rewrite(cypher)
+        if rewritten is not None:
+            symptoms, limit = rewritten
+            return SYMPTOM_LOOKUP_QUERY, {"symptoms": symptoms, "limit": limit}, "rewritten"
+        return self.bound(cypher), params, "passed"
+    
+    def validate(self, cypher: str) -> str:
+        fenced = CODE_FENCE.search(cypher)
+        if fenced:
+            cypher = fenced.group(1)
+        cypher = COMMENT.sub(" ", cypher).strip().rstrip(";").strip()
+        if not cypher:
+            raise CypherRejected("empty query")
+        
+        # Les littéraux sont masqués: "SET" dans une chaîne n'est pas une clause
+        code = STRING_LITERAL.sub("''", cypher)
+        if ";" in code:
+            raise CypherRejected("multiple statements")
+        clause = FORBIDDEN_CLAUSES.search(code)
+        if clause:
+            raise CypherRejected(f"forbidden clause {clause.group(1).upper()}")
+        for call in PROCEDURE_CALL.finditer(code):
+            if call.group("name").lower() not in READ_ONLY_PROCEDURES:
+                raise CypherRejected(f"procedure {call.group('name')} not allowed")
+        if not re.match(r"\s*(OPTIONAL\s+)?MATCH\b|\s*WITH\b|\s*UNWIND\b|\s*CALL\b", code, re.IGNORECASE):
+            raise CypherRejected("query must start with MATCH, WITH, UNWIND or CALL")
+        for path in VARIABLE_LENGTH.finditer(code):
+            if not self._bounded(path):
+                raise CypherRejected("unbounded variable-length path")
+        return cypher
+    
+    @staticmethod
+    def _bounded(path: re.Match) -> bool:
+        """`*n` (longueur fixe) et `*..m` / `*n..m` sont bornés; `*` et `*n..` ne le sont pas."""
+        if path.group("max"):
+            return True
+        return bool(path.group("min")) and not path.group("range")
+    
+    def rewrite(self, cypher: str) -> Optional[tuple]:
+        """
+        Recherche de maladies par un seul symptôme (`=`) ou une liste (`IN`),
+        colonnes `disease, symptom`: retourne (symptômes, limite) pour
+        SYMPTOM_LOOKUP_QUERY, sinon None (requête exécutée telle quelle).
+        Plusieurs motifs, conditions combinées ou autres colonnes ne sont
+        pas réécrits: la forme IN changerait le sens (ET devenu OU).
+        """
+        if self.extract_symptoms is None:
+            return None
+        match = REWRITABLE_LOOKUP.fullmatch(cypher.strip())
+        if match is None:
+            return None
+        filters = [name for name in ("inline", "eq", "list") if match.group(name)]
+        if len(filters) != 1:
+            return None
+        
+        symptoms = []
+        for literal in self._literals(match.group(filters[0])):
+            # Chaque littéral doit désigner exactement un symptôme connu
+            resolved = self.extract_symptoms(literal)
+            if len(resolved) != 1:
+                return None
+            symptoms.extend(resolved)
+        limit = min(int(match.group("limit") or self.max_rows), self.max_rows)
+        return list(dict.fromkeys(symptoms)), limit
+    
+    def bound(self, cypher: str) -> str:
+        """Ajoute (ou abaisse) le LIMIT final."""
+        if re.search(r"\bUNION\b", STRING_LITERAL.sub("''", cypher), re.IGNORECASE):
+            return f"CALL {{ {cypher} }} RETURN * LIMIT {self.max_rows}"
+        limit = TRAILING_LIMIT.search(cypher)
+        if limit:
+            if int(limit.group(1)) <= self.max_rows:
+                return cypher
+            return cypher[:limit.start()] + f"LIMIT {self.max_rows}"
+        return f"{cypher}\nLIMIT {self.max_rows}"
+    
+    def check_cost(self, cypher: str, params: dict):
+        """EXPLAIN (sans exécution): refuse produit cartésien et estimations trop élevées."""
+        driver = self._read_driver()
+        if driver is None:
+            return
+        from neo4j import READ_ACCESS
+        with driver.session(database=getattr(self.graph, "_database", None),
+                            default_access_mode=READ_ACCESS) as session:
+            plan = session.run(f"EXPLAIN {cypher}", params).consume().plan
+        if not plan:
+            return
+        operators, estimated = self._walk_plan(plan)
+        if "CartesianProduct" in operators:
+            raise CypherRejected("cartesian product in plan")
+        if estimated > self.max_estimated_rows:
+            raise CypherRejected(f"estimated {estimated:.0f} rows")
+    
+    def fallback(self, cypher: str) -> List[Dict[str, Any]]:
+        """Modèle sûr: symptômes reconnus parmi les littéraux de la requête refusée."""
+        symptoms = []
+        if self.extract_symptoms is not None:
+            for literal in self._literals(cypher):
+                symptoms.extend(self.extract_symptoms(literal))
+        if not symptoms:
+            return []
+        try:
+            return self._execute(
+                SYMPTOM_LOOKUP_QUERY,
+                {"symptoms": list(dict.fromkeys(symptoms)), "limit": self.max_rows}
+            )
+        except Exception as e:
+            print(f"❌ Cypher fallback failed: {e}")
+            return []
+    
+    def _execute(self, cypher: str, params: dict) -> List[Dict[str, Any]]:
+        """Transaction en lecture avec timeout côté serveur (driver), sinon `graph.query`."""
+        driver = self._read_driver()
+        if driver is None:
+            return self.graph.query(cypher, params)
+        from neo4j import Query, READ_ACCESS
+        with span("graph.query") as s:
+            with driver.session(database=getattr(self.graph, "_database", None),
+                                default_access_mode=READ_ACCESS) as session:
+                rows = session.run(Query(cypher, timeout=self.timeout), params).data()
+            s.attrs["rows"] = len(rows)
+        metrics.inc("rag_graph_rows_total", len(rows))
+        return rows
+    
+    def _read_driver(self) -> Any:
+        """Driver des réplicas (graphe routé par tenant), sinon driver unique, sinon None."""
+        return getattr(self.graph, "_reader", None) or getattr(self.graph, "_driver", None)
+    
+    @staticmethod
+    def _literals(cypher: str) -> List[str]:
+        return [a or b for a, b in STRING_LITERAL.findall(cypher)]
+    
+    @staticmethod
+    def _walk_plan(plan: dict) -> tuple:
+        operators, estimated = set(), 0.0
+        stack = [plan]
+        while stack:
+            node = stack.pop()
+            operators.add(str(node.get("operatorType", "")).split("@")[0])
+            arguments = node.get("args") or node.get("arguments") or {}
+            estimated = max(estimated, float(arguments.get("EstimatedRows", 0) or 0))
+            stack.extend(node.get("children", []))
+        return operators, estimated
+
+
+class GuardedGraph(GraphStore):
+    """Graphe passé à GraphCypherQAChain: toute requête générée traverse le CypherGuard."""
+    
+    def __init__(self, graph: Any, guard: CypherGuard):
+        self.graph = graph
+        self.guard = guard
+    
+    @property
+    def get_schema(self) -> str:
+        return self.graph.get_schema
+    
+    @property
+    def get_structured_schema(self) -> Dict[str, Any]:
+        return self.graph.get_structured_schema
+    
+    def query(self, query: str, params: dict = {}) -> List[Dict[str, Any]]:
+        return self.guard.run(query, params)
+    
+    def refresh_schema(self) -> None:
+        self.graph.refresh_schema()
+    
+    def add_graph_documents(self, graph_documents: List[Any], include_source: bool = False) -> None:
+        raise CypherRejected("GuardedGraph is read-only")
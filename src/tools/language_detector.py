@@ -1,32 +1,144 @@
-class LanguageDetector:
-    """Détecte la langue d'un texte (français ou anglais)."""
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, Tuple
+
+# Mots (apostrophes et tirets comme séparateurs: "j'ai" -> "j", "ai")
+TOKEN = re.compile(r"[^\W\d_]+")
+
+NGRAM_SIZE = 3
+
+# Poids des indices dans le score d'une langue
+STOPWORD_WEIGHT = 2.0
+CHAR_WEIGHT = 1.5
+NGRAM_WEIGHT = 1.0
+
+
+class LanguageProfile:
+    """Indices d'une langue: mots outils, caractères propres, fréquences de trigrammes."""
     
-    FRENCH_CHARS = ['é', 'è', 'ê', 'ë', 'à', 'â', 'ä', 'ù', 'û', 'ü', 'ç', 'ô', 'ö', 'î', 'ï']
+    def __init__(self, code: str, stopwords: Iterable[str], chars: str = "", corpus: str = ""):
+        self.code = code
+        self.stopwords = frozenset(stopwords)
+        self.chars = frozenset(chars)
+        counts = Counter(ngram for token in tokenize(corpus) for ngram in ngrams(token))
+        total = sum(counts.values())
+        # Log-probabilités lissées (Laplace); les trigrammes absents valent `unseen`
+        vocabulary = len(counts) + 1
+        self.unseen = math.log(1 / (total + vocabulary))
+        self.ngrams = {
+            ngram: math.log((count + 1) / (total + vocabulary)) for ngram, count in counts.items()
+        }
+
+
+def tokenize(text: str) -> list:
+    return TOKEN.findall(text.lower())
+
+
+def ngrams(token: str) -> Iterable[str]:
+    padded = f" {token} "
+    return (padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1))
+
+
+FRENCH = LanguageProfile(
+    "fr",
+    stopwords=[
+        "je", "j", "tu", "il", "elle", "nous", "vous", "ils", "elles", "on",
+        "mon", "ma", "mes", "ton", "ta", "tes", "sa", "ses", "leur", "leurs",
+        "le", "la", "les", "l", "un", "une", "des", "du", "de", "d", "au", "aux",
+        "et", "ou", "mais", "donc", "que", "qu", "qui", "quoi", "quel", "quelle", "quels", "quelles",
+        "est", "suis", "sont", "ai", "avoir", "être", "fait", "ça", "cela", "ce", "cette", "ces", "c",
+        "avec", "pour", "dans", "sur", "sans", "chez", "depuis", "pendant", "pas", "ne", "n", "plus", "très",
+        "comment", "pourquoi", "quand", "y", "en", "mal", "souffre", "symptôme", "symptômes",
+        "symptome", "symptomes", "maladie", "maladies", "traitement", "traitements", "fils", "fille",
+    ],
+    chars="éèêëàâäùûüçôöîïœ",
+    corpus=(
+        "J'ai de la fièvre et je tousse depuis trois jours. Mon fils a mal à la tête et des nausées. "
+        "Quels sont les traitements de cette maladie ? Je souffre de douleurs dans la poitrine et "
+        "d'un essoufflement quand je marche. Qu'est-ce qui peut causer une fatigue persistante ? "
+        "Elle a le nez bouché, les yeux rouges et des éternuements. Est-ce que c'est grave, docteur ? "
+        "Les symptômes sont apparus pendant la nuit avec des frissons et une soif excessive. "
+        "Quelle est la cause de ces crampes au ventre et de la diarrhée ?"
+    ),
+)
+
+ENGLISH = LanguageProfile(
+    "en",
+    stopwords=[
+        "i", "im", "ive", "me", "my", "you", "your", "he", "she", "his", "her", "we", "they", "their",
+        "the", "an", "and", "or", "but", "of", "to", "in", "on", "at", "for", "with", "from", "by", "about",
+        "is", "are", "am", "was", "were", "be", "been", "have", "has", "had", "do", "does", "did",
+        "it", "its", "this", "that", "these", "those", "what", "which", "who", "how", "why", "when",
+        "can", "could", "should", "would", "will", "not", "no", "since", "days", "feel", "feeling",
+        "symptom", "symptoms", "disease", "diseases", "treatment", "treatments", "kid", "daughter",
+        "serious", "pain", "ache", "sore",
+    ],
+    corpus=(
+        "I have had a fever and a cough for three days. My son has a headache and nausea. "
+        "What are the treatments for this disease? I have been suffering from chest pain and "
+        "shortness of breath when I walk. What could cause persistent fatigue? "
+        "She has a stuffy nose, red eyes and keeps sneezing. Is it serious, doctor? "
+        "The symptoms started during the night with chills and excessive thirst. "
+        "What is the cause of these stomach cramps and diarrhea?"
+    ),
+)
+
+
+class LanguageDetector:
+    """
+    Détecte la langue d'un texte (français ou anglais par défaut): mots outils
+    (recherche en frozenset sur les tokens), caractères propres à la langue et
+    vraisemblance des trigrammes de caractères. Résultats mémorisés par texte.
+    """
     
-    FRENCH_KEYWORDS = [
-        'je', 'mon', 'ma', 'mes', 'le', 'la', 'les', 'de', 'du', 'que', 
-        'symptome', 'maladie', 'traitement', 'cause', 'avoir', 'souffrir'
-    ]
+    DEFAULT = "fr"
+    PROFILES: Dict[str, LanguageProfile] = {"fr": FRENCH, "en": ENGLISH}
     
-    ENGLISH_KEYWORDS = [
-        'i', 'my', 'the', 'a', 'is', 'disease', 'symptom', 
-        'treatment', 'cause', 'what', 'have'
-    ]
+    @classmethod
+    def register(cls, profile: LanguageProfile):
+        """Ajoute (ou remplace) une langue reconnue."""
+        cls.PROFILES = {**cls.PROFILES, profile.code: profile}
+        _scores.cache_clear()
     
     @classmethod
     def detect(cls, text: str) -> str:
         """
         Détecte la langue du texte.
-        Returns: 'fr' ou 'en'
+        Returns: 'fr' ou 'en' (ou toute langue enregistrée)
         """
-        text_lower = text.lower()
-        
-        # Priorité aux accents français
-        if any(char in text_lower for char in cls.FRENCH_CHARS):
-            return 'fr'
-        
-        # Comptage mots-clés
-        french_count = sum(1 for word in cls.FRENCH_KEYWORDS if word in text_lower)
-        english_count = sum(1 for word in cls.ENGLISH_KEYWORDS if word in text_lower)
-        
-        return 'fr' if french_count >= english_count else 'en'
+        return cls.detect_with_confidence(text)[0]
+    
+    @classmethod
+    def detect_with_confidence(cls, text: str) -> Tuple[str, float]:
+        """(langue, confiance entre 0 et 1); langue par défaut si le texte n'a aucun indice."""
+        scores = _scores(text, tuple(cls.PROFILES.items()))
+        if not scores:
+            return cls.DEFAULT, 0.0
+        best = max(scores, key=lambda code: (scores[code], code == cls.DEFAULT))
+        # Softmax des scores: confiance relative entre langues
+        norm = sum(math.exp(score - scores[best]) for score in scores.values())
+        return best, round(1 / norm, 4)
+    
+    @classmethod
+    def scores(cls, text: str) -> Dict[str, float]:
+        return dict(_scores(text, tuple(cls.PROFILES.items())))
+
+
+@lru_cache(maxsize=8192)
+def _scores(text: str, profiles: tuple) -> Dict[str, float]:
+    tokens = tokenize(text)
+    if not tokens:
+        return {}
+    grams = [ngram for token in tokens for ngram in ngrams(token)]
+    chars = set(text.lower())
+    
+    scores = {}
+    for code, profile in profiles:
+        stopwords = sum(1 for token in tokens if token in profile.stopwords)
+        special = len(chars & profile.chars)
+        table, unseen = profile.ngrams, profile.unseen
+        likelihood = sum(table.get(ngram, unseen) for ngram in grams) / len(grams)
+        scores[code] = STOPWORD_WEIGHT * stopwords + CHAR_WEIGHT * special + NGRAM_WEIGHT * likelihood
+    return scores
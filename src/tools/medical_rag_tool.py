@@ -1,12 +1,23 @@
+import asyncio
+import os
 from crewai.tools import BaseTool
 from pydantic import Field
-from langchain_community.chains.graph_qa.cypher import GraphCypherQAChain
-from typing import Any
-from ..database.neo4j_connector import Neo4jConnector
+from typing import Any, List, Optional
+from ..cache.cypher_cache import CypherCache, question_intents
+from ..database.disease_profile import fetch_profiles
+from ..database.neo4j_connector import Neo4jConnector, tenant_route
 from ..models.groq_llm import GroqLLM
 from ..prompts.cypher_prompts import get_cypher_generation_prompt
 from ..prompts.qa_prompts import get_qa_generation_prompt
+from ..retrieval.symptom_matcher import SymptomMatcher, DISEASE_DETAILS_QUERY
+from ..utils.tracing import span, traced
+from .cypher_guard import CypherGuard, GuardedGraph
 from .language_detector import LanguageDetector
+from .result_shaper import ResultShaper
+
+# Intentions servies par le classement natif (symptômes -> maladies); les
+# autres (traitements, causes, comparaison...) passent par la chaîne Cypher
+NATIVE_INTENTS = frozenset({"symptom"})
 
 class MedicalRAGTool(BaseTool):
     """Tool RAG pour interroger le graphe médical."""
@@ -18,23 +29,65 @@ class MedicalRAGTool(BaseTool):
     )
     
     graph: Any = Field(default=None)
+    tenant: Optional[str] = Field(default=None)
     llm: Any = Field(default=None)
     qa_chain: Any = Field(default=None)
+    retriever: Any = Field(default=None)
+    vector_index: Any = Field(default=None)
+    cypher_cache: Any = Field(default=None)
+    shaper: Any = Field(default=None)
+    use_native_retrieval: bool = Field(default=True)
+    # Artefacts du catalogue du tenant (défaut: sa table de routage)
+    retrieval_backend: Optional[str] = Field(default=None)
+    snapshot_path: Optional[str] = Field(default=None)
+    vector_index_dir: Optional[str] = Field(default=None)
     
     def __init__(self, **data):
         super().__init__(**data)
+        route = tenant_route(self.tenant) or {}
+        for key in ("retrieval_backend", "snapshot_path", "vector_index_dir"):
+            if getattr(self, key) is None:
+                setattr(self, key, route.get(key))
         if self.graph is None:
-            self.graph = Neo4jConnector().get_graph()
+            self.graph = Neo4jConnector(self.tenant).get_graph()
+        if self.retriever is None and self.use_native_retrieval:
+            self.retriever = self._init_retriever()
+        if self.vector_index is None and self.vector_index_dir:
+            from ..retrieval.vector_index import VectorIndex
+            self.vector_index = VectorIndex(self.vector_index_dir)
         if self.llm is None:
             self.llm = GroqLLM().get_llm()
+        if self.shaper is None:
+            self.shaper = ResultShaper.from_env()
+        if self.cypher_cache is None:
+            extract = self.retriever.match if self.retriever is not None else None
+            self.cypher_cache = CypherCache.from_env(extract)
         if self.qa_chain is None:
             self.qa_chain = self._init_rag_chain()
     
-    def _init_rag_chain(self) -> GraphCypherQAChain:
-        """Initialise GraphCypherQAChain."""
+    def _init_retriever(self):
+        """
+        Backend natif: requête Neo4j précompilée ou index CSR en mémoire, chargé
+        depuis le snapshot du tenant s'il en a un, sinon construit depuis son graphe.
+        """
+        if (self.retrieval_backend or os.getenv("RETRIEVAL_BACKEND", "graph")) == "index":
+            from ..retrieval.symptom_index import SymptomIndex
+            if self.snapshot_path and os.path.exists(self.snapshot_path):
+                return SymptomIndex.from_snapshot(self.snapshot_path, graph=self.graph)
+            return SymptomIndex.from_graph(self.graph)
+        return SymptomMatcher(self.graph)
+    
+    def _init_rag_chain(self) -> "GraphCypherQAChain":
+        """
+        Initialise GraphCypherQAChain (Cypher générée contrôlée par CypherGuard).
+        Les lignes retournées sont regroupées et bornées par le ResultShaper
+        avant la génération de réponse.
+        """
+        from langchain_community.chains.graph_qa.cypher import GraphCypherQAChain
+        extract = self.retriever.match if self.retriever is not None else None
         qa_chain = GraphCypherQAChain.from_llm(
             llm=self.llm,
-            graph=self.graph,
+            graph=GuardedGraph(self.graph, CypherGuard.from_env(self.graph, extract)),
             verbose=True,
             cypher_prompt=get_cypher_generation_prompt(),
             qa_prompt=get_qa_generation_prompt(),
@@ -42,28 +95,211 @@ class MedicalRAGTool(BaseTool):
             allow_dangerous_requests=True,
             top_k=10
         )
-        return qa_chain
+        self.shaper.attach(qa_chain, LanguageDetector.detect)
+        return self.cypher_cache.attach(qa_chain)
     
+    @traced("tool.run")
     def _run(self, query: str) -> str:
-        """Exécute la recherche RAG."""
+        """Exécute la recherche RAG (chemin natif, puis chaîne Cypher LLM en repli)."""
         try:
             # Détection langue
             lang = LanguageDetector.detect(query)
             
+            # Chemin natif: symptômes connus + requête précompilée, sans LLM
+            native = self.retrieve(query)
+            if native:
+                return self._format_native(native, lang)
+            
             # Invoke RAG
-            response = self.qa_chain.invoke({"query": query})
-            answer = response.get("result", "No answer")
+            with span("cypher_chain"):
+                response = self.qa_chain.invoke({"query": query})
+            return self._format_chain_response(response, lang)
+        
+        except Exception as e:
+            return f"❌ Error: {str(e)}"
+    
+    @traced("tool.run")
+    async def _arun(self, query: str) -> str:
+        """Variante asynchrone de `_run` (driver neo4j async, chaîne en `ainvoke`)."""
+        try:
+            lang = LanguageDetector.detect(query)
             
-            # Extraction données graphe
-            intermediate_steps = response.get("intermediate_steps", [])
-            graph_info = self._extract_graph_data(intermediate_steps)
+            native = await self.aretrieve(query)
+            if native:
+                return self._format_native(native, lang)
             
-            # Format résultat selon langue
-            return self._format_output(answer, graph_info, lang)
+            with span("cypher_chain"):
+                response = await self.qa_chain.ainvoke({"query": query})
+            return self._format_chain_response(response, lang)
         
         except Exception as e:
             return f"❌ Error: {str(e)}"
     
+    def _format_native(self, native: dict, lang: str) -> str:
+        answer = self._format_ranking(native, lang)
+        return self._format_output(answer, self._ranking_to_graph_info(native), lang)
+    
+    def _format_chain_response(self, response: dict, lang: str) -> str:
+        answer = response.get("result", "No answer")
+        
+        # Extraction données graphe
+        intermediate_steps = response.get("intermediate_steps", [])
+        graph_info = self._extract_graph_data(intermediate_steps)
+        self._complete_from_profiles(graph_info)
+        
+        # Format résultat selon langue
+        return self._format_output(answer, graph_info, lang)
+    
+    def retrieve(self, query: str) -> dict:
+        """
+        Recherche déterministe complète (sans LLM): {symptoms, diseases, details}
+        ou None si aucun symptôme connu n'est trouvé.
+        """
+        with span("retrieve") as s:
+            native = self._native_search(query)
+            if native:
+                native["details"] = self._disease_details(native["diseases"])
+            s.attrs["diseases"] = len(native["diseases"]) if native else 0
+        return native
+    
+    async def aretrieve(self, query: str) -> dict:
+        with span("retrieve") as s:
+            native = await self._anative_search(query)
+            if native:
+                native["details"] = await asyncio.to_thread(self._disease_details, native["diseases"])
+            s.attrs["diseases"] = len(native["diseases"]) if native else 0
+        return native
+    
+    def retrieve_many(self, queries: List[str],
+                      symptom_sets: List[List[str]] = None) -> List[Optional[dict]]:
+        """
+        `retrieve` pour un lot de questions: un seul classement (UNWIND ou
+        index) et une seule lecture des profils pour toutes les maladies.
+        None pour les questions sans symptôme reconnu ni maladie classée, et
+        pour celles qui demandent autre chose qu'un classement (`is_lookup`).
+        """
+        if self.retriever is None:
+            return [None] * len(queries)
+        with span("retrieve_many", queries=len(queries)) as s:
+            if symptom_sets is None:
+                symptom_sets = [self.retriever.match(query) for query in queries]
+            symptom_sets = [symptoms if self.is_lookup(query) else []
+                            for query, symptoms in zip(queries, symptom_sets)]
+            rankings = self.retriever.rank_many(symptom_sets)
+            names = list(dict.fromkeys(row["disease"] for ranking in rankings for row in ranking))
+            details = self._disease_details(names) if names else {}
+            
+            results = []
+            for symptoms, diseases in zip(symptom_sets, rankings):
+                if not diseases:
+                    results.append(None)
+                    continue
+                results.append({
+                    "symptoms": symptoms,
+                    "diseases": diseases,
+                    "details": {row["disease"]: details[row["disease"]]
+                                for row in diseases if row["disease"] in details},
+                })
+            s.attrs["diseases"] = len(names)
+        return results
+    
+    def _disease_details(self, diseases: list) -> dict:
+        """
+        {maladie: profil (symptoms, treatments, causes, counts)} pour les
+        maladies classées, lus en un aller-retour depuis le profil matérialisé.
+        """
+        names = [row["disease"] if isinstance(row, dict) else row for row in diseases]
+        details = fetch_profiles(self.graph, names)
+        
+        # Graphe peuplé avant la matérialisation des profils: requête détaillée
+        missing = [name for name in names if name not in details]
+        if missing:
+            rows = self.graph.query(DISEASE_DETAILS_QUERY, {"names": missing})
+            details.update({row["disease"]: row for row in rows})
+        return details
+    
+    def _complete_from_profiles(self, graph_info: dict):
+        """Complète traitements et causes des maladies trouvées par la chaîne Cypher."""
+        diseases = graph_info["diseases"][:self.qa_chain.top_k]
+        if not diseases:
+            return
+        try:
+            details = self._disease_details(diseases)
+        except Exception as e:
+            print(f"⚠️ Profile lookup failed: {e}")
+            return
+        for key in ("treatments", "causes"):
+            values = dict.fromkeys(graph_info[key])
+            for name in diseases:
+                values.update(dict.fromkeys(details.get(name, {}).get(key, [])))
+            graph_info[key] = list(values)
+    
+    def is_lookup(self, query: str) -> bool:
+        """Question de type symptômes -> maladies (aucune autre intention exprimée)."""
+        return question_intents(query) <= NATIVE_INTENTS
+    
+    def _native_search(self, query: str) -> dict:
+        """Retourne {symptoms, diseases} ou None si le repli LLM est nécessaire."""
+        if self.retriever is None or not self.is_lookup(query):
+            return None
+        try:
+            result = self.retriever.search(query)
+            if not result.get("symptoms") and self.vector_index is not None:
+                result = self._vector_search(query)
+        except Exception as e:
+            print(f"⚠️ Native retrieval failed, falling back to Cypher chain: {e}")
+            return None
+        return result if result.get("diseases") else None
+    
+    async def _anative_search(self, query: str) -> dict:
+        if self.retriever is None or not self.is_lookup(query):
+            return None
+        try:
+            result = await self.retriever.asearch(query)
+            if not result.get("symptoms") and self.vector_index is not None:
+                result = await asyncio.to_thread(self._vector_search, query)
+        except Exception as e:
+            print(f"⚠️ Native retrieval failed, falling back to Cypher chain: {e}")
+            return None
+        return result if result.get("diseases") else None
+    
+    def _vector_search(self, query: str) -> dict:
+        """Recherche hybride: symptômes proches dans l'index vectoriel, puis classement graphe."""
+        hits = self.vector_index.search(query, k=5, labels=("Symptom",), min_score=0.3)
+        symptoms = [hit["name"] for hit in hits]
+        return {"symptoms": symptoms, "diseases": self.retriever.rank(symptoms)}
+    
+    def _ranking_to_graph_info(self, native: dict) -> dict:
+        """Convertit le classement natif au format de `_extract_graph_data`."""
+        details = native.get("details", {})
+        treatments, causes = {}, {}
+        for row in native["diseases"]:
+            info = details.get(row["disease"], {})
+            treatments.update(dict.fromkeys(info.get("treatments", [])))
+            causes.update(dict.fromkeys(info.get("causes", [])))
+        return {
+            "cypher_query": "",
+            "diseases": [row["disease"] for row in native["diseases"]],
+            "symptoms": list(native["symptoms"]),
+            "treatments": list(treatments),
+            "causes": list(causes)
+        }
+    
+    def format_context(self, native: dict, lang: str) -> str:
+        """Contexte compact pour un appel LLM unique: une ligne par maladie, dans le budget de tokens."""
+        return self.shaper.shape_native(native, lang)
+    
+    def _format_ranking(self, native: dict, lang: str) -> str:
+        """Réponse textuelle déterministe: maladies classées par recouvrement."""
+        matched_label = "symptômes correspondants" if lang == 'fr' else "matching symptoms"
+        lines = []
+        for rank, row in enumerate(native["diseases"], start=1):
+            lines.append(
+                f"{rank}. {row['disease']} — {row['overlap']}/{row['total']} "
+                f"{matched_label} ({', '.join(row['matched'])})"
+            )
+        return "\n".join(lines)
+    
     def _extract_graph_data(self, steps: list) -> dict:
         """Extrait les données du graphe."""
         result = {
@@ -111,6 +347,9 @@ class MedicalRAGTool(BaseTool):
     def _format_output(self, answer: str, graph_info: dict, lang: str) -> str:
         """Formate la sortie selon la langue."""
         labels = self._get_labels(lang)
+        # Listes fusionnées de toutes les maladies: plafond proportionnel à leur nombre
+        limit = self.shaper.max_items * max(1, len(graph_info['diseases']))
+        clip = lambda key: self.shaper.clip(graph_info[key], labels['none'], limit)
         
         output = f"""
 {labels['title']}
@@ -118,10 +357,10 @@ class MedicalRAGTool(BaseTool):
 {labels['answer']}
 {answer}
 
-{labels['diseases']} {', '.join(graph_info['diseases']) or labels['none']}
-{labels['symptoms']} {', '.join(graph_info['symptoms']) or labels['none']}
-{labels['treatments']} {', '.join(graph_info['treatments']) or labels['none']}
-{labels['causes']} {', '.join(graph_info['causes']) or labels['none']}
+{labels['diseases']} {clip('diseases')}
+{labels['symptoms']} {clip('symptoms')}
+{labels['treatments']} {clip('treatments')}
+{labels['causes']} {clip('causes')}
         """
         return output
     
@@ -0,0 +1,254 @@
+"""
+Mise en forme des résultats du graphe avant un appel LLM.
+
+Les lignes brutes (chaîne Cypher) ou le classement natif sont dédoublonnés,
+regroupés par maladie, classés, puis rendus en contexte compact dans un
+budget de tokens mesuré avec un vrai tokenizer (tiktoken).
+"""
+import os
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+from ..utils.tracing import metrics
+
+# Colonnes reconnues dans les lignes Cypher (alias de la requête ou variables brutes)
+FIELDS = {
+    "disease": ("disease", "d.name", "maladie"),
+    "symptoms": ("symptom", "s.name", "symptoms", "matched"),
+    "treatments": ("treatment", "t.name", "treatments"),
+    "causes": ("cause", "c.name", "causes"),
+}
+SCORE_FIELDS = ("overlap", "score")
+
+# Approximation utilisée si aucun encodage tiktoken n'est disponible (hors ligne)
+APPROX_TOKEN = re.compile(r"\w{1,4}|[^\w\s]")
+
+CONTEXT_TOKENS = "rag_context_tokens_total"
+CONTEXT_COUNT = "rag_contexts_total"
+CONTEXT_TRUNCATED = "rag_context_truncated_total"
+
+
+class TokenCounter:
+    """Compte et tronque en tokens (tiktoken, encodage CONTEXT_TOKENIZER)."""
+    
+    def __init__(self, encoding: str = None):
+        self.encoding_name = encoding or os.getenv("CONTEXT_TOKENIZER", "cl100k_base")
+    
+    @property
+    def encoding(self):
+        return _load_encoding(self.encoding_name)
+    
+    def count(self, text: str) -> int:
+        if self.encoding is None:
+            return len(APPROX_TOKEN.findall(text))
+        return len(self.encoding.encode(text))
+    
+    def truncate(self, text: str, max_tokens: int) -> str:
+        if self.encoding is None:
+            pieces = list(APPROX_TOKEN.finditer(text))
+            return text if len(pieces) <= max_tokens else text[:pieces[max_tokens].start()].rstrip() + "…"
+        tokens = self.encoding.encode(text)
+        return text if len(tokens) <= max_tokens else self.encoding.decode(tokens[:max_tokens]).rstrip() + "…"
+
+
+@lru_cache(maxsize=None)
+def _load_encoding(name: str):
+    """Encodage tiktoken chargé une fois par processus (None si indisponible)."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        # Encodage téléchargé au premier usage (ou lu dans TIKTOKEN_CACHE_DIR)
+        print(f"⚠️ Tokenizer {name} unavailable, approximating token counts ({type(e).__name__})")
+        return None
+
+
+class ShapedQAGeneration:
+    """
+    Remplace `qa_chain` d'un GraphCypherQAChain: les lignes brutes du
+    contexte sont remplacées par le contexte compact avant l'appel LLM.
+    """
+    
+    def __init__(self, generator: Any, shaper: "ResultShaper", detect_language: Any):
+        self.generator = generator
+        self.shaper = shaper
+        self.detect_language = detect_language
+    
+    def _shape(self, args: dict) -> dict:
+        if not isinstance(args, dict) or not isinstance(args.get("context"), list):
+            return args
+        lang = self.detect_language(args.get("question", ""))
+        return {**args, "context": self.shaper.shape_rows(args["context"], lang)}
+    
+    def invoke(self, args: dict, config: Any = None, **kwargs) -> Any:
+        return self.generator.invoke(self._shape(args), config, **kwargs)
+    
+    async def ainvoke(self, args: dict, config: Any = None, **kwargs) -> Any:
+        return await self.generator.ainvoke(self._shape(args), config, **kwargs)
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.generator, name)
+
+
+class ResultShaper:
+    """
+    Contexte LLM borné: une entrée par maladie (symptômes, traitements,
+    causes dédoublonnés et plafonnés), maladies les mieux étayées d'abord,
+    ajoutées tant que le budget de tokens le permet.
+    """
+    
+    def __init__(self, budget: int = 1000, max_items: int = 8, counter: TokenCounter = None):
+        self.budget = budget
+        self.max_items = max_items
+        self.counter = counter or TokenCounter()
+    
+    @classmethod
+    def from_env(cls) -> "ResultShaper":
+        return cls(
+            budget=int(os.getenv("CONTEXT_TOKEN_BUDGET", 1000)),
+            max_items=int(os.getenv("CONTEXT_MAX_ITEMS", 8)),
+        )
+    
+    def attach(self, qa_chain: Any, detect_language: Any) -> Any:
+        """Intercale la mise en forme devant la génération de réponse de la chaîne."""
+        wrapped = ShapedQAGeneration(qa_chain.qa_chain, self, detect_language)
+        # Contourne la validation pydantic du champ (LLMChain/Runnable attendu)
+        object.__setattr__(qa_chain, "qa_chain", wrapped)
+        return qa_chain
+    
+    def group_rows(self, rows: List[Dict[str, Any]]) -> List[dict]:
+        """Lignes Cypher -> une entrée par maladie, classées (score, puis symptômes, puis ordre d'arrivée)."""
+        groups: Dict[str, dict] = {}
+        extras: Dict[str, None] = {}
+        seen = set()
+        for row in rows:
+            if not isinstance(row, dict):
+                continue
+            signature = repr(sorted(row.items(), key=lambda item: item[0]))
+            if signature in seen:
+                continue
+            seen.add(signature)
+            
+            disease = _first(row, FIELDS["disease"])
+            if not disease:
+                # Ligne sans maladie (agrégat, compte...): conservée telle quelle
+                extras[", ".join(f"{k}={v}" for k, v in row.items())] = None
+                continue
+            group = groups.setdefault(str(disease), {
+                "disease": str(disease), "score": None, "rows": 0,
+                "symptoms": {}, "treatments": {}, "causes": {},
+            })
+            group["rows"] += 1
+            for key in ("symptoms", "treatments", "causes"):
+                for value in _values(row, FIELDS[key]):
+                    group[key][value] = None
+            score = _first(row, SCORE_FIELDS)
+            if isinstance(score, (int, float)):
+                group["score"] = max(score, group["score"] or score)
+        
+        ranked = sorted(
+            enumerate(groups.values()),
+            key=lambda item: (-(item[1]["score"] or 0), -len(item[1]["symptoms"]), item[0])
+        )
+        entries = [{**group, **{key: list(group[key]) for key in ("symptoms", "treatments", "causes")}}
+                   for _, group in ranked]
+        for extra in extras:
+            entries.append({"disease": None, "text": extra})
+        return entries
+    
+    def from_native(self, native: dict) -> List[dict]:
+        """Classement natif (+ profils) -> mêmes entrées que `group_rows`, ordre conservé."""
+        details = native.get("details", {})
+        entries = []
+        for row in native["diseases"]:
+            info = details.get(row["disease"], {})
+            entries.append({
+                "disease": row["disease"],
+                "score": row.get("overlap"),
+                "total": row.get("total"),
+                "symptoms": list(row.get("matched", [])),
+                "treatments": list(info.get("treatments", [])),
+                "causes": list(info.get("causes", [])),
+            })
+        return entries
+    
+    def shape_rows(self, rows: List[Dict[str, Any]], lang: str, stage: str = "chain") -> str:
+        return self.render(self.group_rows(rows), lang, stage)
+    
+    def shape_native(self, native: dict, lang: str, stage: str = "fast") -> str:
+        return self.render(self.from_native(native), lang, stage)
+    
+    def clip(self, values: List[str], none: str = "-", limit: int = None) -> str:
+        """Liste jointe, plafonnée à `limit` (défaut `max_items`; +N pour le reste)."""
+        if not values:
+            return none
+        limit = limit or self.max_items
+        shown = ", ".join(values[:limit])
+        hidden = len(values) - limit
+        return f"{shown} (+{hidden})" if hidden > 0 else shown
+    
+    def render(self, entries: List[dict], lang: str, stage: str = "context") -> str:
+        """Entrées rendues une ligne chacune, dans l'ordre, jusqu'au budget de tokens (note de troncature comprise)."""
+        labels = LABELS.get(lang, LABELS["en"])
+        # Place réservée pour la note "+N maladies omises"
+        limit = max(1, self.budget - self.counter.count(labels["omitted"].format(count=len(entries))))
+        lines, used, cut = [], 0, False
+        for entry in entries:
+            line = self._line(len(lines) + 1, entry, labels)
+            cost = self.counter.count(line) + 1
+            if used + cost > limit:
+                if not lines:
+                    # La première entrée dépasse déjà le budget: coupée ("…" et saut de ligne compris)
+                    lines.append(self.counter.truncate(line, max(1, limit - 2)))
+                    cut = True
+                break
+            lines.append(line)
+            used += cost
+        
+        omitted = len(entries) - len(lines)
+        if omitted:
+            lines.append(labels["omitted"].format(count=omitted))
+        context = "\n".join(lines)
+        metrics.inc(CONTEXT_TOKENS, self.counter.count(context), stage=stage)
+        metrics.inc(CONTEXT_COUNT, stage=stage)
+        if omitted or cut:
+            metrics.inc(CONTEXT_TRUNCATED, stage=stage)
+        return context
+    
+    def _line(self, rank: int, entry: dict, labels: dict) -> str:
+        if entry["disease"] is None:
+            return f"- {entry['text']}"
+        matched = self.clip(entry["symptoms"])
+        if entry.get("total"):
+            matched = f"{entry['score']}/{entry['total']} ({matched})"
+        return (
+            f"{rank}. {entry['disease']} | {labels['symptoms']}: {matched} | "
+            f"{labels['treatments']}: {self.clip(entry['treatments'])} | "
+            f"{labels['causes']}: {self.clip(entry['causes'])}"
+        )
+
+
+LABELS = {
+    "fr": {"symptoms": "symptômes", "treatments": "traitements", "causes": "causes",
+           "omitted": "(+{count} maladies omises: budget de contexte atteint)"},
+    "en": {"symptoms": "symptoms", "treatments": "treatments", "causes": "causes",
+           "omitted": "(+{count} diseases omitted: context budget reached)"},
+}
+
+
+def _first(row: dict, keys: tuple) -> Optional[Any]:
+    for key in keys:
+        if row.get(key) is not None:
+            return row[key]
+    return None
+
+
+def _values(row: dict, keys: tuple) -> List[str]:
+    values = []
+    for key in keys:
+        value = row.get(key)
+        if isinstance(value, (list, tuple)):
+            values.extend(str(v) for v in value if v is not None)
+        elif value is not None:
+            values.append(str(value))
+    return values
@@ -0,0 +1,118 @@
+import asyncio
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from .tracing import span
+
+
+class AsyncRateLimiter:
+    """Seau à jetons asynchrone: `rate` requêtes par seconde, rafales jusqu'à `burst`."""
+    
+    def __init__(self, rate: float, burst: int = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _reserve(self, tokens: float) -> float:
+        """Réserve des jetons; retourne l'attente nécessaire en secondes."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+    
+    async def acquire(self, tokens: float = 1.0):
+        delay = self._reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+    
+    def acquire_sync(self, tokens: float = 1.0):
+        """Variante bloquante pour les threads de travail (scripts batch)."""
+        delay = self._reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> AsyncRateLimiter:
+    """Limiteur partagé par fournisseur (ex: GROQ_RATE_LIMIT=0.5 req/s)."""
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(provider)
+        if limiter is None:
+            rate = float(os.getenv(f"{provider.upper()}_RATE_LIMIT", 0.5))
+            burst = int(os.getenv(f"{provider.upper()}_RATE_BURST", 5))
+            limiter = AsyncRateLimiter(rate, burst)
+            _rate_limiters[provider] = limiter
+        return limiter
+
+
+class BoundedScheduler:
+    """
+    Limite le nombre de questions exécutées en parallèle; les autres
+    attendent sous forme de coroutines (sans occuper de thread).
+    """
+    
+    def __init__(self, max_concurrency: int = None):
+        self.max_concurrency = max_concurrency or int(os.getenv("MAX_CONCURRENT_QUESTIONS", 8))
+        self._semaphore = None
+        self.in_flight = 0
+        self.waiting = 0
+    
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Créé paresseusement dans la boucle d'événements qui l'utilise
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+    
+    @asynccontextmanager
+    async def slot(self):
+        self.waiting += 1
+        try:
+            with span("scheduler.wait"):
+                await self.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.semaphore.release()
+    
+    async def run(self, coro_fn, *args, **kwargs):
+        async with self.slot():
+            return await coro_fn(*args, **kwargs)
+
+
+async def iterate_in_thread(iterator):
+    """Consomme un itérateur bloquant dans un thread et le réexpose en async."""
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    done = object()
+    
+    def pump():
+        try:
+            for item in iterator:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, done)
+    
+    thread = threading.Thread(target=pump, daemon=True)
+    thread.start()
+    while True:
+        item = await queue.get()
+        if item is done:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
@@ -0,0 +1,22 @@
+"""
+Chargement unique du fichier .env pour tout le processus (au lieu d'un
+`load_dotenv()` à l'import de chaque module).
+"""
+import threading
+
+_lock = threading.Lock()
+_loaded = False
+
+
+def load_env(override: bool = False) -> bool:
+    """Charge .env au premier appel; les appels suivants ne font rien. Retourne True si chargé ici."""
+    global _loaded
+    if _loaded:
+        return False
+    with _lock:
+        if _loaded:
+            return False
+        from dotenv import load_dotenv
+        load_dotenv(override=override)
+        _loaded = True
+    return True
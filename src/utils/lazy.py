@@ -0,0 +1,24 @@
+"""
+Exports paresseux des packages (PEP 562): `from src.agents import X`
+n'importe le module de X (et crewai, langchain, litellm) qu'au premier accès.
+"""
+import importlib
+from typing import Callable, Dict, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable, Callable]:
+    """Retourne (`__getattr__`, `__dir__`) pour un package; `exports` associe nom -> sous-module relatif."""
+    namespace = importlib.import_module(package).__dict__
+    
+    def __getattr__(name: str):
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module, package), name)
+        namespace[name] = value
+        return value
+    
+    def __dir__():
+        return sorted(set(namespace) | set(exports))
+    
+    return __getattr__, __dir__
@@ -0,0 +1,282 @@
+"""
+Instrumentation du pipeline: spans par étape (contextvars, propagés aux
+threads qui copient le contexte) et registre de métriques en mémoire
+exportable au format texte Prometheus.
+"""
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Dict, List, Optional
+
+# Bornes des histogrammes de durée (secondes): du lookup local à l'appel LLM lent
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+STAGE_DURATION = "rag_stage_duration_seconds"
+STAGE_ERRORS = "rag_stage_errors_total"
+STARTUP_DURATION = "rag_startup_seconds"
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: tuple, extra: tuple = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in pairs
+    )
+    return "{" + body + "}"
+
+
+class MetricsRegistry:
+    """Compteurs et histogrammes thread-safe, rendus au format d'exposition Prometheus."""
+    
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[tuple, float]] = {}
+        self._gauges: Dict[str, Dict[tuple, float]] = {}
+        self._histograms: Dict[str, Dict[tuple, list]] = {}
+        self._help: Dict[str, str] = {}
+    
+    def describe(self, name: str, text: str):
+        self._help[name] = text
+    
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+    
+    def set(self, name: str, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+    
+    def observe(self, name: str, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            # [compte par borne..., +Inf, somme]
+            state = series.get(key)
+            if state is None:
+                state = series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[len(self.buckets)] += 1
+            state[-1] += value
+    
+    def counter(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0.0)
+    
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+    
+    def render_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for kind, table in (("counter", self._counters), ("gauge", self._gauges)):
+                for name, series in sorted(table.items()):
+                    if name in self._help:
+                        lines.append(f"# HELP {name} {self._help[name]}")
+                    lines.append(f"# TYPE {name} {kind}")
+                    for key, value in series.items():
+                        lines.append(f"{name}{_format_labels(key)} {value:g}")
+            for name, series in sorted(self._histograms.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, state in series.items():
+                    for bound, count in zip(self.buckets, state):
+                        lines.append(f"{name}_bucket{_format_labels(key, (('le', f'{bound:g}'),))} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(key, (('le', '+Inf'),))} {state[len(self.buckets)]}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {state[-1]:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {state[len(self.buckets)]}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+metrics.describe(STAGE_DURATION, "Duration of each pipeline stage")
+metrics.describe(STAGE_ERRORS, "Pipeline stages that raised an exception")
+metrics.describe("rag_llm_tokens_total", "LLM tokens by model and kind (prompt/completion)")
+metrics.describe("rag_llm_retries_total", "LLM or tool retries observed during agent runs")
+metrics.describe("rag_graph_rows_total", "Rows returned by graph queries")
+metrics.describe(STARTUP_DURATION, "Last measured duration of each startup phase (imports, bootstrap, rerun)")
+
+
+class Span:
+    """Étape chronométrée d'une requête."""
+    
+    __slots__ = ("name", "attrs", "start", "end", "depth")
+    
+    def __init__(self, name: str, depth: int, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+        self.depth = depth
+        self.start = time.perf_counter()
+        self.end = None
+    
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.perf_counter()) - self.start) * 1000
+
+
+class Trace:
+    """Spans d'une requête, dans l'ordre d'ouverture."""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.perf_counter()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def activate(self):
+        """Rend la trace courante le temps d'un bloc (à ne pas garder ouvert à travers un `yield`)."""
+        token = _current_trace.set(self)
+        try:
+            yield self
+        finally:
+            _current_trace.reset(token)
+    
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+    
+    def breakdown(self) -> List[dict]:
+        """Une ligne par span: étape, profondeur, début relatif et durée (ms)."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        return [
+            {
+                "stage": s.name,
+                "depth": s.depth,
+                "start_ms": round((s.start - self.start) * 1000, 2),
+                "duration_ms": round(s.duration_ms, 2),
+                **s.attrs,
+            }
+            for s in spans
+        ]
+    
+    def totals(self) -> Dict[str, float]:
+        """Durée cumulée par étape (ms)."""
+        totals = {}
+        for row in self.breakdown():
+            totals[row["stage"]] = round(totals.get(row["stage"], 0.0) + row["duration_ms"], 2)
+        return totals
+    
+    def format(self) -> str:
+        return "\n".join(
+            f"{row['start_ms']:>9.1f} ms  {'  ' * row['depth']}{row['stage']:<28} {row['duration_ms']:>9.1f} ms"
+            for row in self.breakdown()
+        )
+
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("rag_trace", default=None)
+_current_depth: contextvars.ContextVar = contextvars.ContextVar("rag_span_depth", default=0)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def trace(name: str = "request"):
+    """Démarre la trace d'une requête (réutilise la trace englobante si elle existe)."""
+    current = _current_trace.get() or Trace(name)
+    with current.activate(), span(name):
+        yield current
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Chronomètre une étape: histogramme global, plus la trace courante si présente."""
+    depth = _current_depth.get()
+    current = Span(name, depth, attrs)
+    parent = _current_trace.get()
+    if parent is not None:
+        parent.add(current)
+    token = _current_depth.set(depth + 1)
+    try:
+        yield current
+    except BaseException:
+        metrics.inc(STAGE_ERRORS, stage=name)
+        raise
+    finally:
+        _current_depth.reset(token)
+        current.end = time.perf_counter()
+        metrics.observe(STAGE_DURATION, current.end - current.start, stage=name)
+
+
+def record_span(name: str, duration: float, **attrs):
+    """Enregistre une étape déjà terminée (durée en secondes), ex: événement CrewAI."""
+    current = Span(name, _current_depth.get(), attrs)
+    current.end = time.perf_counter()
+    current.start = current.end - duration
+    parent = _current_trace.get()
+    if parent is not None:
+        parent.add(current)
+    metrics.observe(STAGE_DURATION, duration, stage=name)
+
+
+def traced(name: str):
+    """Décorateur `trace` (span racine ou imbriqué) pour fonctions synchrones et coroutines."""
+    def decorator(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with trace(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+        
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with trace(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrument_graph(graph: Any) -> Any:
+    """Enveloppe `graph.query` (span `graph.query` + lignes retournées). Idempotent."""
+    query = graph.query
+    if getattr(query, "_traced", False):
+        return graph
+    
+    @wraps(query)
+    def traced_query(*args, **kwargs):
+        with span("graph.query") as s:
+            rows = query(*args, **kwargs)
+            s.attrs["rows"] = len(rows)
+        metrics.inc("rag_graph_rows_total", len(rows))
+        return rows
+    
+    traced_query._traced = True
+    graph.query = traced_query
+    return graph
+
+
+def check_startup_budget(phase: str, elapsed: float, budget_ms: float = None) -> bool:
+    """
+    Enregistre la durée (secondes) d'une phase de démarrage et avertit si elle
+    dépasse STARTUP_BUDGET_MS. Retourne False en cas de dépassement.
+    """
+    if budget_ms is None:
+        budget_ms = float(os.getenv("STARTUP_BUDGET_MS", 2000))
+    metrics.set(STARTUP_DURATION, elapsed, phase=phase)
+    if elapsed * 1000 <= budget_ms:
+        return True
+    print(f"⚠️ Startup budget exceeded: {phase} took {elapsed * 1000:.0f} ms (budget {budget_ms:.0f} ms)")
+    return False
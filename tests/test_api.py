@@ -0,0 +1,100 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from src import resources
+from src.retrieval.batcher import QueueFullError, RetrievalBatcher
+
+
+class RecordingRetriever:
+    """Retriever factice: un appel `arank_many` par lot."""
+    
+    def __init__(self):
+        self.batches = []
+    
+    async def arank_many(self, symptom_sets, limit=None):
+        self.batches.append(symptom_sets)
+        return [[{"disease": "+".join(symptoms)}] for symptoms in symptom_sets]
+
+
+def test_batcher_groups_concurrent_requests():
+    retriever = RecordingRetriever()
+    
+    async def scenario():
+        batcher = RetrievalBatcher(retriever, max_batch=8, max_wait_ms=50)
+        results = await asyncio.gather(*(batcher.rank([f"s{i}"]) for i in range(5)))
+        await batcher.stop()
+        return results
+    
+    results = asyncio.run(scenario())
+    assert retriever.batches == [[["s0"], ["s1"], ["s2"], ["s3"], ["s4"]]]
+    assert [rows[0]["disease"] for rows in results] == ["s0", "s1", "s2", "s3", "s4"]
+
+
+def test_batcher_rejects_when_queue_is_full():
+    async def scenario():
+        batcher = RetrievalBatcher(RecordingRetriever(), max_queue=0)
+        with pytest.raises(QueueFullError):
+            await batcher.rank(["s0"])
+        await batcher.stop()
+    
+    asyncio.run(scenario())
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Graphe en mémoire et LLM local: aucun driver Neo4j ne doit être ouvert
+    monkeypatch.setenv("GRAPH_BACKEND", "memory")
+    monkeypatch.setenv("LLM_BACKEND", "fake")
+    monkeypatch.setenv("RETRIEVAL_BACKEND", "graph")
+    resources.reset()
+    import api
+    with TestClient(api.app) as client:
+        yield client
+    resources.reset()
+
+
+def test_retrieve_runs_offline_through_the_batcher(client):
+    import api
+    assert api.state["retriever"].async_graph is None
+    body = client.post("/retrieve", json={"question": "J'ai de la fièvre et de la toux"}).json()
+    expected = api.state["retriever"].search("J'ai de la fièvre et de la toux")
+    assert body["symptoms"] == expected["symptoms"]
+    assert [row["disease"] for row in body["diseases"]] == [row["disease"] for row in expected["diseases"]]
+    assert api.state["batcher"].batches == 1
+
+
+def test_health_reports_queues(client):
+    assert client.get("/health").json()["status"] == "ok"
+
+
+class StubAsyncGraph:
+    closed = False
+    
+    async def close(self):
+        self.closed = True
+
+
+class StubConnector:
+    """Connecteur du graphe du retriever (instance et base propres)."""
+    
+    def __init__(self):
+        self.async_graph = StubAsyncGraph()
+    
+    def get_async_graph(self):
+        return self.async_graph
+
+
+def test_async_graph_comes_from_the_retriever_graph_connector(monkeypatch):
+    monkeypatch.setenv("GRAPH_BACKEND", "memory")
+    monkeypatch.setenv("LLM_BACKEND", "fake")
+    monkeypatch.setenv("RETRIEVAL_BACKEND", "graph")
+    resources.reset()
+    connector = StubConnector()
+    resources.get_graph().connector = connector
+    import api
+    with TestClient(api.app):
+        retriever = api.state["retriever"]
+        assert retriever.async_graph is connector.async_graph
+    assert retriever.async_graph is None
+    assert connector.async_graph.closed
+    resources.reset()
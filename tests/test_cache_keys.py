@@ -0,0 +1,47 @@
+from src.backends import MemoryGraph
+from src.cache.answer_cache import AnswerCache
+from src.cache.cypher_cache import CypherCache, question_key
+
+SYMPTOMS = {"fièvre", "toux"}
+
+
+def extract(question):
+    """Extraction de symptômes minimale (sous-chaînes connues)."""
+    return sorted(s for s in SYMPTOMS if s in question.lower())
+
+
+def test_question_key_keeps_disease_names():
+    grippe = "What treatment for Grippe with fièvre?"
+    asthme = "What treatment for Asthme with fièvre?"
+    assert question_key(grippe, extract(grippe)) != question_key(asthme, extract(asthme))
+
+
+def test_question_key_ignores_word_order_and_filler():
+    first = "J'ai de la fièvre et de la toux"
+    second = "toux et fièvre"
+    assert question_key(first, extract(first)) == question_key(second, extract(second))
+
+
+def test_question_key_keeps_negation():
+    positive = "J'ai de la toux et de la fièvre"
+    negative = "J'ai de la toux mais pas de fièvre"
+    assert question_key(positive, extract(positive)) != question_key(negative, extract(negative))
+
+
+def test_answer_keys_differ_by_disease():
+    cache = AnswerCache(MemoryGraph(), extract_symptoms=extract)
+    assert cache.key("Does grippe cause fièvre?", "fast") != cache.key("Does migraine cause fièvre?", "fast")
+
+
+def test_cypher_keys_differ_by_disease():
+    cache = CypherCache(extract_symptoms=extract)
+    assert (cache.key({"question": "What treatment for Grippe with fièvre?"})
+            != cache.key({"question": "What treatment for Asthme with fièvre?"}))
+
+
+def test_answer_keys_differ_by_tenant():
+    graph = MemoryGraph()
+    clinic = AnswerCache(graph, extract_symptoms=extract, tenant="clinic-a")
+    default = AnswerCache(graph, extract_symptoms=extract)
+    question = "J'ai de la fièvre"
+    assert clinic.key(question, "fast") != default.key(question, "fast")
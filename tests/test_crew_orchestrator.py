@@ -0,0 +1,46 @@
+import pytest
+from src.agents.crew_orchestrator import MedicalCrewOrchestrator
+from src.backends import FakeLLM, MemoryGraph
+from src.database.data_seeder import DataSeeder
+from src.tools.medical_rag_tool import MedicalRAGTool
+
+
+class RecordingLimiter:
+    """Limiteur factice: enregistre les jetons demandés sans attendre."""
+    
+    def __init__(self):
+        self.acquired = []
+    
+    def acquire_sync(self, tokens=1.0):
+        self.acquired.append(tokens)
+    
+    async def acquire(self, tokens=1.0):
+        self.acquired.append(tokens)
+
+
+@pytest.fixture(scope="module")
+def graph():
+    graph = MemoryGraph()
+    DataSeeder(graph).seed_from_json("data/medical_data.json")
+    return graph
+
+
+@pytest.fixture
+def orchestrator(graph):
+    groq = FakeLLM()
+    tool = MedicalRAGTool(graph=graph, llm=groq.get_llm())
+    orchestrator = MedicalCrewOrchestrator(use_cache=False, groq=groq, tool=tool, mode="fast")
+    orchestrator.rate_limiter = RecordingLimiter()
+    return orchestrator
+
+
+def test_sync_run_goes_through_the_rate_limiter(orchestrator):
+    orchestrator.run("J'ai de la fièvre et de la toux")
+    assert orchestrator.rate_limiter.acquired == [1]
+    assert orchestrator.groq.calls == 1
+
+
+def test_run_prepared_acquires_once(orchestrator):
+    question = "J'ai de la fièvre et de la toux"
+    orchestrator.run_prepared(question, orchestrator.tool.retrieve(question))
+    assert orchestrator.rate_limiter.acquired == [1]
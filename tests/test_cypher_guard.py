@@ -0,0 +1,92 @@
+import pytest
+from src.retrieval.symptom_matcher import SYMPTOM_LOOKUP_QUERY
+from src.tools.cypher_guard import CypherGuard, CypherRejected
+
+SYMPTOMS = {"fièvre": "fièvre", "fever": "fièvre", "toux": "toux"}
+
+
+def extract(text):
+    return [name for word, name in SYMPTOMS.items() if word == text.lower()]
+
+
+class RecordingGraph:
+    """Graphe factice: enregistre les requêtes exécutées."""
+    
+    def __init__(self):
+        self.queries = []
+    
+    def query(self, query, params=None):
+        self.queries.append((query, params))
+        return []
+
+
+@pytest.fixture
+def guard():
+    return CypherGuard(RecordingGraph(), extract)
+
+
+def test_single_symptom_lookup_is_rewritten(guard):
+    cypher = "MATCH (d:Disease)-[:HAS_SYMPTOM]->(s:Symptom) WHERE s.name = 'fever' RETURN d.name AS disease, s.name AS symptom"
+    prepared, params, outcome = guard.prepare(cypher, {})
+    assert outcome == "rewritten"
+    assert prepared == SYMPTOM_LOOKUP_QUERY
+    assert params["symptoms"] == ["fièvre"]
+
+
+def test_in_list_lookup_is_rewritten_with_its_limit(guard):
+    cypher = ("MATCH (d:Disease)-[:HAS_SYMPTOM]->(s:Symptom) WHERE s.name IN ['fièvre', 'toux'] "
+              "RETURN DISTINCT d.name AS disease, s.name AS symptom LIMIT 5")
+    prepared, params, outcome = guard.prepare(cypher, {})
+    assert outcome == "rewritten"
+    assert params == {"symptoms": ["fièvre", "toux"], "limit": 5}
+
+
+def test_multi_pattern_conjunction_is_not_rewritten(guard):
+    cypher = ("MATCH (d:Disease)-[:HAS_SYMPTOM]->(:Symptom {name:'fièvre'}), "
+              "(d)-[:HAS_SYMPTOM]->(:Symptom {name:'toux'}) RETURN d.name")
+    assert guard.rewrite(cypher) is None
+    guard.run(cypher)
+    executed, _ = guard.graph.queries[-1]
+    assert executed.startswith(cypher)
+    assert executed != SYMPTOM_LOOKUP_QUERY
+
+
+def test_other_return_columns_are_not_rewritten(guard):
+    cypher = "MATCH (d:Disease)-[:HAS_SYMPTOM]->(s:Symptom) WHERE s.name = 'toux' RETURN d.name"
+    assert guard.rewrite(cypher) is None
+
+
+def test_unknown_literal_is_not_rewritten(guard):
+    cypher = "MATCH (d:Disease)-[:HAS_SYMPTOM]->(s:Symptom) WHERE s.name = 'vertige' RETURN d.name AS disease, s.name AS symptom"
+    assert guard.rewrite(cypher) is None
+
+
+@pytest.mark.parametrize("pattern", ["[*2]", "[:HAS_SYMPTOM*1..2]", "[r*..3]", "[* 2 ]"])
+def test_bounded_variable_length_paths_are_accepted(guard, pattern):
+    cypher = f"MATCH (d:Disease)-{pattern}-(x) RETURN d.name, x.name"
+    assert guard.validate(cypher) == cypher
+
+
+@pytest.mark.parametrize("pattern", ["[*]", "[:HAS_SYMPTOM*]", "[r*2..]", "[*..]"])
+def test_unbounded_variable_length_paths_are_rejected(guard, pattern):
+    with pytest.raises(CypherRejected, match="unbounded"):
+        guard.validate(f"MATCH (d:Disease)-{pattern}-(x) RETURN d.name, x.name")
+
+
+@pytest.mark.parametrize("cypher", [
+    "CALL db.labels() YIELD label RETURN label",
+    "MATCH (d:Disease) CALL db.relationshipTypes() YIELD relationshipType RETURN d.name, relationshipType",
+    "MATCH (d:Disease) CALL { WITH d MATCH (d)-[:HAS_SYMPTOM]->(s) RETURN count(s) AS n } RETURN d.name, n",
+])
+def test_read_only_calls_are_accepted(guard, cypher):
+    assert guard.validate(cypher) == cypher
+
+
+@pytest.mark.parametrize("cypher", [
+    "CALL apoc.periodic.iterate('MATCH (n) RETURN n', 'DETACH DELETE n', {})",
+    "MATCH (d:Disease) CALL dbms.killQueries(['1']) YIELD queryId RETURN d",
+    "MATCH (d:Disease) CALL { WITH d SET d.x = 1 } RETURN d.name",
+])
+def test_other_calls_are_rejected(guard, cypher):
+    with pytest.raises(CypherRejected):
+        guard.validate(cypher)
@@ -0,0 +1,67 @@
+import json
+from src.backends import MemoryGraph
+from src.database.catalog_reader import IngestionCheckpoint
+from src.database.data_seeder import DataSeeder
+from src.database.graph_version import read_graph_version
+
+CATALOG = [
+    {"maladie": "Grippe", "symptomes": ["fièvre", "toux"], "traitements": ["repos"], "causes": ["virus"]},
+    {"maladie": "Rhume", "symptomes": ["toux", "éternuements"], "traitements": ["repos"], "causes": ["virus"]},
+    {"maladie": "Migraine", "symptomes": ["mal de tête"], "traitements": ["antalgiques"], "causes": ["stress"]},
+]
+
+
+def write_catalog(path, entries):
+    path.write_text(json.dumps(entries, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+def test_bulk_seed_writes_every_disease_in_batches(tmp_path):
+    graph = MemoryGraph()
+    catalog = write_catalog(tmp_path / "catalog.json", CATALOG)
+    assert DataSeeder(graph, batch_size=2).seed_from_json(catalog)
+    assert set(graph.diseases) == {"Grippe", "Rhume", "Migraine"}
+    assert graph.postings["symptoms"]["toux"] == {"Grippe", "Rhume"}
+    # Un lot = une écriture = une version
+    assert read_graph_version(graph) == 2
+    assert not (tmp_path / "catalog.json.checkpoint").exists()
+
+
+def test_bulk_seed_resumes_from_checkpoint(tmp_path):
+    graph = MemoryGraph()
+    catalog = write_catalog(tmp_path / "catalog.json", CATALOG)
+    IngestionCheckpoint.for_catalog(catalog).save(2)
+    assert DataSeeder(graph).seed_from_json(catalog, resume=True)
+    assert set(graph.diseases) == {"Migraine"}
+
+
+def test_delta_rewrites_changed_diseases_and_removes_orphans(tmp_path):
+    graph = MemoryGraph()
+    seeder = DataSeeder(graph)
+    seeder.seed_from_json(write_catalog(tmp_path / "v1.json", CATALOG))
+    
+    updated = [
+        {**CATALOG[0], "symptomes": ["fièvre", "frissons"]},
+        CATALOG[1],
+    ]
+    assert seeder.seed_delta(write_catalog(tmp_path / "v2.json", updated))
+    
+    assert set(graph.diseases) == {"Grippe", "Rhume"}
+    assert graph.diseases["Grippe"]["symptoms"] == ["fièvre", "frissons"]
+    # Toujours liés à une maladie: conservés
+    assert graph.postings["symptoms"]["toux"] == {"Rhume"}
+    assert "virus" in graph.postings["causes"]
+    # Plus aucune relation: supprimés
+    assert "mal de tête" not in graph.postings["symptoms"]
+    assert "antalgiques" not in graph.postings["treatments"]
+    assert "stress" not in graph.postings["causes"]
+
+
+def test_delta_leaves_unchanged_catalog_untouched(tmp_path):
+    graph = MemoryGraph()
+    seeder = DataSeeder(graph)
+    catalog = write_catalog(tmp_path / "catalog.json", CATALOG)
+    seeder.seed_from_json(catalog)
+    version = read_graph_version(graph)
+    assert seeder.seed_delta(catalog)
+    assert read_graph_version(graph) == version
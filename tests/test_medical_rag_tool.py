@@ -0,0 +1,124 @@
+import json
+import pytest
+from src.backends import MemoryGraph
+from src.database.catalog_reader import iter_catalog
+from src.database.data_seeder import DataSeeder
+from src.database.graph_version import read_graph_version
+from src.database.neo4j_connector import load_routing_table
+from src.retrieval.snapshot import build_snapshot
+from src.tools.medical_rag_tool import MedicalRAGTool
+
+
+class RecordingChain:
+    """Chaîne Cypher factice: enregistre les questions qui lui parviennent."""
+    
+    top_k = 10
+    
+    def __init__(self):
+        self.queries = []
+    
+    def invoke(self, args):
+        self.queries.append(args["query"])
+        return {"result": "chain answer", "intermediate_steps": []}
+
+
+@pytest.fixture(scope="module")
+def graph():
+    graph = MemoryGraph()
+    DataSeeder(graph).seed_from_json("data/medical_data.json")
+    return graph
+
+
+@pytest.fixture
+def tool(graph):
+    return MedicalRAGTool(graph=graph, llm=object(), qa_chain=RecordingChain())
+
+
+def test_symptom_question_uses_native_ranking(tool):
+    assert tool.retrieve("J'ai de la fièvre et de la toux")
+    tool._run("J'ai de la fièvre et de la toux")
+    assert tool.qa_chain.queries == []
+
+
+@pytest.mark.parametrize("question", ["What treats cough?", "Causes of fever", "Comment soigner la toux ?"])
+def test_treatment_and_cause_questions_go_to_the_chain(tool, question):
+    assert tool.retrieve(question) is None
+    assert "chain answer" in tool._run(question)
+    assert tool.qa_chain.queries == [question]
+
+
+def test_what_could_cause_is_a_diagnosis_question(tool):
+    assert tool.retrieve("What could cause fever and cough?")
+
+
+def test_retrieve_many_skips_non_lookup_questions(tool):
+    results = tool.retrieve_many(["fièvre et toux", "what treats cough?"])
+    assert results[0] is not None
+    assert results[1] is None
+
+
+CLINIC_A = [
+    {"maladie": "Grippe", "symptomes": ["fièvre", "toux"]},
+    {"maladie": "Rhume", "symptomes": ["toux", "éternuements"]},
+]
+CLINIC_B = [
+    {"maladie": "Bronchite", "symptomes": ["toux", "fièvre"]},
+    {"maladie": "Angine", "symptomes": ["fièvre", "mal de gorge"]},
+]
+
+
+def tenant_catalog(tmp_path, name, entries, snapshot=False):
+    """Graphe du tenant et, si demandé, snapshot de son catalogue."""
+    path = tmp_path / f"{name}.json"
+    path.write_text(json.dumps(entries, ensure_ascii=False), encoding="utf-8")
+    graph = MemoryGraph()
+    DataSeeder(graph).seed_from_json(str(path))
+    if snapshot:
+        build_snapshot(iter_catalog(str(path)), str(tmp_path / f"{name}.snap"), read_graph_version(graph))
+    return graph
+
+
+@pytest.fixture
+def tenants(tmp_path, monkeypatch):
+    """Deux cliniques aux catalogues distincts; le snapshot global est celui du tenant par défaut."""
+    tenant_catalog(tmp_path, "default", json.load(open("data/medical_data.json", encoding="utf-8")), snapshot=True)
+    graphs = {
+        "clinic_a": tenant_catalog(tmp_path, "clinic_a", CLINIC_A, snapshot=True),
+        "clinic_b": tenant_catalog(tmp_path, "clinic_b", CLINIC_B),
+    }
+    routes = {
+        "clinic_a": {"database": "clinic_a", "snapshot_path": str(tmp_path / "clinic_a.snap")},
+        "clinic_b": {"database": "clinic_b"},
+    }
+    (tmp_path / "tenants.json").write_text(json.dumps(routes), encoding="utf-8")
+    monkeypatch.setenv("NEO4J_TENANTS", str(tmp_path / "tenants.json"))
+    monkeypatch.setenv("RETRIEVAL_BACKEND", "index")
+    monkeypatch.setenv("SNAPSHOT_PATH", str(tmp_path / "default.snap"))
+    monkeypatch.setenv("VECTOR_INDEX_DIR", str(tmp_path / "default_vectors"))
+    return graphs
+
+
+def test_catalog_artifacts_are_not_inherited_by_other_tenants(tenants, tmp_path):
+    table = load_routing_table()
+    assert table["default"]["snapshot_path"] == str(tmp_path / "default.snap")
+    assert table["default"]["vector_index_dir"] == str(tmp_path / "default_vectors")
+    assert table["clinic_a"]["snapshot_path"] == str(tmp_path / "clinic_a.snap")
+    assert table["clinic_b"]["snapshot_path"] is None
+    assert table["clinic_a"]["vector_index_dir"] is None
+    assert table["clinic_b"]["retrieval_backend"] == "index"
+
+
+def test_tenants_rank_against_their_own_catalog(tenants, tmp_path):
+    tools = {
+        tenant: MedicalRAGTool(graph=graph, tenant=tenant, llm=object(), qa_chain=RecordingChain())
+        for tenant, graph in tenants.items()
+    }
+    assert tools["clinic_a"].retriever.snapshot.path == str(tmp_path / "clinic_a.snap")
+    assert tools["clinic_b"].retriever.snapshot is None
+    assert all(tool.vector_index is None for tool in tools.values())
+    
+    question = "J'ai de la fièvre et de la toux"
+    rankings = {tenant: {row["disease"] for row in tool.retrieve(question)["diseases"]}
+                for tenant, tool in tools.items()}
+    assert rankings["clinic_a"] == {"Grippe", "Rhume"}
+    assert rankings["clinic_b"] == {"Bronchite", "Angine"}
@@ -0,0 +1,21 @@
+from langchain_community.graphs.graph_document import GraphDocument, Node, Relationship
+from langchain_core.documents import Document
+from src.backends import MemoryGraph
+from src.database.disease_profile import fetch_profiles
+
+
+def test_add_graph_documents_merges_diseases():
+    graph = MemoryGraph()
+    grippe = Node(id="Grippe", type="Disease")
+    fievre = Node(id="fièvre", type="Symptom")
+    repos = Node(id="repos", type="Treatment")
+    graph.add_graph_documents([GraphDocument(
+        nodes=[grippe, fievre, repos],
+        relationships=[Relationship(source=grippe, target=fievre, type="HAS_SYMPTOM"),
+                       Relationship(source=grippe, target=repos, type="TREATED_WITH")],
+        source=Document(page_content="La grippe donne de la fièvre."),
+    )])
+    profile = fetch_profiles(graph, ["Grippe"])["Grippe"]
+    assert profile["symptoms"] == ["fièvre"]
+    assert profile["treatments"] == ["repos"]
+    assert graph.version == 1
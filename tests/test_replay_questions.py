@@ -0,0 +1,32 @@
+import pytest
+from scripts import replay_questions
+from scripts.replay_questions import FailedAnswer, with_retry
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(replay_questions.time, "sleep", lambda s: None)
+
+
+def answers(*results):
+    results = iter(results)
+    
+    def call():
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return call
+
+
+def test_error_answer_is_retried():
+    assert with_retry(answers("❌ Error: timeout", "Grippe"), retries=2, backoff=0) == ("Grippe", 2)
+
+
+def test_error_answer_fails_after_last_retry():
+    with pytest.raises(FailedAnswer, match="❌ Error: timeout"):
+        with_retry(answers("❌ Error: timeout", "❌ Error: timeout"), retries=1, backoff=0)
+
+
+def test_exception_is_retried():
+    assert with_retry(answers(ConnectionError("reset"), "Grippe"), retries=1, backoff=0) == ("Grippe", 2)
@@ -0,0 +1,87 @@
+import pytest
+from src.tools.result_shaper import ResultShaper, TokenCounter
+
+
+@pytest.fixture
+def shaper():
+    return ResultShaper(budget=1000, max_items=3, counter=TokenCounter())
+
+
+def entries(count):
+    return [{
+        "disease": f"Maladie {i}", "score": 3, "total": 5,
+        "symptoms": ["fièvre", "toux", "fatigue"],
+        "treatments": ["repos", "hydratation"], "causes": ["virus"],
+    } for i in range(count)]
+
+
+def test_group_rows_merges_duplicates_and_ranks_by_score(shaper):
+    rows = [
+        {"d.name": "Rhume", "s.name": "toux", "overlap": 1},
+        {"d.name": "Grippe", "s.name": "fièvre", "overlap": 2},
+        {"d.name": "Grippe", "s.name": "fièvre", "overlap": 2},
+        {"d.name": "Grippe", "s.name": "toux", "t.name": "repos", "overlap": 2},
+        {"count": 3},
+    ]
+    grouped = shaper.group_rows(rows)
+    assert [entry["disease"] for entry in grouped] == ["Grippe", "Rhume", None]
+    assert grouped[0]["symptoms"] == ["fièvre", "toux"]
+    assert grouped[0]["treatments"] == ["repos"]
+    assert grouped[0]["rows"] == 2
+    assert grouped[2]["text"] == "count=3"
+
+
+def test_group_rows_breaks_score_ties_by_symptoms_then_arrival(shaper):
+    rows = [
+        {"disease": "Otite", "symptom": "fièvre"},
+        {"disease": "Angine", "symptom": "fièvre"},
+        {"disease": "Angine", "symptom": "mal de gorge"},
+        {"disease": "Asthme", "symptom": "toux"},
+    ]
+    assert [entry["disease"] for entry in shaper.group_rows(rows)] == ["Angine", "Otite", "Asthme"]
+
+
+def test_clip_reports_hidden_values(shaper):
+    assert shaper.clip(["a", "b", "c", "d", "e"]) == "a, b, c (+2)"
+    assert shaper.clip(["a", "b"]) == "a, b"
+    assert shaper.clip([]) == "-"
+
+
+@pytest.mark.parametrize("budget", [40, 120, 400])
+def test_render_stays_within_budget_and_notes_omissions(budget):
+    shaper = ResultShaper(budget=budget, max_items=3, counter=TokenCounter())
+    context = shaper.render(entries(30), "en")
+    assert shaper.counter.count(context) <= budget
+    lines = context.split("\n")
+    assert lines[0].startswith("1. Maladie 0 | symptoms: 3/5 (fièvre, toux, fatigue)")
+    assert lines[-1] == f"(+{30 - (len(lines) - 1)} diseases omitted: context budget reached)"
+
+
+def test_render_keeps_everything_under_a_large_budget(shaper):
+    context = shaper.render(entries(3), "fr")
+    assert context.count("\n") == 2
+    assert "omises" not in context
+    assert "traitements: repos, hydratation" in context
+
+
+def test_render_truncates_an_entry_larger_than_the_budget():
+    shaper = ResultShaper(budget=30, max_items=50, counter=TokenCounter())
+    entry = {**entries(1)[0], "symptoms": [f"symptôme {i}" for i in range(40)]}
+    context = shaper.render([entry], "en")
+    assert context.startswith("1. Maladie 0")
+    assert context.endswith("…")
+    assert shaper.counter.count(context) <= 30
+
+
+def test_from_native_keeps_the_ranking_order(shaper):
+    native = {
+        "diseases": [
+            {"disease": "Rhume", "overlap": 1, "total": 3, "matched": ["toux"]},
+            {"disease": "Grippe", "overlap": 2, "total": 4, "matched": ["fièvre", "toux"]},
+        ],
+        "details": {"Grippe": {"treatments": ["repos"], "causes": ["virus"]}},
+    }
+    shaped = shaper.from_native(native)
+    assert [entry["disease"] for entry in shaped] == ["Rhume", "Grippe"]
+    assert shaped[1]["treatments"] == ["repos"]
+    assert shaped[0]["treatments"] == []
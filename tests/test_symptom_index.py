@@ -0,0 +1,109 @@
+import json
+import pytest
+from src.backends import MemoryGraph
+from src.database.catalog_reader import iter_catalog
+from src.database.data_seeder import DataSeeder, REPLACE_QUERY
+from src.database.graph_version import BUMP_GRAPH_VERSION_QUERY, read_graph_version
+from src.retrieval.snapshot import Snapshot, build_snapshot
+from src.retrieval.symptom_index import SymptomIndex
+from src.retrieval.symptom_matcher import SymptomMatcher
+
+SYMPTOM_SETS = [
+    ["fièvre élevée", "frissons"],
+    ["fatigue"],
+    ["essoufflement", "douleur thoracique"],
+    ["mal de tête", "nausée", "vertiges"],
+    ["toux", "fièvre"],
+]
+
+
+@pytest.fixture(scope="module")
+def graph():
+    graph = MemoryGraph()
+    DataSeeder(graph).seed_from_json("data/medical_data.json")
+    return graph
+
+
+def ordering(rows):
+    return [(row["disease"], row["overlap"], row["total"]) for row in rows]
+
+
+@pytest.mark.parametrize("limit", [1, 2, 5, 20])
+def test_overlap_ranking_matches_cypher_order(graph, limit):
+    index = SymptomIndex.from_graph(graph, scoring="overlap", limit=limit)
+    matcher = SymptomMatcher(graph, limit=limit)
+    for symptoms in SYMPTOM_SETS:
+        assert ordering(index.rank(symptoms)) == ordering(matcher.rank(symptoms))
+
+
+def test_ties_are_broken_by_disease_name(graph):
+    # "fatigue": deux maladies à 1/7 puis trois ex aequo à 1/8, coupées à trois résultats
+    rows = SymptomIndex.from_graph(graph, scoring="overlap", limit=3).rank(["fatigue"])
+    assert [row["disease"] for row in rows] == ["Diabète de type 2", "Hypertension", "Anémie ferriprive"]
+
+
+def test_external_write_is_picked_up_after_poll_interval():
+    graph = MemoryGraph()
+    DataSeeder(graph).seed_from_json("data/medical_data.json")
+    index = SymptomIndex.from_graph(graph, scoring="overlap", poll_interval=3600)
+    
+    # Écriture d'un autre processus: seule la version persistée change
+    row = {"name": "Maladie X", "symptoms": ["symptôme inédit"], "treatments": [], "causes": [],
+           "hash": "x", "profile": None}
+    graph.query(REPLACE_QUERY, {"rows": [row]})
+    graph.query(BUMP_GRAPH_VERSION_QUERY)
+    assert index.rank(["symptôme inédit"]) == []
+    
+    index.poll_interval = 0
+    assert [row["disease"] for row in index.rank(["symptôme inédit"])] == ["Maladie X"]
+
+
+def seeded_graph():
+    graph = MemoryGraph()
+    DataSeeder(graph).seed_from_json("data/medical_data.json")
+    return graph
+
+
+def snapshot_of(graph, path):
+    build_snapshot(iter_catalog("data/medical_data.json"), str(path), read_graph_version(graph))
+    return str(path)
+
+
+@pytest.mark.parametrize("scoring", ["overlap", "jaccard", "tfidf", "bm25"])
+@pytest.mark.parametrize("limit", [1, 3, 20])
+def test_snapshot_and_graph_indexes_rank_identically(graph, tmp_path, scoring, limit):
+    path = snapshot_of(graph, tmp_path / "catalog.snap")
+    from_snapshot = SymptomIndex.from_snapshot(path, graph=graph, scoring=scoring, limit=limit)
+    from_graph = SymptomIndex.from_graph(graph, scoring=scoring, limit=limit)
+    assert from_snapshot.snapshot is not None
+    for symptoms in SYMPTOM_SETS:
+        expected = from_graph.rank(symptoms)
+        rows = from_snapshot.rank(symptoms)
+        assert ordering(rows) == ordering(expected)
+        assert [row["score"] for row in rows] == pytest.approx([row["score"] for row in expected])
+
+
+def test_stale_snapshot_falls_back_to_the_graph(tmp_path):
+    graph = seeded_graph()
+    path = snapshot_of(graph, tmp_path / "catalog.snap")
+    index = SymptomIndex.from_snapshot(path, graph=graph, scoring="overlap", poll_interval=0)
+    
+    catalog = json.load(open("data/medical_data.json", encoding="utf-8"))
+    catalog.append({"maladie": "Maladie X", "symptomes": ["symptôme inédit"]})
+    (tmp_path / "v2.json").write_text(json.dumps(catalog, ensure_ascii=False), encoding="utf-8")
+    DataSeeder(graph).seed_delta(str(tmp_path / "v2.json"))
+    assert [row["disease"] for row in index.rank(["symptôme inédit"])] == ["Maladie X"]
+    
+    # Snapshot reconstruit à la nouvelle version: de nouveau utilisé
+    build_snapshot(iter_catalog(str(tmp_path / "v2.json")), path, read_graph_version(graph))
+    index.refresh()
+    assert index.snapshot.graph_version == read_graph_version(graph)
+    assert [row["disease"] for row in index.rank(["symptôme inédit"])] == ["Maladie X"]
+
+
+def test_stale_snapshot_without_graph_loader_fails_loudly(tmp_path):
+    graph = seeded_graph()
+    path = snapshot_of(graph, tmp_path / "catalog.snap")
+    graph.query(BUMP_GRAPH_VERSION_QUERY)
+    with pytest.raises(ValueError, match="older than the graph"):
+        SymptomIndex(None, snapshot=Snapshot(path), graph=graph)
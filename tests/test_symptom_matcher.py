@@ -0,0 +1,32 @@
+import pytest
+from src.backends import MemoryGraph
+from src.database.data_seeder import DataSeeder
+from src.retrieval.symptom_matcher import SymptomMatcher
+
+QUESTIONS = ["fièvre toux fatigue", "mal de tête nausée", "éternuements nez bouché fièvre"]
+
+
+@pytest.fixture(scope="module")
+def graph():
+    graph = MemoryGraph()
+    DataSeeder(graph).seed_from_json("data/medical_data.json")
+    return graph
+
+
+@pytest.mark.parametrize("scoring", ["overlap", "weighted"])
+def test_rank_many_matches_rank(graph, scoring):
+    matcher = SymptomMatcher(graph, scoring=scoring)
+    symptom_sets = [matcher.match(question) for question in QUESTIONS]
+    assert matcher.rank_many(symptom_sets) == [matcher.rank(symptoms) for symptoms in symptom_sets]
+
+
+def test_english_generic_symptoms_reach_qualified_variants(graph):
+    matcher = SymptomMatcher(graph)
+    symptoms = matcher.match("I have fever and cough")
+    assert {"fièvre", "fièvre élevée", "toux", "toux sèche", "toux productive"} <= set(symptoms)
+    diseases = [row["disease"] for row in matcher.rank(symptoms)]
+    assert {"Grippe", "Pneumonie"} <= set(diseases)
+
+
+def test_qualified_mention_is_not_expanded(graph):
+    assert SymptomMatcher(graph).match("high fever and dry cough") == ["fièvre élevée", "toux sèche"]